@@ -0,0 +1,125 @@
+# backend/bench/bench_auth.py
+"""
+Per-request auth cost: a JWT decode on every request vs the token cache.
+
+"decode" times jwt.decode plus claim checks, what get_current_user did
+for every request; "cached" times TokenService.verify for a token it has
+already seen. Then both are timed end to end through an in-process app
+(httpx ASGI transport): an endpoint with no auth, the old sync
+dependency (threadpool hop + decode) and the new async one. The run fails
+unless a revoked token is rejected after a revocation sync.
+
+    python -m backend.bench.bench_auth --calls 20000 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+p = argparse.ArgumentParser()
+p.add_argument("--calls", type=int, default=20000)
+p.add_argument("--requests", type=int, default=2000)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "auth.db")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException  # noqa: E402
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from backend.config import SECRET_KEY, JWT_ALGO  # noqa: E402
+from backend.db import create_db_and_tables, get_async_engine  # noqa: E402
+from backend.routes.auth_dependency import get_current_user, security  # noqa: E402
+from backend.services.tokens import InvalidToken, tokens  # noqa: E402
+
+TOKEN = tokens.create(1, "customer")
+
+
+def old_dependency(creds: HTTPAuthorizationCredentials = Depends(security)):
+    try:
+        payload = jwt.decode(creds.credentials, SECRET_KEY, algorithms=[JWT_ALGO])
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return {"user_id": payload.get("user_id") or payload.get("id"), "role": payload.get("role")}
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/none")
+    async def none():
+        return {"ok": True}
+
+    @app.get("/old")
+    async def old(user: dict = Depends(old_dependency)):
+        return {"ok": True}
+
+    @app.get("/new")
+    async def new(user: dict = Depends(get_current_user)):
+        return {"ok": True}
+
+    return app
+
+
+def per_call(name: str, fn):
+    t0 = time.perf_counter()
+    for _ in range(args.calls):
+        fn()
+    us = (time.perf_counter() - t0) * 1e6 / args.calls
+    print(f"{name:>8} {us:>10.2f} us/call")
+    return us
+
+
+async def per_request(client: httpx.AsyncClient, path: str) -> float:
+    headers = {"Authorization": f"Bearer {TOKEN}"}
+    t0 = time.perf_counter()
+    for _ in range(args.requests):
+        r = await client.get(path, headers=headers)
+        assert r.status_code == 200, (path, r.status_code, r.text)
+    return (time.perf_counter() - t0) * 1e6 / args.requests
+
+
+async def main():
+    print(f"calls={args.calls} requests={args.requests}")
+    decode = per_call("decode", lambda: jwt.decode(TOKEN, SECRET_KEY, algorithms=[JWT_ALGO]))
+    tokens.verify(TOKEN)
+    cached = per_call("cached", lambda: tokens.verify(TOKEN))
+    print(f"cache speedup: {decode / cached:.1f}x")
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':>8} {'us/req':>10} {'auth us':>10}")
+        base = await per_request(client, "/none")
+        print(f"{'none':>8} {base:>10.1f} {'-':>10}")
+        for name in ("old", "new"):
+            us = await per_request(client, f"/{name}")
+            print(f"{name:>8} {us:>10.1f} {us - base:>10.1f}")
+
+    # revocation must beat the cache, and survive a reload from the table
+    create_db_and_tables()
+    revoked = tokens.create(2, "customer")
+    tokens.verify(revoked)
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        assert await tokens.revoke(session, revoked)
+    # aiosqlite's worker thread would otherwise keep the process alive
+    await get_async_engine().dispose()
+    tokens.sync()
+    try:
+        tokens.verify(revoked)
+    except InvalidToken:
+        pass
+    else:
+        raise AssertionError("revoked token accepted")
+    print(f"stats: {tokens.stats()}")
+    print("OK: revoked tokens are rejected")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
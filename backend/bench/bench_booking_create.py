@@ -0,0 +1,164 @@
+# backend/bench/bench_booking_create.py
+"""
+Booking creation throughput: two commits vs one unit of work.
+
+"two-commit" replays the previous create_razorpay_order flow (commit the
+booking and its hold, refresh, call the gateway, commit the payment,
+refresh); "single" is the current BookingService.create_razorpay_order
+(one commit, gateway call left to the payment outbox). Both run against
+the same flight from --threads threads; commits are counted on the
+engine.
+
+    python -m backend.bench.bench_booking_create --bookings 2000 --threads 16
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--db", default=None, help="database URL (default: temp SQLite file)")
+p.add_argument("--bookings", type=int, default=2000)
+p.add_argument("--threads", type=int, default=16)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = args.db or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bookings.db")
+os.environ["USE_FAKE_PAYMENTS"] = "true"
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from sqlalchemy import event  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from backend.db import engine, create_db_and_tables  # noqa: E402
+from backend.model import Booking, BookingStatus, Company, Customer, Flight, Payment  # noqa: E402
+from backend.services.booking_service import BookingService  # noqa: E402
+from backend.services.flight_events import flight_changed  # noqa: E402
+from backend.services.payment_service import PaymentService  # noqa: E402
+from backend.services.payment_outbox import relay  # noqa: E402
+from backend.services.seat_holds import seat_holds  # noqa: E402
+
+_commits = 0
+_commits_lock = threading.Lock()
+
+
+@event.listens_for(engine, "commit")
+def _count_commit(conn):
+    global _commits
+    with _commits_lock:
+        _commits += 1
+
+
+def setup():
+    create_db_and_tables()
+    with Session(engine) as s:
+        company = Company(Name="Bench Air", Type="test")
+        customer = Customer(Name="Bench", Email=f"bench-{uuid.uuid4().hex}@example.com", Phone="0", Password="x")
+        s.add(company)
+        s.add(customer)
+        s.commit()
+
+        dep = datetime.utcnow() + timedelta(days=30)
+        seats = args.bookings * 4
+        flight = Flight(
+            Company_ID=company.Company_ID,
+            Dept_Location="BEN",
+            Arr_Location="CHM",
+            Departure_Time=dep,
+            Arrival_Time=dep + timedelta(hours=2),
+            Total_Seats=seats,
+            Available_Seats=seats,
+        )
+        s.add(flight)
+        s.commit()
+        return customer.Customer_ID, flight.Flight_ID
+
+
+def two_commit(customer_id: int, flight_id: int):
+    with Session(engine) as s:
+        flight = s.get(Flight, flight_id)
+        if not BookingService.reserve_seats(s, flight_id, 1):
+            raise RuntimeError("sold out")
+        booking = Booking(Customer_ID=customer_id, Flight_ID=flight_id, Seats=1, Status=BookingStatus.CREATED)
+        s.add(booking)
+        s.flush()
+        seat_holds.place(s, booking.Booking_ID, flight_id, 1)
+        s.commit()
+        s.refresh(booking)
+        s.refresh(flight)
+        flight_changed(flight)
+
+        order = PaymentService.create_order(amount_paise=100000, currency="INR", notes={})
+        payment = Payment(
+            Customer_ID=customer_id,
+            Booking_ID=booking.Booking_ID,
+            Company_ID=flight.Company_ID,
+            Amount=1000.0,
+            Gateway_Txn_ID=order["order_id"],
+            Status="authorized",
+        )
+        booking.Razorpay_Order_ID = order["order_id"]
+        s.add(payment)
+        s.add(booking)
+        s.commit()
+        s.refresh(payment)
+
+
+def single(customer_id: int, flight_id: int):
+    with Session(engine) as s:
+        BookingService.create_razorpay_order(s, customer_id=customer_id, flight_id=flight_id, seats=1)
+
+
+def run(name, fn, customer_id, flight_id):
+    global _commits
+    with _commits_lock:
+        _commits = 0
+
+    def one(_):
+        for attempt in range(5):
+            try:
+                fn(customer_id, flight_id)
+                return True
+            except Exception:
+                # SQLite "database is locked" under heavy write contention
+                time.sleep(0.01 * (attempt + 1))
+        return False
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(one, range(args.bookings)))
+    elapsed = time.perf_counter() - t0
+
+    ok = results.count(True)
+    print(f"{name:>10} {ok:>8} {elapsed:>8.2f} {ok / elapsed:>10.1f} {_commits / max(ok, 1):>11.2f} {results.count(False):>7}")
+    return ok / elapsed
+
+
+def main():
+    customer_id, flight_id = setup()
+    # warm the pool and the seat map/hold code paths
+    single(customer_id, flight_id)
+
+    print(f"bookings={args.bookings} threads={args.threads} db={engine.url.get_backend_name()}")
+    print(f"{'path':>10} {'ok':>8} {'secs':>8} {'booking/s':>10} {'commits/bk':>11} {'gave_up':>7}")
+    before = run("two-commit", two_commit, customer_id, flight_id)
+    after = run("single", single, customer_id, flight_id)
+    print(f"speedup x{after / before:.2f}")
+
+    t0 = time.perf_counter()
+    relayed = 0
+    while True:
+        n = relay.run_once()
+        if not n:
+            break
+        relayed += n
+    print(f"outbox relayed {relayed} orders in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# backend/bench/bench_customer_history.py
+"""
+/customers/{id}/history: per-booking lookups vs one joined query.
+
+"n+1" replays the old travel_history (a Booking query, then a flight
+get, a company lazy load and a Payment query per booking); "joined" is
+CustomerHistoryService, one query per page. Statements are counted on
+the engine for histories of each --sizes length. The run fails unless
+the joined path uses exactly one statement per page whatever the
+history length, and returns the same rows as the old code.
+
+    python -m backend.bench.bench_customer_history --sizes 10 100 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--db", default=None, help="database URL (default: temp SQLite file)")
+p.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 1000])
+p.add_argument("--limit", type=int, default=50)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = args.db or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "history.db")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from sqlalchemy import event, insert  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from backend.db import engine, create_db_and_tables  # noqa: E402
+from backend.model import Booking, BookingStatus, Company, Customer, Flight, Payment  # noqa: E402
+from backend.services.customer_history import CustomerHistoryService  # noqa: E402
+
+_statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global _statements
+    _statements += 1
+
+
+def setup(size: int) -> int:
+    with Session(engine) as s:
+        company = Company(Name="Bench Air", Type="test")
+        customer = Customer(Name="Bench", Email=f"bench-{uuid.uuid4().hex}@example.com", Phone="0", Password="x")
+        s.add(company)
+        s.add(customer)
+        s.commit()
+
+        dep = datetime.utcnow() - timedelta(days=size)
+        flight_ids = [
+            s.execute(insert(Flight).values(
+                Company_ID=company.Company_ID,
+                Dept_Location="BLR",
+                Arr_Location="DEL",
+                Departure_Time=dep + timedelta(days=i),
+                Arrival_Time=dep + timedelta(days=i, hours=2),
+                Total_Seats=10,
+                Available_Seats=9,
+            )).inserted_primary_key[0]
+            for i in range(size)
+        ]
+        now = datetime.utcnow()
+        for flight_id in flight_ids:
+            booking_id = s.execute(insert(Booking).values(
+                Customer_ID=customer.Customer_ID,
+                Flight_ID=flight_id,
+                Seats=1,
+                Status=BookingStatus.PAID,
+                Created_At=now,
+            )).inserted_primary_key[0]
+            s.execute(insert(Payment).values(
+                Customer_ID=customer.Customer_ID,
+                Booking_ID=booking_id,
+                Company_ID=company.Company_ID,
+                Amount=1000.0,
+                Status="captured",
+                Created_At=now,
+            ))
+        s.commit()
+        return customer.Customer_ID
+
+
+def n_plus_one(customer_id: int):
+    with Session(engine) as session:
+        bookings = session.exec(select(Booking).where(Booking.Customer_ID == customer_id)).all()
+        history = []
+        for b in bookings:
+            flight = session.get(Flight, b.Flight_ID)
+            payment = session.exec(select(Payment).where(Payment.Booking_ID == b.Booking_ID)).first()
+            history.append((b.Booking_ID, flight.company.Name, payment.Amount))
+        return history, 1
+
+
+def joined(customer_id: int):
+    history, pages, cursor = [], 0, None
+    with Session(engine) as session:
+        while True:
+            q = CustomerHistoryService.build_query(customer_id, args.limit, cursor)
+            page, cursor = CustomerHistoryService.shape(session.exec(q).all(), args.limit)
+            history += [(h["booking_id"], h["company"], h["payment_amount"]) for h in page]
+            pages += 1
+            if not cursor:
+                return history, pages
+
+
+def run(fn, customer_id):
+    global _statements
+    _statements = 0
+    t0 = time.perf_counter()
+    history, pages = fn(customer_id)
+    return history, pages, _statements, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    create_db_and_tables()
+    print(f"limit={args.limit} db={engine.url.get_backend_name()}")
+    print(f"{'bookings':>8} {'n+1 stmts':>10} {'n+1 ms':>8} {'pages':>6} {'joined stmts':>13} {'joined ms':>10}")
+    for size in args.sizes:
+        customer_id = setup(size)
+        old, _, old_stmts, old_ms = run(n_plus_one, customer_id)
+        new, pages, new_stmts, new_ms = run(joined, customer_id)
+
+        assert sorted(old) == sorted(new), f"{size}: joined history differs from the old one"
+        assert new_stmts == pages, f"{size}: {new_stmts} statements for {pages} pages"
+        print(f"{size:>8} {old_stmts:>10} {old_ms:>8.1f} {pages:>6} {new_stmts:>13} {new_ms:>10.1f}")
+    print("OK: one statement per page at every history length")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# backend/bench/bench_customer_import.py
+"""
+Customer onboarding: one /customers/add per row vs /customers/import.
+
+"per-row" replays the old path for --sample rows (hash, insert, commit
+for each customer); "import" runs CustomerImporter over a generated CSV
+of --rows customers, a tenth of them duplicates. Both are projected to
+100k customers. The run fails unless every unique row is imported, the
+duplicates land in the errors file, and the importer issued one
+duplicate lookup per batch. Hashing is the floor for plain passwords
+(one Argon2 hash per row, divided across --workers processes);
+--prehashed takes it out of both paths.
+
+    python -m backend.bench.bench_customer_import --rows 20000 --sample 200
+"""
+import argparse
+import os
+import tempfile
+import time
+
+p = argparse.ArgumentParser()
+p.add_argument("--db", default=None, help="database URL (default: temp SQLite file)")
+p.add_argument("--rows", type=int, default=20000)
+p.add_argument("--sample", type=int, default=200, help="rows for the per-row path")
+p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+p.add_argument("--prehashed", action="store_true", help="rows carry Argon2 hashes: times the database path alone")
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = args.db or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "import.db")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from sqlalchemy import event, func  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from backend.config import CUSTOMER_IMPORT_BATCH  # noqa: E402
+from backend.db import engine, create_db_and_tables  # noqa: E402
+from backend.model import Customer  # noqa: E402
+from backend.services.customer_import import CustomerImporter  # noqa: E402
+from backend.services.passwords import context  # noqa: E402
+
+_lookups = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_lookup(conn, cursor, statement, parameters, context, executemany):
+    global _lookups
+    if statement.lstrip().upper().startswith("SELECT") and "customer" in statement:
+        _lookups += 1
+
+
+HASHED = context.hash("bench")
+
+
+def per_row(n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        with Session(engine) as s:
+            password = HASHED if args.prehashed else context.hash(f"pw{i}")
+            s.add(Customer(Name=f"Row {i}", Email=f"row{i}@bench.com", Phone="0", Password=password))
+            s.commit()
+    return time.perf_counter() - t0
+
+
+def write_csv(n: int) -> str:
+    path = os.path.join(tempfile.mkdtemp(), "customers.csv")
+    with open(path, "w") as f:
+        f.write("name,email,phone,password\n")
+        for i in range(n):
+            # every tenth row repeats an earlier email
+            email = f"imp{i - 1 if i % 10 == 9 else i}@bench.com"
+            f.write(f"Imp {i},{email},0,{HASHED if args.prehashed else f'pw{i}'}\n")
+    return path
+
+
+def main():
+    global _lookups
+    create_db_and_tables()
+    print(f"rows={args.rows} sample={args.sample} workers={args.workers} batch={CUSTOMER_IMPORT_BATCH} "
+          f"prehashed={args.prehashed} cpus={os.cpu_count()}")
+
+    old = per_row(args.sample)
+    print(f"{'path':>8} {'rows':>7} {'seconds':>8} {'rows/s':>8} {'100k est':>10}")
+    print(f"{'per-row':>8} {args.sample:>7} {old:>8.2f} {args.sample / old:>8.1f} {100000 * old / args.sample / 60:>8.1f} m")
+
+    importer = CustomerImporter(workers=args.workers, directory=tempfile.mkdtemp())
+    path = write_csv(args.rows)
+    _lookups = 0
+    t0 = time.perf_counter()
+    job = importer.submit(path, "csv")
+    while job.finished_at is None:
+        time.sleep(0.05)
+    new = time.perf_counter() - t0
+    lookups = _lookups
+    importer.shutdown()
+    print(f"{'import':>8} {args.rows:>7} {new:>8.2f} {args.rows / new:>8.1f} {100000 * new / args.rows / 60:>8.1f} m")
+    print(f"job: {job.progress()}")
+
+    duplicates = args.rows // 10
+    assert job.status == "done", job.error
+    assert job.imported == args.rows - duplicates, job.imported
+    assert job.duplicates == duplicates, job.duplicates
+    with open(job.errors_path) as f:
+        assert sum(1 for _ in f) - 1 == duplicates
+    with Session(engine) as s:
+        assert s.exec(select(func.count()).select_from(Customer).where(Customer.Email.like("imp%"))).one() == job.imported
+    batches = -(-args.rows // importer.batch_size)
+    assert lookups == batches, f"{lookups} lookups for {batches} batches"
+    print("OK: one duplicate lookup per batch, every unique row imported")
+
+
+if __name__ == "__main__":
+    main()
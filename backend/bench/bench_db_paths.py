@@ -0,0 +1,96 @@
+# backend/bench/bench_db_paths.py
+"""
+Sync vs async database path under rising concurrency.
+
+Runs the same indexed route query through a sync endpoint (blocking
+Session, FastAPI threadpool) and an async endpoint (AsyncSession, event
+loop) in-process via httpx's ASGI transport, and prints requests/sec and
+latency percentiles per concurrency level.
+
+    python -m backend.bench.bench_db_paths --depart DEL --arrive BOM
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.db import get_session, get_async_session
+from backend.model import Flight
+
+
+def build_app(depart: str, arrive: str) -> FastAPI:
+    app = FastAPI()
+
+    def query():
+        return (
+            select(Flight)
+            .where(Flight.Dept_Location == depart, Flight.Arr_Location == arrive)
+            .order_by(Flight.Departure_Time)
+            .limit(50)
+        )
+
+    @app.get("/sync")
+    def sync_path(session: Session = Depends(get_session)):
+        return len(session.exec(query()).all())
+
+    @app.get("/async")
+    async def async_path(session: AsyncSession = Depends(get_async_session)):
+        return len((await session.exec(query())).all())
+
+    return app
+
+
+async def run_level(client: httpx.AsyncClient, path: str, concurrency: int, total: int):
+    latencies = []
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            t0 = time.perf_counter()
+            r = await client.get(path)
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": p99 * 1000,
+    }
+
+
+async def main(args):
+    app = build_app(args.depart, args.arrive)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm both pools
+        await client.get("/sync")
+        await client.get("/async")
+
+        print(f"{'conc':>5} {'path':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for c in args.levels:
+            for path in ("/sync", "/async"):
+                res = await run_level(client, path, c, args.requests)
+                print(f"{c:>5} {path[1:]:>6} {res['rps']:>9.1f} {res['p50_ms']:>8.2f} {res['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser()
+    p.add_argument("--depart", default="DEL")
+    p.add_argument("--arrive", default="BOM")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32, 64, 128, 256])
+    asyncio.run(main(p.parse_args()))
@@ -0,0 +1,165 @@
+# backend/bench/bench_disruption.py
+"""
+Re-accommodating a cancelled flight: per passenger vs one batch.
+
+Books --passengers passengers (parties of 1-4) on a flight with
+--alternatives later flights on the same route, cancels it and moves
+everyone. "per-booking" replays the query-per-passenger approach (look
+up alternatives, reserve, update, notify, commit for each booking);
+"batch" is DisruptionAssistant.reaccommodate. Statements are counted on
+the engine.
+
+    python -m backend.bench.bench_disruption --passengers 300 --alternatives 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--db", default=None, help="database URL (default: temp SQLite file)")
+p.add_argument("--passengers", type=int, default=300)
+p.add_argument("--alternatives", type=int, default=4)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = args.db or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "disruption.db")
+os.environ["USE_FAKE_PAYMENTS"] = "true"
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from sqlalchemy import event, insert  # noqa: E402
+from sqlmodel import Session, select, func  # noqa: E402
+
+from backend.db import engine, create_db_and_tables  # noqa: E402
+from backend.model import Booking, BookingStatus, Company, Customer, Flight, FlightStatus, Notification  # noqa: E402
+from backend.services.booking_service import BookingService  # noqa: E402
+from backend.services.disruption_assistant import DisruptionAssistant  # noqa: E402
+
+_statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    global _statements
+    _statements += 1
+
+
+def setup(route: str):
+    """A full flight with --passengers seats booked, plus its alternatives."""
+    rnd = random.Random(7)
+    with Session(engine) as s:
+        company = Company(Name="Bench Air", Type="test")
+        customer = Customer(Name="Bench", Email=f"bench-{uuid.uuid4().hex}@example.com", Phone="0", Password="x")
+        s.add(company)
+        s.add(customer)
+        s.commit()
+
+        dep = datetime.utcnow() + timedelta(days=10)
+        flights = []
+        for i in range(args.alternatives + 1):
+            seats = args.passengers + 10
+            f = Flight(
+                Company_ID=company.Company_ID,
+                Dept_Location=route,
+                Arr_Location="ALT",
+                Departure_Time=dep + timedelta(hours=3 * i),
+                Arrival_Time=dep + timedelta(hours=3 * i + 2),
+                Total_Seats=seats,
+                Available_Seats=seats if i == 0 else seats // args.alternatives + 4,
+            )
+            s.add(f)
+            flights.append(f)
+        s.commit()
+        cancelled = flights[0].Flight_ID
+
+        rows, booked = [], 0
+        while booked < args.passengers:
+            n = min(rnd.randint(1, 4), args.passengers - booked)
+            rows.append({
+                "Customer_ID": customer.Customer_ID,
+                "Flight_ID": cancelled,
+                "Seats": n,
+                "Status": BookingStatus.PAID,
+                "Created_At": datetime.utcnow(),
+            })
+            booked += n
+        s.execute(insert(Booking), rows)
+        BookingService.reserve_seats(s, cancelled, booked)
+        flights[0].Status = FlightStatus.CANCELLED
+        s.add(flights[0])
+        s.commit()
+        return cancelled, len(rows)
+
+
+def per_booking(flight_id: int) -> int:
+    moved = 0
+    with Session(engine) as s:
+        bookings = s.exec(
+            select(Booking).where(Booking.Flight_ID == flight_id, Booking.Status == BookingStatus.PAID)
+        ).all()
+        for booking in bookings:
+            for alt in DisruptionAssistant.suggest_alternatives(s, flight_id, max_suggestions=10):
+                if alt.Status == FlightStatus.CANCELLED:
+                    continue
+                if BookingService.reserve_seats(s, alt.Flight_ID, booking.Seats):
+                    booking.Flight_ID = alt.Flight_ID
+                    booking.Status = BookingStatus.REBOOKED
+                    s.add(booking)
+                    s.add(Notification(
+                        Customer_ID=booking.Customer_ID,
+                        Kind="flight_rebooked",
+                        Payload={"booking_id": booking.Booking_ID, "to_flight_id": alt.Flight_ID},
+                    ))
+                    s.commit()
+                    moved += 1
+                    break
+    return moved
+
+
+def batch(flight_id: int) -> int:
+    with Session(engine) as s:
+        return DisruptionAssistant.reaccommodate(s, flight_id, "bench")["rebooked"]
+
+
+def run(name, fn, flight_id, bookings):
+    global _statements
+    _statements = 0
+    t0 = time.perf_counter()
+    moved = fn(flight_id)
+    elapsed = time.perf_counter() - t0
+    print(f"{name:>12} {moved:>6}/{bookings:<6} {elapsed * 1000:>10.1f} {_statements:>11}")
+    return elapsed
+
+
+def check(flight_id: int):
+    with Session(engine) as s:
+        left = s.exec(
+            select(func.count()).where(Booking.Flight_ID == flight_id, Booking.Status == BookingStatus.PAID)
+        ).one()
+        oversold = s.exec(select(func.count()).where(Flight.Available_Seats < 0)).one()
+    return left, oversold
+
+
+def main():
+    create_db_and_tables()
+    a, bookings = setup("PBK")
+    b, _ = setup("BAT")
+
+    print(f"passengers={args.passengers} bookings={bookings} alternatives={args.alternatives} "
+          f"db={engine.url.get_backend_name()}")
+    print(f"{'path':>12} {'moved':>13} {'ms':>10} {'statements':>11}")
+    before = run("per-booking", per_booking, a, bookings)
+    after = run("batch", batch, b, bookings)
+    print(f"speedup x{before / after:.1f}")
+
+    for name, flight_id in (("per-booking", a), ("batch", b)):
+        left, oversold = check(flight_id)
+        print(f"{name}: {left} bookings left on the cancelled flight, {oversold} oversold flights")
+
+
+if __name__ == "__main__":
+    main()
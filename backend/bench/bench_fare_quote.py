@@ -0,0 +1,130 @@
+# backend/bench/bench_fare_quote.py
+"""
+Fare quoting: the old inline pricing vs the compiled fare engine.
+
+"inline" replays the pricing block create_razorpay_order used to run
+(row band and column rules re-evaluated per seat, float rupees);
+"engine" is FareEngine with a cached table. Both price every seat of
+--flights flights of --seats seats, then a grid of --selections seat
+selections x 4 baggage options per flight, and must agree to the paisa.
+
+    python -m backend.bench.bench_fare_quote --flights 50 --seats 180
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--flights", type=int, default=50)
+p.add_argument("--seats", type=int, default=180)
+p.add_argument("--selections", type=int, default=20)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from backend.config import SEAT_LAYOUT  # noqa: E402
+from backend.model import Flight  # noqa: E402
+from backend.services.fare_engine import fare_engine  # noqa: E402
+from backend.services.seat_map import SeatLayout  # noqa: E402
+
+BAGGAGE = (0, 5, 10, 20)
+
+
+def inline_quote(flight: Flight, seats: int, labels, baggage_kg: int) -> int:
+    layout = SeatLayout(SEAT_LAYOUT, flight.Total_Seats)
+    seat_total = 0
+    for i in (layout.index(l) for l in labels):
+        row, col = layout.position(i)
+        if row < 5:
+            seat_total += flight.Seat_Pricing.get("high", 0)
+        elif row < 15:
+            seat_total += flight.Seat_Pricing.get("low", 0)
+        else:
+            seat_total += flight.Seat_Pricing.get("free", 0)
+        if col in ("A", "F"):
+            seat_total += 400
+        elif col in ("C", "D"):
+            seat_total += 250
+    total = float(flight.Price_Per_Seat) * seats + seat_total + max(0, baggage_kg) * 300
+    return int(round(total * 100))
+
+
+def make_flights():
+    rnd = random.Random(3)
+    dep = datetime.utcnow() + timedelta(days=7)
+    return [
+        Flight(
+            Flight_ID=i + 1,
+            Company_ID=1,
+            Dept_Location="BLR",
+            Arr_Location="DEL",
+            Departure_Time=dep,
+            Arrival_Time=dep + timedelta(hours=2),
+            Total_Seats=args.seats,
+            Available_Seats=args.seats,
+            Price_Per_Seat=float(rnd.randrange(2000, 9000, 50)),
+            Seat_Pricing={"high": rnd.choice((800, 900)), "low": 300, "free": 0},
+        )
+        for i in range(args.flights)
+    ]
+
+
+def make_selections(layout: SeatLayout):
+    rnd = random.Random(5)
+    return [
+        [layout.label(i) for i in rnd.sample(range(layout.seats), rnd.randint(1, 4))]
+        for _ in range(args.selections)
+    ]
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    flights = make_flights()
+    layout = SeatLayout(SEAT_LAYOUT, args.seats)
+    all_seats = [layout.label(i) for i in range(args.seats)]
+    selections = make_selections(layout)
+
+    def inline_maps():
+        return [[inline_quote(f, 1, [l], 0) for l in all_seats] for f in flights]
+
+    def engine_maps():
+        return [fare_engine.seat_prices(fare_engine.table(f))["prices"] for f in flights]
+
+    def inline_grid():
+        return [
+            [inline_quote(f, len(sel), sel, kg) for sel in selections for kg in BAGGAGE]
+            for f in flights
+        ]
+
+    def engine_grid():
+        return [
+            [q["total"] for q in fare_engine.quote_many(fare_engine.table(f), selections, 1, BAGGAGE)]
+            for f in flights
+        ]
+
+    _, compile_ms = timed(engine_maps)  # first call compiles every table
+    print(f"flights={args.flights} seats={args.seats} grid={args.selections}x{len(BAGGAGE)} "
+          f"compile={compile_ms:.2f}ms")
+    print(f"{'workload':>10} {'inline ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for name, slow, fast in (("seat maps", inline_maps, engine_maps), ("grid", inline_grid, engine_grid)):
+        a, slow_ms = timed(slow)
+        b, fast_ms = timed(fast)
+        assert a == b, f"{name}: engine and inline pricing disagree"
+        print(f"{name:>10} {slow_ms:>10.2f} {fast_ms:>10.2f} {slow_ms / fast_ms:>7.1f}x")
+    _, one_ms = timed(lambda: fare_engine.seat_prices(fare_engine.table(flights[0])))
+    print(f"one full seat map: {one_ms:.3f}ms")
+    print("OK: engine matches inline pricing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# backend/bench/bench_login.py
+"""
+Login storm: password checks on request threads vs the hashing pool.
+
+Fires --logins concurrent password checks at an in-process app (httpx
+ASGI transport) while a probe keeps calling an unrelated sync endpoint,
+and prints login throughput plus the probe's latency. "inline" is the
+old pattern (a sync route calling CryptContext.verify on the request
+threadpool); "pool" is an async route awaiting passwords.verify. A last
+run with --max-pending below the storm size shows the 503 shedding.
+
+    python -m backend.bench.bench_login --logins 200 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+p = argparse.ArgumentParser()
+p.add_argument("--logins", type=int, default=200)
+p.add_argument("--concurrency", type=int, default=100)
+p.add_argument("--max-pending", type=int, default=16, help="pool limit for the shedding run")
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from backend.services.passwords import PasswordService, PasswordServiceBusy, context  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+HASHED = context.hash(PASSWORD)
+
+
+def build_app(service: PasswordService) -> FastAPI:
+    app = FastAPI()
+
+    @app.exception_handler(PasswordServiceBusy)
+    async def busy(request: Request, exc: PasswordServiceBusy):
+        return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+    @app.post("/inline")
+    def inline_login():
+        return {"ok": context.verify(PASSWORD, HASHED)}
+
+    @app.post("/pool")
+    async def pool_login():
+        valid, _ = await service.verify(PASSWORD, HASHED)
+        return {"ok": valid}
+
+    @app.get("/probe")
+    def probe():
+        return {"ok": True}
+
+    return app
+
+
+async def storm(client: httpx.AsyncClient, path: str):
+    sem = asyncio.Semaphore(args.concurrency)
+    codes = []
+
+    async def one():
+        async with sem:
+            r = await client.post(path)
+            codes.append(r.status_code)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.logins)))
+    return codes, time.perf_counter() - t0
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, lat: list):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await client.get("/probe")
+        lat.append((time.perf_counter() - t0) * 1000)
+        await asyncio.sleep(0.005)
+
+
+async def run(name: str, path: str, service: PasswordService):
+    transport = httpx.ASGITransport(app=build_app(service))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        stop, lat = asyncio.Event(), []
+        prober = asyncio.create_task(probe(client, stop, lat))
+        codes, elapsed = await storm(client, path)
+        stop.set()
+        await prober
+
+    ok = codes.count(200)
+    p99 = statistics.quantiles(lat, n=100)[98] if len(lat) >= 2 else float("nan")
+    print(f"{name:>10} {ok:>6} {codes.count(503):>6} {ok / elapsed:>9.1f} "
+          f"{statistics.median(lat):>10.2f} {p99:>10.2f} {len(lat):>7}")
+
+
+async def main():
+    print(f"logins={args.logins} concurrency={args.concurrency} cpus={os.cpu_count()}")
+    print(f"{'path':>10} {'ok':>6} {'503':>6} {'logins/s':>9} {'probe p50':>10} {'probe p99':>10} {'probes':>7}")
+    await run("inline", "/inline", PasswordService())
+    # room for the whole storm: throughput and probe latency only
+    service = PasswordService(max_pending=args.logins)
+    await run("pool", "/pool", service)
+    service.shutdown()
+    shedding = PasswordService(max_pending=args.max_pending)
+    await run("pool+shed", "/pool", shedding)
+    print(f"shedding pool: {shedding.stats()}")
+    shedding.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
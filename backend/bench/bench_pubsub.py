@@ -0,0 +1,88 @@
+# backend/bench/bench_pubsub.py
+"""
+Cross-worker realtime delivery: latency added by the Unix-socket broker.
+
+Starts two UnixSocketPubSub "workers" in this process (they still talk
+over a real Unix socket, through the broker the first one elects itself
+to run): worker B publishes --messages messages for a customer whose
+socket is on worker A, --rate per second, and the time from publish to
+A's delivery callback is recorded. A burst run publishes as fast as
+possible for throughput. The run fails unless every message reaches A,
+in order, and nothing reaches a worker that did not subscribe.
+
+    python -m backend.bench.bench_pubsub --messages 5000 --rate 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+p = argparse.ArgumentParser()
+p.add_argument("--messages", type=int, default=5000)
+p.add_argument("--rate", type=float, default=2000, help="target messages per second for the latency run")
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from backend.utils.pubsub import UnixSocketPubSub  # noqa: E402
+
+CUSTOMER = 42
+
+
+async def connected(*buses):
+    while not all(b.stats()["connected"] for b in buses):
+        await asyncio.sleep(0.01)
+
+
+async def main():
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    received, stray = [], []
+
+    a = UnixSocketPubSub(path)
+    b = UnixSocketPubSub(path)
+    c = UnixSocketPubSub(path)
+    await a.start(lambda cid, payload: received.append((time.perf_counter(), payload)), lambda: [CUSTOMER])
+    await connected(a)
+    await b.start(lambda cid, payload: None, lambda: [])
+    await c.start(lambda cid, payload: stray.append(payload), lambda: [])
+    await connected(b, c)
+    await asyncio.sleep(0.05)
+
+    print(f"messages={args.messages} rate={args.rate:.0f}/s broker in A: {a.stats()['broker']}")
+    print(f"{'run':>8} {'msgs/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for run, interval in (("paced", 1 / args.rate), ("burst", 0)):
+        received.clear()
+        sent_at = {}
+        t0 = time.perf_counter()
+        for i in range(args.messages):
+            payload = f'{{"type":"bench","run":"{run}","seq":{i}}}'
+            sent_at[payload] = time.perf_counter()
+            assert b.publish(CUSTOMER, payload)
+            if interval:
+                await asyncio.sleep(interval)
+            elif i % 500 == 0:
+                await asyncio.sleep(0)
+        while len(received) < args.messages and time.perf_counter() - t0 < 30:
+            await asyncio.sleep(0.001)
+        elapsed = time.perf_counter() - t0
+
+        assert len(received) == args.messages, f"{run}: {len(received)} of {args.messages} delivered"
+        assert [p for _, p in received] == list(sent_at), f"{run}: out of order"
+        lat = [(t - sent_at[payload]) * 1000 for t, payload in received]
+        print(f"{run:>8} {args.messages / elapsed:>9.0f} {statistics.median(lat):>8.3f} "
+              f"{statistics.quantiles(lat, n=100)[98]:>8.3f} {max(lat):>8.3f}")
+
+    assert not stray, "a worker without subscribers received messages"
+    print(f"broker: {a.stats()}")
+    for bus in (c, b, a):
+        await bus.close()
+    print("OK: every message delivered in order, only to the subscribed worker")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+# backend/bench/bench_seat_inventory.py
+"""
+Capture throughput under seat contention.
+
+Creates one flight with --seats seats and --bookings CREATED bookings
+(1-2 seats each, demand well above supply), then captures all of them
+from --threads parallel threads and reports captures/s. The no-seat-lost
+/ none-oversold invariant is asserted by tests/test_seat_inventory.py.
+Defaults to a throwaway SQLite file; pass --db with a MySQL URL to
+stress the real engine.
+
+    python -m backend.bench.bench_seat_inventory --bookings 400 --threads 64
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+p = argparse.ArgumentParser()
+p.add_argument("--db", default=None, help="database URL (default: temp SQLite file)")
+p.add_argument("--seats", type=int, default=180)
+p.add_argument("--bookings", type=int, default=400)
+p.add_argument("--threads", type=int, default=64)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = args.db or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "seats.db")
+os.environ["USE_FAKE_PAYMENTS"] = "false"
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from sqlmodel import Session, select, func  # noqa: E402
+
+from backend.db import engine, create_db_and_tables  # noqa: E402
+from backend.model import Booking, BookingStatus, Company, Customer, Flight, Payment  # noqa: E402
+from backend.services.booking_service import BookingService  # noqa: E402
+
+
+def setup() -> int:
+    create_db_and_tables()
+    with Session(engine) as s:
+        company = Company(Name="Bench Air", Type="test")
+        customer = Customer(Name="Bench", Email=f"bench-{uuid.uuid4().hex}@example.com", Phone="0", Password="x")
+        s.add(company)
+        s.add(customer)
+        s.commit()
+
+        dep = datetime.utcnow() + timedelta(days=30)
+        flight = Flight(
+            Company_ID=company.Company_ID,
+            Dept_Location="BEN",
+            Arr_Location="CHM",
+            Departure_Time=dep,
+            Arrival_Time=dep + timedelta(hours=2),
+            Total_Seats=args.seats,
+            Available_Seats=args.seats,
+        )
+        s.add(flight)
+        s.commit()
+
+        for _ in range(args.bookings):
+            b = Booking(
+                Customer_ID=customer.Customer_ID,
+                Flight_ID=flight.Flight_ID,
+                Seats=random.choice([1, 1, 2]),
+                Status=BookingStatus.CREATED,
+            )
+            s.add(b)
+            s.flush()
+            s.add(Payment(
+                Customer_ID=customer.Customer_ID,
+                Booking_ID=b.Booking_ID,
+                Company_ID=company.Company_ID,
+                Amount=1000.0,
+                Gateway_Txn_ID=f"order_bench_{b.Booking_ID}_{uuid.uuid4().hex[:6]}",
+            ))
+        s.commit()
+        return flight.Flight_ID
+
+
+def capture(order_id: str):
+    for attempt in range(5):
+        try:
+            with Session(engine) as s:
+                BookingService.finalize_on_payment_captured(
+                    s, payment_id=f"pay_{order_id}", order_id=order_id
+                )
+            return True
+        except Exception:
+            # SQLite "database is locked" under heavy write contention
+            time.sleep(0.01 * (attempt + 1))
+    return False
+
+
+def main():
+    flight_id = setup()
+    with Session(engine) as s:
+        orders = s.exec(
+            select(Payment.Gateway_Txn_ID)
+            .join(Booking, Booking.Booking_ID == Payment.Booking_ID)
+            .where(Booking.Flight_ID == flight_id)
+        ).all()
+        demand = s.exec(select(func.sum(Booking.Seats)).where(Booking.Flight_ID == flight_id)).one()
+
+    # every order is captured twice to also exercise duplicate webhooks
+    work = list(orders) * 2
+    random.shuffle(work)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        results = list(pool.map(capture, work))
+    elapsed = time.perf_counter() - t0
+
+    with Session(engine) as s:
+        flight = s.get(Flight, flight_id)
+        sold = s.exec(
+            select(func.coalesce(func.sum(Booking.Seats), 0))
+            .where(Booking.Flight_ID == flight_id, Booking.Status == BookingStatus.PAID)
+        ).one()
+        refunded = s.exec(
+            select(func.count())
+            .select_from(Booking)
+            .where(Booking.Flight_ID == flight_id, Booking.Status == BookingStatus.REFUNDED)
+        ).one()
+
+    print(f"seats={args.seats} demand={demand} captures={len(work)} threads={args.threads}")
+    print(f"sold={sold} available={flight.Available_Seats} refunded_bookings={refunded} gave_up={results.count(False)}")
+    print(f"elapsed={elapsed:.2f}s throughput={len(work) / elapsed:.1f} captures/s")
+
+
+if __name__ == "__main__":
+    main()
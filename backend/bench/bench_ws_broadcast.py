@@ -0,0 +1,150 @@
+# backend/bench/bench_ws_broadcast.py
+"""
+Websocket fan-out: sequential sends vs WSManager's per-connection writers.
+
+Connects --sockets simulated sockets, --slow of which take --slow-ms per
+send, and fires --broadcasts broadcasts --interval-ms apart. "sequential"
+is the old WSManager.broadcast (await each send_text in turn); "queued" is
+the current one. Prints delivery latency (broadcast -> send_text returns)
+for the fast sockets and for all. A last run makes the slow sockets stall
+outright, with a queue of --small-queue under the "disconnect" policy,
+and shows them being dropped.
+
+The run fails unless fast sockets are delivered in less time than a
+sequential broadcast spends on the slow sockets alone, each broadcast is
+serialized once, and stalled sockets are closed.
+
+    python -m backend.bench.bench_ws_broadcast --sockets 5000 --slow 10
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+p = argparse.ArgumentParser()
+p.add_argument("--sockets", type=int, default=5000)
+p.add_argument("--slow", type=int, default=10)
+p.add_argument("--slow-ms", type=float, default=50)
+p.add_argument("--broadcasts", type=int, default=10)
+p.add_argument("--interval-ms", type=float, default=10)
+p.add_argument("--small-queue", type=int, default=4)
+args = p.parse_args()
+
+# must be set before backend.config is imported
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for k in ("SECRET_KEY", "HMAC_SECRET", "PAYMENT_AES_KEY"):
+    os.environ.setdefault(k, "bench")
+
+from backend.utils import ws_manager as ws_module  # noqa: E402
+from backend.utils.ws_manager import WSManager  # noqa: E402
+
+# broadcast payload -> time it was sent
+SENT_AT = {}
+
+
+class FakeSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.latencies = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, payload: str):
+        # every send yields to the loop, as a real socket write does
+        await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - SENT_AT[payload])
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+
+async def sequential_broadcast(clients, payload: str):
+    # the old WSManager.broadcast
+    for conns in list(clients.values()):
+        for ws in list(conns):
+            await ws.send_text(payload)
+
+
+def sockets(slow_delay: float):
+    return [FakeSocket(slow_delay if i < args.slow else 0) for i in range(args.sockets)]
+
+
+def report(name: str, socks, elapsed: float):
+    fast = [l * 1000 for s in socks if not s.delay for l in s.latencies]
+    every = [l * 1000 for s in socks for l in s.latencies]
+    p99 = statistics.quantiles(fast, n=100)[98]
+    print(f"{name:>10} {len(every):>9} {statistics.median(fast):>9.2f} {p99:>9.2f} {max(fast):>9.2f} "
+          f"{max(every):>9.2f} {elapsed:>8.2f}")
+    return p99
+
+
+async def run_sequential():
+    socks = sockets(args.slow_ms / 1000)
+    clients = {i: {ws} for i, ws in enumerate(socks)}
+    t0 = time.perf_counter()
+    for n in range(args.broadcasts):
+        payload = f'{{"type":"bench","seq":{n}}}'
+        SENT_AT[payload] = time.perf_counter()
+        # the caller is blocked until every socket, slow ones included, is done
+        await sequential_broadcast(clients, payload)
+        await asyncio.sleep(args.interval_ms / 1000)
+    return report("sequential", socks, time.perf_counter() - t0)
+
+
+async def run_queued(name: str, mgr: WSManager, slow_delay: float):
+    socks = sockets(slow_delay)
+    for i, ws in enumerate(socks):
+        await mgr.connect(i, ws)
+
+    dumps, calls = ws_module.json.dumps, []
+
+    def counting_dumps(data):
+        payload = dumps(data)
+        calls.append(payload)
+        SENT_AT[payload] = time.perf_counter()
+        return payload
+
+    ws_module.json.dumps = counting_dumps
+    t0 = time.perf_counter()
+    try:
+        for n in range(args.broadcasts):
+            await mgr.broadcast({"type": "bench", "seq": n, "run": name})
+            await asyncio.sleep(args.interval_ms / 1000)
+    finally:
+        ws_module.json.dumps = dumps
+
+    expected = args.broadcasts * args.sockets - (args.slow * args.broadcasts if mgr.slow_policy == "disconnect" else 0)
+    while sum(len(s.latencies) for s in socks) < expected and time.perf_counter() - t0 < 60:
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - t0
+
+    assert len(calls) == args.broadcasts, f"{len(calls)} serializations for {args.broadcasts} broadcasts"
+    p99 = report(name, socks, elapsed)
+    await mgr.close_all()
+    return p99, socks
+
+
+async def main():
+    print(f"sockets={args.sockets} slow={args.slow}x{args.slow_ms:.0f}ms broadcasts={args.broadcasts} "
+          f"interval={args.interval_ms:.0f}ms")
+    print(f"{'path':>10} {'delivered':>9} {'fast p50':>9} {'fast p99':>9} {'fast max':>9} {'all max':>9} {'seconds':>8}")
+    await run_sequential()
+    p99, _ = await run_queued("queued", WSManager(), args.slow_ms / 1000)
+
+    small = WSManager(queue_size=args.small_queue, slow_policy="disconnect")
+    # stalled: a send that never completes within the run
+    _, socks = await run_queued("disconnect", small, 3600)
+    print(f"disconnect run: {small.stats()}")
+
+    slow_total = args.slow * args.slow_ms
+    assert p99 < slow_total, f"fast sockets waited {p99:.1f} ms, the slow sockets alone take {slow_total:.0f} ms"
+    if args.broadcasts > args.small_queue + 1:
+        assert all(s.closed_with == ws_module.SLOW_CLOSE_CODE for s in socks[: args.slow]), "slow sockets kept"
+    print("OK: slow sockets no longer delay the others; one serialization per broadcast")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
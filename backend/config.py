@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -11,6 +12,25 @@ load_dotenv(BASE_DIR / ".env")
 # -----------------------------
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# asyncio driver URL for the async read path; derived from DATABASE_URL
+# (pymysql -> aiomysql, sqlite -> aiosqlite) when not set explicitly
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# optional read replica for uncached read-only GET routes (history,
+# inbox, flight export); unset means reads go to the primary. It must be
+# a real replica kept in sync by the database: the app never creates or
+# writes its schema. Cached responses and the flight inventory are
+# always filled from the primary so a lagging replica cannot re-cache a
+# write that was just invalidated.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+ASYNC_DATABASE_REPLICA_URL = os.getenv("ASYNC_DATABASE_REPLICA_URL")
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
 # -----------------------------
 # JWT Auth
 # -----------------------------
@@ -21,6 +41,10 @@ if not SECRET_KEY:
 JWT_ALGO = "HS256"
 JWT_EXP_HOURS = 24
 JWT_ISSUER = "airnova-api"
+# verified tokens kept in memory until they expire
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+# how often each process reloads the revocation list
+AUTH_REVOCATION_SYNC_SECONDS = float(os.getenv("AUTH_REVOCATION_SYNC_SECONDS", "10"))
 
 # -----------------------------
 # HMAC API Security
@@ -49,3 +73,116 @@ USE_FAKE_PAYMENTS = os.getenv("USE_FAKE_PAYMENTS", "false").lower() in ("1", "tr
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
 RAZORPAY_WEBHOOK_SECRET = os.getenv("RAZORPAY_WEBHOOK_SECRET")
+
+# -----------------------------
+# Flight inventory read model
+# -----------------------------
+INVENTORY_TTL_SECONDS = int(os.getenv("INVENTORY_TTL_SECONDS", "60"))
+INVENTORY_MAX_ROUTES = int(os.getenv("INVENTORY_MAX_ROUTES", "512"))
+INVENTORY_MAX_FLIGHTS = int(os.getenv("INVENTORY_MAX_FLIGHTS", "10000"))
+
+# -----------------------------
+# Connecting itineraries
+# -----------------------------
+ROUTE_GRAPH_TTL_SECONDS = int(os.getenv("ROUTE_GRAPH_TTL_SECONDS", "300"))
+CONNECTION_BUDGET_MS = int(os.getenv("CONNECTION_BUDGET_MS", "150"))
+
+# -----------------------------
+# Background workers
+# -----------------------------
+PRICE_ALERT_INTERVAL_SECONDS = float(os.getenv("PRICE_ALERT_INTERVAL_SECONDS", "5"))
+FARE_CALENDAR_INTERVAL_SECONDS = float(os.getenv("FARE_CALENDAR_INTERVAL_SECONDS", "2"))
+PAYMENT_OUTBOX_INTERVAL_SECONDS = float(os.getenv("PAYMENT_OUTBOX_INTERVAL_SECONDS", "1"))
+PAYMENT_OUTBOX_BATCH = int(os.getenv("PAYMENT_OUTBOX_BATCH", "100"))
+PAYMENT_OUTBOX_MAX_ATTEMPTS = int(os.getenv("PAYMENT_OUTBOX_MAX_ATTEMPTS", "5"))
+# failed gateway calls wait base * 2^(attempts - 1), capped at max
+PAYMENT_OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("PAYMENT_OUTBOX_RETRY_BASE_SECONDS", "2"))
+PAYMENT_OUTBOX_RETRY_MAX_SECONDS = float(os.getenv("PAYMENT_OUTBOX_RETRY_MAX_SECONDS", "300"))
+# a claimed row whose relay died is picked up again after this long
+PAYMENT_OUTBOX_LEASE_SECONDS = float(os.getenv("PAYMENT_OUTBOX_LEASE_SECONDS", "60"))
+WEBHOOK_INTERVAL_SECONDS = float(os.getenv("WEBHOOK_INTERVAL_SECONDS", "1"))
+WEBHOOK_BATCH = int(os.getenv("WEBHOOK_BATCH", "200"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "5"))
+
+# -----------------------------
+# HTTP response cache
+# -----------------------------
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+
+# -----------------------------
+# Seat holds
+# -----------------------------
+SEAT_HOLD_TTL_SECONDS = int(os.getenv("SEAT_HOLD_TTL_SECONDS", "900"))
+SEAT_HOLD_SWEEP_SECONDS = float(os.getenv("SEAT_HOLD_SWEEP_SECONDS", "30"))
+SEAT_HOLD_SWEEP_BATCH = int(os.getenv("SEAT_HOLD_SWEEP_BATCH", "500"))
+
+# -----------------------------
+# Idempotency keys
+# -----------------------------
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_CLEANUP_SECONDS = float(os.getenv("IDEMPOTENCY_CLEANUP_SECONDS", "300"))
+
+# -----------------------------
+# Seat maps
+# -----------------------------
+# seat letters per row, "-" marks an aisle
+SEAT_LAYOUT = os.getenv("SEAT_LAYOUT", "ABC-DEF")
+
+# -----------------------------
+# Disruption handling
+# -----------------------------
+# alternatives for a cancelled flight depart at most this long after it
+DISRUPTION_WINDOW_HOURS = int(os.getenv("DISRUPTION_WINDOW_HOURS", "48"))
+DISRUPTION_RETRIES = int(os.getenv("DISRUPTION_RETRIES", "3"))
+
+# -----------------------------
+# Fares
+# -----------------------------
+# defaults; a flight's Seat_Pricing may override any of these by key
+FARE_HIGH_ROWS = int(os.getenv("FARE_HIGH_ROWS", "4"))        # rows 1..4 priced "high"
+FARE_LOW_ROWS = int(os.getenv("FARE_LOW_ROWS", "14"))         # rows 5..14 "low", the rest "free"
+FARE_WINDOW_SURCHARGE = float(os.getenv("FARE_WINDOW_SURCHARGE", "400"))
+FARE_AISLE_SURCHARGE = float(os.getenv("FARE_AISLE_SURCHARGE", "250"))
+FARE_BAGGAGE_PER_KG = float(os.getenv("FARE_BAGGAGE_PER_KG", "300"))
+FARE_TABLE_CACHE = int(os.getenv("FARE_TABLE_CACHE", "4096"))
+FARE_MAX_QUOTES = int(os.getenv("FARE_MAX_QUOTES", "5000"))
+
+# -----------------------------
+# Password hashing
+# -----------------------------
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "8192"))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "1"))
+# "thread" (argon2/bcrypt release the GIL) or "process"
+PASSWORD_POOL = os.getenv("PASSWORD_POOL", "thread")
+PASSWORD_POOL_WORKERS = int(os.getenv("PASSWORD_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# hashes running + waiting before new ones are refused with 503
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", "64"))
+
+# -----------------------------
+# Customer import
+# -----------------------------
+CUSTOMER_IMPORT_BATCH = int(os.getenv("CUSTOMER_IMPORT_BATCH", "1000"))
+# hashing processes per import; logins keep their own pool
+CUSTOMER_IMPORT_WORKERS = int(os.getenv("CUSTOMER_IMPORT_WORKERS", str(os.cpu_count() or 1)))
+CUSTOMER_IMPORT_MAX_BYTES = int(os.getenv("CUSTOMER_IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+# uploads and per-row error files
+CUSTOMER_IMPORT_DIR = os.getenv("CUSTOMER_IMPORT_DIR", os.path.join(tempfile.gettempdir(), "airnova-imports"))
+# finished jobs kept for the progress endpoint
+CUSTOMER_IMPORT_KEEP_JOBS = int(os.getenv("CUSTOMER_IMPORT_KEEP_JOBS", "50"))
+
+# -----------------------------
+# Realtime websockets
+# -----------------------------
+# messages waiting per connection before the slow-consumer policy applies
+WS_QUEUE_SIZE = int(os.getenv("WS_QUEUE_SIZE", "256"))
+# "drop_oldest" (keep the newest messages) or "disconnect"
+WS_SLOW_POLICY = os.getenv("WS_SLOW_POLICY", "drop_oldest")
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", "5"))
+# "local" (one process) or "unix": workers share messages through a
+# broker on a Unix socket, run by whichever worker holds its lock file
+REALTIME_PUBSUB = os.getenv("REALTIME_PUBSUB", "local")
+REALTIME_SOCKET = os.getenv("REALTIME_SOCKET", os.path.join(tempfile.gettempdir(), "airnova-realtime.sock"))
+# bytes the broker buffers for one worker before dropping it
+REALTIME_PEER_BUFFER = int(os.getenv("REALTIME_PEER_BUFFER", str(4 * 1024 * 1024)))
@@ -1,12 +1,173 @@
 # backend/db.py
+import threading
+import time
+from collections import deque
+from typing import Dict
+
 from sqlmodel import SQLModel, create_engine, Session
-from backend.config import DATABASE_URL
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from backend.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URL,
+    ASYNC_DATABASE_REPLICA_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_ECHO,
+)
 from backend.model import Customer, Company, Flight, Booking, Payment
 
-# DATABASE ENGINE
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
 
-# CREATE TABLES
+# POOL INSTRUMENTATION
+class PoolStats:
+    """Checkout wait times of one pool (last 1024 kept for percentiles)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = deque(maxlen=1024)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+
+    def record(self, wait: float, ok: bool = True):
+        with self._lock:
+            if not ok:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.waits.append(wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self.waits)
+            p99 = recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else 0.0
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_p99_ms": round(p99 * 1000, 3),
+                "wait_max_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    # QueuePool._do_get blocks while the pool is exhausted; timing it
+    # measures exactly how long a request waited for a connection
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.record(time.perf_counter() - t0, ok=False)
+            raise
+        self.stats.record(time.perf_counter() - t0)
+        return conn
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_kwargs(url: str, poolclass) -> dict:
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith("sqlite:")):
+        return {}  # in-memory SQLite keeps SQLAlchemy's single-connection pool
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def _make_engine(url: str) -> Engine:
+    return create_engine(url, echo=DB_ECHO, pool_pre_ping=True, **_pool_kwargs(url, TimedQueuePool))
+
+
+# DATABASE ENGINES (primary for writes, replica for read-only routes)
+engine = _make_engine(DATABASE_URL)
+read_engine = _make_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else engine
+
+# ASYNC ENGINES (created on first use so the async driver stays optional)
+_ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+_async_engines: Dict[str, AsyncEngine] = {}
+_async_lock = threading.Lock()
+
+
+def async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def get_async_engine(read: bool = False) -> AsyncEngine:
+    if read and (ASYNC_DATABASE_REPLICA_URL or DATABASE_REPLICA_URL):
+        name, url = "read", ASYNC_DATABASE_REPLICA_URL or async_url(DATABASE_REPLICA_URL)
+    else:
+        name, url = "primary", ASYNC_DATABASE_URL or async_url(DATABASE_URL)
+
+    with _async_lock:
+        e = _async_engines.get(name)
+        if e is None:
+            e = create_async_engine(
+                url,
+                echo=DB_ECHO,
+                pool_pre_ping=True,
+                **_pool_kwargs(url, TimedAsyncQueuePool),
+            )
+            _async_engines[name] = e
+        return e
+
+
+def _describe(pool) -> dict:
+    out = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        size, overflow, checked_out = pool.size(), pool.overflow(), pool.checkedout()
+        capacity = size + max(pool._max_overflow, 0)
+        out.update({
+            "size": size,
+            "checked_out": checked_out,
+            "checked_in": pool.checkedin(),
+            "overflow": overflow,
+            "utilization": round(checked_out / capacity, 3) if capacity else None,
+        })
+    if isinstance(pool, _TimedPoolMixin):
+        out.update(pool.stats.snapshot())
+    return out
+
+
+def pool_stats() -> dict:
+    stats = {"primary": _describe(engine.pool)}
+    if read_engine is not engine:
+        stats["read"] = _describe(read_engine.pool)
+    for name, e in _async_engines.items():
+        stats[f"async_{name}"] = _describe(e.sync_engine.pool)
+    return stats
+
+# CREATE TABLES (primary only; a replica gets the schema from replication)
 def create_db_and_tables():
     print("Creating tables in the database...")
     SQLModel.metadata.create_all(engine)
@@ -17,6 +178,20 @@ def get_session():
     with Session(engine) as session:
         yield session
 
+# READ SESSION GENERATOR (replica; never commit through it)
+def get_read_session():
+    with Session(read_engine) as session:
+        yield session
+
+# ASYNC SESSION GENERATOR (hot read paths; no threadpool hop per request)
+async def get_async_session():
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+async def get_async_read_session():
+    async with AsyncSession(get_async_engine(read=True), expire_on_commit=False) as session:
+        yield session
+
 # RUN SCRIPT DIRECTLY
 if __name__ == "__main__":
     create_db_and_tables()
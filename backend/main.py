@@ -2,12 +2,16 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.security import HTTPBearer
 from fastapi.openapi.utils import get_openapi
 
 from .db import create_db_and_tables
+from .services.passwords import passwords, PasswordServiceBusy
+from .services.customer_import import importer
+from .utils import workers
+from .utils.ws_manager import ws_mgr
 
 # Routers
 from .routes import auth
@@ -24,6 +28,9 @@ from .routes.payments import router as payments_router
 from fastapi.middleware.cors import CORSMiddleware
 from .routes import price_signal
 from .routes.travellers import router as travellers_router
+from .routes.admin import router as admin_router
+from .routes.fares import router as fares_router
+from .routes.realtime import router as realtime_router
 
 
 # ✅ DEFINE SECURITY FIRST
@@ -40,6 +47,31 @@ app = FastAPI(
 @app.on_event("startup")
 def startup_event():
     create_db_and_tables()
+    workers.start_all()
+
+
+@app.on_event("startup")
+async def realtime_startup():
+    # the pub/sub backend's tasks live on the server's event loop
+    await ws_mgr.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    workers.stop_all()
+    passwords.shutdown()
+    importer.shutdown()
+
+
+@app.on_event("shutdown")
+async def realtime_shutdown():
+    await ws_mgr.stop()
+
+
+@app.exception_handler(PasswordServiceBusy)
+async def password_service_busy(request: Request, exc: PasswordServiceBusy):
+    # shed logins/registrations fast instead of queueing CPU work
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 @app.get("/", response_class=HTMLResponse, tags=["Home"])
 def homepage():
@@ -180,6 +212,9 @@ app.include_router(weather_router)
 app.include_router(payments_router)
 app.include_router(price_signal.router)
 app.include_router(travellers_router)        # ✅ ADD THIS
+app.include_router(admin_router)
+app.include_router(fares_router)
+app.include_router(realtime_router)
 
 
 # ✅ Swagger JWT setup
@@ -213,5 +248,6 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
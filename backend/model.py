@@ -1,8 +1,8 @@
 from typing import Optional, List, Dict
-from datetime import datetime
+from datetime import datetime, date
 from enum import Enum
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, Index, LargeBinary
 from sqlalchemy import JSON as SAJSON
 
 
@@ -49,6 +49,10 @@ class Company(SQLModel, table=True):
 # =========================
 class Customer(SQLModel, table=True):
     __tablename__ = "customer"
+    __table_args__ = (
+        # login, registration and import duplicate checks
+        Index("ix_customer_email", "Email"),
+    )
 
     Customer_ID: Optional[int] = Field(default=None, primary_key=True)
     Name: str
@@ -66,6 +70,14 @@ class Customer(SQLModel, table=True):
 # =========================
 class Flight(SQLModel, table=True):
     __tablename__ = "flight"
+    __table_args__ = (
+        # search: route + departure window, keyset on (Departure_Time, Flight_ID)
+        Index("ix_flight_route_departure", "Dept_Location", "Arr_Location", "Departure_Time"),
+        # search sorted by fare on a route
+        Index("ix_flight_route_price", "Dept_Location", "Arr_Location", "Price_Per_Seat"),
+        # date-only searches (no route given)
+        Index("ix_flight_departure", "Departure_Time"),
+    )
 
     Flight_ID: Optional[int] = Field(default=None, primary_key=True)
     Company_ID: int = Field(foreign_key="company.Company_ID")
@@ -106,6 +118,12 @@ class Flight(SQLModel, table=True):
 # =========================
 class Booking(SQLModel, table=True):
     __tablename__ = "booking"
+    __table_args__ = (
+        # /bookings/my, customer history
+        Index("ix_booking_customer", "Customer_ID", "Booking_ID"),
+        # disruption handling: a flight's bookings by status
+        Index("ix_booking_flight_status", "Flight_ID", "Status"),
+    )
 
     Booking_ID: Optional[int] = Field(default=None, primary_key=True)
     Customer_ID: int = Field(foreign_key="customer.Customer_ID")
@@ -117,6 +135,9 @@ class Booking(SQLModel, table=True):
     Razorpay_Order_ID: Optional[str] = None
     Razorpay_Payment_ID: Optional[str] = None
 
+    # chosen seat labels ("12A"); None when no seats were picked
+    Seat_Labels: Optional[List] = Field(default=None, sa_column=Column(SAJSON))
+
     Created_At: datetime = Field(default_factory=datetime.utcnow)
 
     customer: Optional["Customer"] = Relationship(back_populates="bookings")
@@ -124,11 +145,88 @@ class Booking(SQLModel, table=True):
     travellers: List["Traveller"] = Relationship(back_populates="booking")
 
 
+# =========================
+# SEAT MAP
+# =========================
+class FlightSeatMap(SQLModel, table=True):
+    __tablename__ = "flight_seat_map"
+
+    Flight_ID: int = Field(foreign_key="flight.Flight_ID", primary_key=True)
+    Layout: str = Field(max_length=32)
+    Rows: int
+    Seats: int
+    # one bit per seat, seat i at byte i // 8, bit i % 8
+    Occupied: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    Version: int = 0
+    Updated_At: datetime = Field(default_factory=datetime.utcnow)
+
+
+# =========================
+# SEAT HOLD
+# =========================
+class SeatHold(SQLModel, table=True):
+    __tablename__ = "seat_hold"
+    __table_args__ = (
+        # sweeper: expired holds in expiry order
+        Index("ix_seat_hold_expires", "Expires_At"),
+    )
+
+    Hold_ID: Optional[int] = Field(default=None, primary_key=True)
+    Booking_ID: int = Field(foreign_key="booking.Booking_ID", unique=True)
+    Flight_ID: int = Field(foreign_key="flight.Flight_ID")
+    Seats: int
+    Expires_At: datetime
+    Created_At: datetime = Field(default_factory=datetime.utcnow)
+
+
+# =========================
+# IDEMPOTENCY RECORD
+# =========================
+class IdempotencyRecord(SQLModel, table=True):
+    __tablename__ = "idempotency_record"
+    __table_args__ = (
+        Index("ux_idempotency_customer_key", "Customer_ID", "Key", unique=True),
+        Index("ix_idempotency_expires", "Expires_At"),
+    )
+
+    Record_ID: Optional[int] = Field(default=None, primary_key=True)
+    Customer_ID: int = Field(foreign_key="customer.Customer_ID")
+    Key: str = Field(max_length=128)
+    Request_Hash: str = Field(max_length=64)
+    Booking_ID: Optional[int] = Field(default=None, foreign_key="booking.Booking_ID")
+    # None while the first request is still running
+    Response: Optional[Dict] = Field(default=None, sa_column=Column(SAJSON))
+    Created_At: datetime = Field(default_factory=datetime.utcnow)
+    Expires_At: datetime
+
+
+# =========================
+# REVOKED TOKEN
+# =========================
+class RevokedToken(SQLModel, table=True):
+    __tablename__ = "revoked_token"
+    __table_args__ = (
+        # sync loads live revocations; cleanup drops the rest
+        Index("ix_revoked_token_expires", "Expires_At"),
+    )
+
+    Jti: str = Field(primary_key=True, max_length=64)
+    Customer_ID: Optional[int] = Field(default=None, foreign_key="customer.Customer_ID")
+    # the token's own expiry; the row is useless after it
+    Expires_At: datetime
+    Revoked_At: datetime = Field(default_factory=datetime.utcnow)
+
+
 # =========================
 # PAYMENT
 # =========================
 class Payment(SQLModel, table=True):
     __tablename__ = "payment"
+    __table_args__ = (
+        Index("ix_payment_booking", "Booking_ID"),
+        # webhook capture: order id -> payment
+        Index("ix_payment_gateway_txn", "Gateway_Txn_ID"),
+    )
 
     Payment_ID: Optional[int] = Field(default=None, primary_key=True)
 
@@ -151,11 +249,67 @@ class Payment(SQLModel, table=True):
     company: Optional["Company"] = Relationship(back_populates="payments")
 
 
+# =========================
+# PAYMENT OUTBOX
+# =========================
+class PaymentOutbox(SQLModel, table=True):
+    __tablename__ = "payment_outbox"
+    __table_args__ = (
+        # relay: oldest pending rows first
+        Index("ix_payment_outbox_status", "Status", "Outbox_ID"),
+    )
+
+    Outbox_ID: Optional[int] = Field(default=None, primary_key=True)
+    Payment_ID: int = Field(foreign_key="payment.Payment_ID")
+    Booking_ID: int = Field(foreign_key="booking.Booking_ID")
+
+    Amount_Paise: int
+    Currency: str = "INR"
+    Notes: Optional[Dict] = Field(default=None, sa_column=Column(SAJSON))
+
+    Status: str = "pending"   # pending | sending | sent | failed
+    Attempts: int = 0
+    Last_Error: Optional[str] = None
+    # pending: retry not before; sending: claim expires
+    Next_Attempt_At: Optional[datetime] = None
+    Created_At: datetime = Field(default_factory=datetime.utcnow)
+    Processed_At: Optional[datetime] = None
+
+
+# =========================
+# WEBHOOK EVENT
+# =========================
+class WebhookEvent(SQLModel, table=True):
+    __tablename__ = "webhook_event"
+    __table_args__ = (
+        # a redelivered event is dropped on insert
+        Index("ux_webhook_event_payment", "Event", "Gateway_Payment_ID", unique=True),
+        # worker: oldest pending events first
+        Index("ix_webhook_event_status", "Status", "Event_ID"),
+    )
+
+    Event_ID: Optional[int] = Field(default=None, primary_key=True)
+    Event: str = Field(max_length=64)
+    Gateway_Payment_ID: Optional[str] = Field(default=None, max_length=64)
+    Order_ID: Optional[str] = Field(default=None, max_length=64)
+    Payload: Optional[Dict] = Field(default=None, sa_column=Column(SAJSON))
+
+    # pending | processed | duplicate | ignored | payment_failed | failed
+    Status: str = Field(default="pending", max_length=16)
+    Attempts: int = 0
+    Last_Error: Optional[str] = None
+    Received_At: datetime = Field(default_factory=datetime.utcnow)
+    Processed_At: Optional[datetime] = None
+
+
 # =========================
 # TRAVELLER
 # =========================
 class Traveller(SQLModel, table=True):
     __tablename__ = "traveller"
+    __table_args__ = (
+        Index("ix_traveller_booking", "Booking_ID"),
+    )
 
     Traveller_ID: Optional[int] = Field(default=None, primary_key=True)
     Booking_ID: int = Field(foreign_key="booking.Booking_ID")
@@ -207,3 +361,23 @@ class Notification(SQLModel, table=True):
     Payload: Optional[Dict] = Field(default=None, sa_column=Column(SAJSON))
     Sent: bool = False
     Created_At: datetime = Field(default_factory=datetime.utcnow)
+
+
+# =========================
+# FARE CALENDAR (materialized)
+# =========================
+class FareCalendarDay(SQLModel, table=True):
+    __tablename__ = "fare_calendar_day"
+    __table_args__ = (
+        Index("ux_fare_calendar_route_day", "Dept_Location", "Arr_Location", "Day", unique=True),
+    )
+
+    Calendar_ID: Optional[int] = Field(default=None, primary_key=True)
+    Dept_Location: str
+    Arr_Location: str
+    Day: date
+
+    Min_Price: float
+    Seats_Available: int = 0
+    Flights: int = 0
+    Updated_At: datetime = Field(default_factory=datetime.utcnow)
@@ -1,33 +1,54 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlmodel import Session, select
-from backend.db import get_session
+from backend.db import get_read_session, get_async_session, pool_stats
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.model import Customer, UserRole
-from passlib.context import CryptContext
-import jwt
-from backend.config import SECRET_KEY
-from datetime import datetime, timedelta
 from backend.services.crypto import decrypt
+from backend.services.flight_inventory import inventory
+from backend.services.route_graph import route_graph
+from backend.services.price_alert_evaluator import evaluator
+from backend.services.fare_calendar import calendar_updater
+from backend.services.seat_holds import seat_holds
+from backend.services.idempotency import idempotency
+from backend.services.payment_outbox import relay
+from backend.services.webhook_queue import webhook_queue
+from backend.services.fare_engine import fare_engine
+from backend.services.passwords import passwords
+from backend.services.tokens import tokens
+from backend.utils.response_cache import response_cache
+from backend.utils.ws_manager import ws_mgr
+from backend.routes.auth_dependency import get_current_user
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def require_admin(user: dict = Depends(get_current_user)):
+    if user.get("role") != UserRole.ADMIN.value:
+        raise HTTPException(status_code=403, detail="Admin access only")
+    return user
+
 
 @router.post("/login")
-def admin_login(email: str, password: str, session: Session = Depends(get_session)):
-    user = session.exec(select(Customer).where(Customer.Email == email)).first()
+async def admin_login(email: str, password: str, session: AsyncSession = Depends(get_async_session)):
+    user = (await session.exec(select(Customer).where(Customer.Email == email))).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not user or not pwd.verify(password, user.Password):
+    valid, new_hash = await passwords.verify(password, user.Password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     if user.Role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Admin access only")
 
-    token = jwt.encode({
-        "id": user.Customer_ID,
-        "role": "admin",
-        "exp": datetime.utcnow() + timedelta(hours=24)
-    }, SECRET_KEY, algorithm="HS256")
+    # bcrypt (or weaker Argon2) hashes move to the current settings
+    if new_hash:
+        user.Password = new_hash
+        session.add(user)
+        await session.commit()
+
+    token = tokens.create(user.Customer_ID, UserRole.ADMIN.value)
 
     return {"token": token, "role": "admin"}
 
@@ -36,3 +57,76 @@ def reveal(meta: dict):
         "card": decrypt(meta["card_cipher"], meta["card_nonce"]),
         "cvv": decrypt(meta["cvv_cipher"], meta["cvv_nonce"]),
     }
+
+
+# =========================
+# OPERATIONAL STATS
+# =========================
+@router.get("/stats/inventory", dependencies=[Depends(require_admin)])
+def inventory_stats():
+    return inventory.stats()
+
+
+@router.get("/stats/route-graph", dependencies=[Depends(require_admin)])
+def route_graph_stats():
+    return route_graph.stats()
+
+
+@router.get("/stats/price-alerts", dependencies=[Depends(require_admin)])
+def price_alert_stats():
+    return evaluator.stats()
+
+
+@router.get("/stats/fare-calendar", dependencies=[Depends(require_admin)])
+def fare_calendar_stats():
+    return calendar_updater.stats()
+
+
+@router.get("/stats/response-cache", dependencies=[Depends(require_admin)])
+def response_cache_stats():
+    return response_cache.stats()
+
+
+@router.get("/stats/db-pools", dependencies=[Depends(require_admin)])
+def db_pool_stats():
+    return pool_stats()
+
+
+@router.get("/stats/seat-holds", dependencies=[Depends(require_admin)])
+def seat_hold_stats(session: Session = Depends(get_read_session)):
+    return seat_holds.stats(session)
+
+
+@router.get("/stats/idempotency", dependencies=[Depends(require_admin)])
+def idempotency_stats():
+    return idempotency.stats()
+
+
+@router.get("/stats/payment-outbox", dependencies=[Depends(require_admin)])
+def payment_outbox_stats():
+    return relay.stats()
+
+
+@router.get("/stats/webhooks", dependencies=[Depends(require_admin)])
+def webhook_stats(session: Session = Depends(get_read_session)):
+    return webhook_queue.stats(session)
+
+
+@router.get("/stats/fares", dependencies=[Depends(require_admin)])
+def fare_stats():
+    return fare_engine.stats()
+
+
+@router.get("/stats/passwords", dependencies=[Depends(require_admin)])
+def password_stats():
+    return passwords.stats()
+
+
+@router.get("/stats/auth", dependencies=[Depends(require_admin)])
+def auth_stats():
+    return tokens.stats()
+
+
+@router.get("/stats/realtime", dependencies=[Depends(require_admin)])
+def realtime_stats():
+    return ws_mgr.stats()
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlmodel import Session, select
+from sqlmodel import select
 from pydantic import BaseModel
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from sqlmodel.ext.asyncio.session import AsyncSession
+from fastapi.security import HTTPAuthorizationCredentials
 import hashlib
-import jwt
-import os
 
-from backend.db import get_session
+from backend.db import get_async_session
 from backend.model import Customer, UserRole
+from backend.services.passwords import passwords
+from backend.services.tokens import tokens, InvalidToken
+from backend.routes.auth_dependency import security
 
 # =========================
 # CONFIG
@@ -16,18 +17,6 @@ from backend.model import Customer, UserRole
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-SECRET = os.getenv("SECRET_KEY", "change-me")
-JWT_ALGO = "HS256"
-JWT_EXP_HOURS = 24
-
-pwd = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto",
-    argon2__time_cost=2,
-    argon2__memory_cost=8192,
-    argon2__parallelism=1
-)
-
 # =========================
 # SCHEMAS
 # =========================
@@ -54,68 +43,58 @@ def sha256_hash(pw: str) -> str:
 
 def create_jwt(user: Customer) -> str:
     """Create signed JWT token."""
-    return jwt.encode(
-        {
-            "id": user.Customer_ID,
-            "role": user.Role.value,
-            "exp": datetime.utcnow() + timedelta(hours=JWT_EXP_HOURS),
-        },
-        SECRET,
-        algorithm=JWT_ALGO,
-    )
+    return tokens.create(user.Customer_ID, user.Role.value)
 
 # =========================
 # ROUTES
 # =========================
 
 @router.post("/register")
-def register(payload: RegisterIn, session: Session = Depends(get_session)):
-    if session.exec(
+async def register(payload: RegisterIn, session: AsyncSession = Depends(get_async_session)):
+    if (await session.exec(
         select(Customer).where(Customer.Email == payload.email)
-    ).first():
+    )).first():
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = Customer(
         Name=payload.name,
         Email=payload.email,
         Phone=payload.phone,
-        Password=pwd.hash(payload.password),   # Argon2
+        Password=await passwords.hash(payload.password),   # Argon2
         Role=UserRole.CUSTOMER,
     )
 
     session.add(user)
-    session.commit()
+    await session.commit()
 
     return {"message": "Registered successfully"}
 
 
 @router.post("/login")
-def login(payload: LoginIn, session: Session = Depends(get_session)):
-    user = session.exec(
+async def login(payload: LoginIn, session: AsyncSession = Depends(get_async_session)):
+    user = (await session.exec(
         select(Customer).where(Customer.Email == payload.email)
-    ).first()
+    )).first()
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    valid = False
-
-    # Argon2 verification
-    try:
-        valid = pwd.verify(payload.password, user.Password)
-    except Exception:
-        valid = False
+    # Argon2 (or legacy bcrypt) verification, off the event loop
+    valid, new_hash = await passwords.verify(payload.password, user.Password)
 
     # Legacy SHA256 fallback + auto-upgrade
     if not valid and sha256_hash(payload.password) == user.Password:
         valid = True
-        user.Password = pwd.hash(payload.password)
-        session.add(user)
-        session.commit()
+        new_hash = await passwords.hash(payload.password)
 
     if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    if new_hash:
+        user.Password = new_hash
+        session.add(user)
+        await session.commit()
+
     token = create_jwt(user)
 
     return {
@@ -126,3 +105,19 @@ def login(payload: LoginIn, session: Session = Depends(get_session)):
     "role": user.Role.value
 }
 
+
+@router.post("/logout")
+async def logout(
+    creds: HTTPAuthorizationCredentials = Depends(security),
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        revoked = await tokens.revoke(session, creds.credentials)
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    if not revoked:
+        # issued before tokens carried a jti; it lapses at its exp
+        raise HTTPException(status_code=400, detail="Token cannot be revoked")
+
+    return {"message": "Logged out"}
@@ -1,7 +1,7 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-import jwt
-import os
+
+from backend.services.tokens import tokens, InvalidToken
 
 # =========================
 # CONFIG
@@ -9,41 +9,19 @@ import os
 
 security = HTTPBearer(scheme_name="BearerAuth", auto_error=True)
 
-SECRET = os.getenv("SECRET_KEY", "change-me")
-ALGO = "HS256"
-
 # =========================
 # DEPENDENCY
 # =========================
 
-def get_current_user(
+async def get_current_user(
     creds: HTTPAuthorizationCredentials = Depends(security)
 ):
-    token = creds.credentials
-
+    # async: resolved on the event loop, and a cached token costs one
+    # dict lookup instead of a signature check per request
     try:
-        payload = jwt.decode(token, SECRET, algorithms=[ALGO])
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token expired",
-        )
-    except jwt.InvalidTokenError:
+        return tokens.verify(creds.credentials)
+    except InvalidToken as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
+            detail=str(e),
         )
-
-    # Backward compatible: supports both `id` and `user_id`
-    user_id = payload.get("user_id") or payload.get("id")
-
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token payload",
-        )
-
-    return {
-        "user_id": user_id,
-        "role": payload.get("role"),
-    }
@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, Header, Body
-from sqlmodel import Session, select
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Header, Body, Query, Request, Response
+from sqlmodel import Session
+from typing import List, Optional
 import json
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 
-from backend.db import get_session
+from backend.db import get_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.model import Booking, Flight, BookingStatus
-from backend.routes.auth_dependency import get_current_user, security
-from backend.services.booking_service import BookingService
+from backend.routes.auth_dependency import get_current_user
+from backend.services.booking_service import BookingService, NotFound
+from backend.services.idempotency import IdempotencyConflict
+from backend.services.booking_list import BookingListService, MAX_PAGE_SIZE
+from backend.services.webhook_queue import webhook_queue
 from backend.services.payment_service import PaymentService
 from backend.config import RAZORPAY_WEBHOOK_SECRET, USE_FAKE_PAYMENTS
 
@@ -21,36 +25,45 @@ router = APIRouter(prefix="/bookings", tags=["Bookings"])
 class CreateBookingIn(BaseModel):
     flight_id: int
     seats: int = 1
-
-
-class FakeWebhook(BaseModel):
-    event: str
-    payload: dict
+    selected_seats: Optional[List[str]] = None
+    extra_baggage_kg: int = 0
 
 
 # =========================
 # CREATE BOOKING + ORDER
 # =========================
-@router.post("", dependencies=[Depends(security)])
+@router.post("")
 def create_booking(
     body: CreateBookingIn = Body(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     user: dict = Depends(get_current_user),
     session: Session = Depends(get_session),
 ):
-    flight = session.get(Flight, body.flight_id)
-    if not flight:
-        raise HTTPException(404, "Flight not found")
-
-    result = BookingService.create_razorpay_order(
-        session=session,
-        customer_id=user["user_id"],
-        flight_id=body.flight_id,
-        seats=body.seats,
-    )
-
+    # a replay with Idempotency-Key skips the flight lookup entirely,
+    # so a missing flight is reported by the service (NotFound)
+    try:
+        result = BookingService.create_razorpay_order(
+            session=session,
+            customer_id=user["user_id"],
+            flight_id=body.flight_id,
+            seats=body.seats,
+            selected_seats=body.selected_seats,
+            extra_baggage_kg=body.extra_baggage_kg,
+            idempotency_key=idempotency_key,
+        )
+    except IdempotencyConflict as e:
+        raise HTTPException(409, str(e))
+    except NotFound as e:
+        raise HTTPException(404, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    # order_id is None until the payment outbox relay has created the
+    # gateway order; poll /payments/by-booking/{booking_id} for it
     return {
         "booking_id": result["booking_id"],
         "order_id": result["order_id"],
+        "order_status": result.get("order_status", "created"),
         "amount": result["amount"],
         "currency": result["currency"],
     }
@@ -59,30 +72,36 @@ def create_booking(
 # =========================
 # GET MY BOOKINGS
 # =========================
-@router.get("/my", dependencies=[Depends(security)])
-def my_bookings(
+@router.get("/my")
+async def my_bookings(
+    response: Response,
+    when: str = "all",
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    rows = session.exec(
-        select(Booking, Flight)
-        .join(Flight, Flight.Flight_ID == Booking.Flight_ID)
-        .where(Booking.Customer_ID == user["user_id"])
-    ).all()
-
-    return [
-        {
-            "booking": booking,
-            "flight": flight
-        }
-        for booking, flight in rows
-    ]
+    """
+    One page of the customer's bookings with flight, payment and
+    travellers, from one query. `when` is all | upcoming | past; the
+    next page is reached through the X-Next-Cursor header.
+    """
+    try:
+        q = BookingListService.build_query(user["user_id"], when, limit, cursor, datetime.utcnow())
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    rows = (await session.execute(q)).all()
+    entries, next_cursor = BookingListService.shape(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
 
 
 # =========================
 # CANCEL BOOKING (24H RULE)
 # =========================
-@router.post("/{booking_id}/cancel", dependencies=[Depends(security)])
+@router.post("/{booking_id}/cancel")
 def cancel_booking(
     booking_id: int,
     user: dict = Depends(get_current_user),
@@ -106,12 +125,10 @@ def cancel_booking(
         )
 
     # ✅ Allow cancellation even if PAID
-    booking.Status = BookingStatus.CANCELLED
-    flight.Available_Seats += booking.Seats
-
-    session.add(booking)
-    session.add(flight)
-    session.commit()
+    try:
+        BookingService.cancel(session, booking, flight)
+    except ValueError as e:
+        raise HTTPException(409, str(e))
 
     return {
         "status": "cancelled",
@@ -124,11 +141,12 @@ def cancel_booking(
 # =========================
 @router.post("/webhook")
 async def razorpay_webhook(
-    data: FakeWebhook,
+    request: Request,
     x_razorpay_signature: Optional[str] = Header(None),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    body = json.dumps(data.dict()).encode()
+    # the signature covers the exact bytes the gateway sent
+    body = await request.body()
 
     if not USE_FAKE_PAYMENTS:
         valid = PaymentService.verify_webhook_signature(
@@ -139,12 +157,13 @@ async def razorpay_webhook(
         if not valid:
             raise HTTPException(400, "Invalid webhook signature")
 
-    if data.event == "payment.captured":
-        entity = data.payload["payment"]["entity"]
-        BookingService.finalize_on_payment_captured(
-            session=session,
-            payment_id=entity["id"],
-            order_id=entity["order_id"],
-        )
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(400, "Invalid webhook payload")
+    if not isinstance(data, dict):
+        raise HTTPException(400, "Invalid webhook payload")
 
+    # stored and acknowledged; bookings are finalized by the webhook worker
+    await webhook_queue.ingest(session, data)
     return {"status": "ok"}
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlmodel import Session, select
 from backend.db import get_session
 from backend.model import Company
+from backend.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/companies", tags=["companies"])
 
@@ -10,8 +11,13 @@ def add_company(company: Company, session: Session = Depends(get_session)):
     session.add(company)
     session.commit()
     session.refresh(company)
+    response_cache.bump("companies")
     return company
 
 @router.get("/all")
-def get_companies(session: Session = Depends(get_session)):
-    return session.exec(select(Company)).all()
+def get_companies(request: Request, session: Session = Depends(get_session)):
+    return response_cache.respond(
+        request,
+        ("companies",),
+        lambda: (session.exec(select(Company)).all(), {}),
+    )
@@ -1,40 +1,28 @@
 # backend/routes/customers.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import FileResponse
 from sqlmodel import Session, select
-from ..db import get_session
-from ..model import Customer, Booking, Flight, Payment
-from passlib.context import CryptContext
-import hashlib
+from datetime import date as Date
+from typing import Optional
+import os
+from ..db import get_read_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from ..model import Customer
+from ..services.booking_list import MAX_PAGE_SIZE
+from ..services.customer_history import CustomerHistoryService
+from ..services.passwords import passwords, is_prehashed
+from ..services.customer_import import importer
+from ..config import CUSTOMER_IMPORT_MAX_BYTES
+from ..utils.streaming import stream_table, STREAM_FORMATS
+from .admin import require_admin
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
-# Same Argon2 settings as auth
-pwd = CryptContext(
-    schemes=["argon2", "bcrypt"],
-    deprecated="auto",
-    argon2__time_cost=2,
-    argon2__memory_cost=8192,
-    argon2__parallelism=1
-)
-
-# =========================
-# HELPERS
-# =========================
-def is_hex_sha256(s: str) -> bool:
-    if not s or len(s) != 64:
-        return False
-    try:
-        int(s, 16)
-        return True
-    except ValueError:
-        return False
-
-
 # =========================
 # ADD CUSTOMER
 # =========================
 @router.post("/add")
-def add_customer(customer: Customer, session: Session = Depends(get_session)):
+async def add_customer(customer: Customer, session: AsyncSession = Depends(get_async_session)):
     data = customer.dict(exclude_unset=True)
     data.pop("Customer_ID", None)
 
@@ -43,58 +31,113 @@ def add_customer(customer: Customer, session: Session = Depends(get_session)):
         raise HTTPException(status_code=400, detail="Password required")
 
     # Preserve existing hashes
-    if raw.startswith("$argon2") or raw.startswith("$2"):
-        data["Password"] = raw
-    elif is_hex_sha256(raw):
-        data["Password"] = raw
-    else:
-        data["Password"] = pwd.hash(raw)
+    data["Password"] = raw if is_prehashed(raw) else await passwords.hash(raw)
 
     new_customer = Customer(**data)
     session.add(new_customer)
-    session.commit()
-    session.refresh(new_customer)
+    await session.commit()
+    await session.refresh(new_customer)
 
     return new_customer
 
 
+# =========================
+# BULK IMPORT
+# =========================
+@router.post("/import", status_code=202, dependencies=[Depends(require_admin)])
+def import_customers(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv | ndjson (default: from the file name)"),
+):
+    """
+    Queue a CSV or NDJSON file of name, email, phone, password rows.
+    Poll the job for progress; rejected rows are listed in its errors file.
+    """
+    if format is None:
+        format = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(STREAM_FORMATS)}")
+
+    # sync route: the copy runs on the threadpool, 1 MiB at a time
+    path = importer.new_path("upload")
+    try:
+        size = 0
+        with open(path, "wb") as out:
+            while chunk := file.file.read(1 << 20):
+                size += len(chunk)
+                if size > CUSTOMER_IMPORT_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="Import file too large")
+                out.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    job = importer.submit(path, format)
+    return {
+        **job.progress(),
+        "progress_url": f"/customers/import/{job.id}",
+        "errors_url": f"/customers/import/{job.id}/errors",
+    }
+
+
+@router.get("/import/{job_id}", dependencies=[Depends(require_admin)])
+def import_progress(job_id: str):
+    job = importer.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job.progress()
+
+
+@router.get("/import/{job_id}/errors", dependencies=[Depends(require_admin)])
+def import_errors(job_id: str):
+    """Rejected rows as CSV (line, email, error); partial while the job runs."""
+    job = importer.get(job_id)
+    if not job or not os.path.exists(job.errors_path):
+        raise HTTPException(status_code=404, detail="Import errors not found")
+    return FileResponse(job.errors_path, media_type="text/csv", filename=f"import-{job_id}-errors.csv")
+
+
 # =========================
 # GET ALL CUSTOMERS
 # =========================
 @router.get("/all")
-def get_all_customers(session: Session = Depends(get_session)):
+def get_all_customers(
+    format: str = Query("json", description="json | ndjson | csv"),
+    session: Session = Depends(get_read_session),
+):
+    if format != "json":
+        # exports never carry password hashes
+        columns = [c for c in Customer.__table__.c if c.key != "Password"]
+        try:
+            return stream_table(columns, format, "customers")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     return session.exec(select(Customer)).all()
 
 
 # =========================
-# TRAVEL HISTORY (FIXED)
+# TRAVEL HISTORY
 # =========================
 @router.get("/{customer_id}/history")
-def travel_history(customer_id: int, session: Session = Depends(get_session)):
-    bookings = session.exec(
-        select(Booking).where(Booking.Customer_ID == customer_id)
-    ).all()
-
-    history = []
-
-    for b in bookings:
-        flight = session.get(Flight, b.Flight_ID)
-
-        payment = session.exec(
-            select(Payment).where(Payment.Booking_ID == b.Booking_ID)
-        ).first()
-
-        history.append({
-            "booking_id": b.Booking_ID,
-            "route": f"{flight.Dept_Location} → {flight.Arr_Location}" if flight else None,
-            "company": flight.company.Name if flight and flight.company else None,
-            "departure": flight.Departure_Time if flight else None,
-            "arrival": flight.Arrival_Time if flight else None,
-            "seats": b.Seats,
-            "status": b.Status,
-            "payment_amount": payment.Amount if payment else None,
-            "payment_status": payment.Status if payment else None,
-            "booking_date": b.Created_At,
-        })
+def travel_history(
+    customer_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[Date] = Query(None, description="departures on or after this day"),
+    date_to: Optional[Date] = Query(None, description="departures on or before this day"),
+    session: Session = Depends(get_read_session),
+):
+    """
+    Latest departure first, one query per page; the next page is reached
+    through the X-Next-Cursor header.
+    """
+    try:
+        q = CustomerHistoryService.build_query(customer_id, limit, cursor, date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
+    history, next_cursor = CustomerHistoryService.shape(session.exec(q).all(), limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return history
@@ -0,0 +1,56 @@
+# backend/routes/fares.py
+from fastapi import APIRouter, HTTPException
+from typing import List
+from pydantic import BaseModel
+
+from ..config import FARE_MAX_QUOTES
+from ..services.fare_engine import fare_engine
+from ..services.flight_inventory import inventory
+
+router = APIRouter(prefix="/fares", tags=["fares"])
+
+
+class FareQuoteIn(BaseModel):
+    flight_ids: List[int]
+    # seat labels per option; [] prices `seats` seats without a seat choice
+    selections: List[List[str]] = [[]]
+    seats: int = 1
+    baggage_kg: List[int] = [0]
+    # also return the price of every seat on each flight
+    seat_map: bool = False
+
+
+@router.post("/quote")
+def quote_fares(payload: FareQuoteIn):
+    """
+    Price flights x seat selections x baggage options in one call.
+    Amounts are paise, like the booking response; a bad selection or
+    unknown flight is reported in place instead of failing the batch.
+    """
+    flight_ids = list(dict.fromkeys(payload.flight_ids))
+    if not flight_ids or not payload.selections or not payload.baggage_kg:
+        raise HTTPException(400, "flight_ids, selections and baggage_kg must not be empty")
+    if payload.seats < 1:
+        raise HTTPException(400, "seats must be >= 1")
+    if any(kg < 0 for kg in payload.baggage_kg):
+        raise HTTPException(400, "baggage_kg must be >= 0")
+    if len(flight_ids) * len(payload.selections) * len(payload.baggage_kg) > FARE_MAX_QUOTES:
+        raise HTTPException(400, f"At most {FARE_MAX_QUOTES} quotes per request")
+
+    results = []
+    for flight_id in flight_ids:
+        flight = inventory.get(flight_id)
+        if not flight:
+            results.append({"flight_id": flight_id, "error": "Flight not found"})
+            continue
+
+        table = fare_engine.table(flight)
+        entry = {
+            "flight_id": flight_id,
+            "currency": "INR",
+            "quotes": fare_engine.quote_many(table, payload.selections, payload.seats, payload.baggage_kg),
+        }
+        if payload.seat_map:
+            entry["seat_map"] = fare_engine.seat_prices(table)
+        results.append(entry)
+    return results
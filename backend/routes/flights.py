@@ -1,14 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from sqlmodel import Session, select
-from datetime import datetime
-from typing import List
+from datetime import datetime, date as Date, time, timedelta, timezone
+from typing import List, Optional
+from pydantic import BaseModel
 
-from ..db import get_session
+from ..db import get_session, get_read_session, get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from ..model import Flight, Company, FlightStatus
-from ..services.price_alerts import PriceAlertsService   
+from ..services.price_alert_evaluator import evaluator  # noqa: F401  (subscribes to flight changes)
+from ..services.flight_search import FlightSearchParams, MAX_PAGE_SIZE
+from ..services.flight_inventory import inventory
+from ..services.flight_events import flight_changed, subscribe
+from ..services.route_graph import route_graph
+from ..services.fare_calendar import FareCalendarService, calendar_updater
+from ..services.seat_map import SeatMapService
+from ..services.disruption_assistant import DisruptionAssistant
+from .admin import require_admin
+from ..utils.streaming import stream_table
+from ..utils.response_cache import response_cache
 
 router = APIRouter(prefix="/flights", tags=["flights"])
 
+# cached flight responses go stale on any committed flight write; this
+# subscribes after the inventory so rebuilt entries see the new data.
+# Cached routes read the primary: a replica could still serve the old rows
+subscribe(lambda flight: response_cache.bump("flights"))
+
 
 @router.post("/add", response_model=Flight)
 def add_flight(flight: Flight, session: Session = Depends(get_session)):
@@ -44,46 +61,224 @@ def add_flight(flight: Flight, session: Session = Depends(get_session)):
     session.add(new)
     session.commit()
     session.refresh(new)
+    # a new fare on the route, as far as price alerts are concerned
+    flight_changed(new, price_changed=True)
     return new
 
 
 @router.get("/all", response_model=List[Flight])
-def list_flights(session: Session = Depends(get_session)):
+def list_flights(
+    format: str = Query("json", description="json | ndjson | csv"),
+    session: Session = Depends(get_read_session),
+):
+    if format != "json":
+        try:
+            return stream_table(list(Flight.__table__.c), format, "flights")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     return session.exec(select(Flight)).all()
 
 
 @router.get("/search", response_model=List[Flight])
-def search_flights(
+async def search_flights(
+    request: Request,
     depart: str | None = None,
     arrive: str | None = None,
+    date: Optional[Date] = None,
+    depart_from: Optional[datetime] = None,
+    depart_to: Optional[datetime] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    max_stops: Optional[int] = None,
+    status: Optional[FlightStatus] = None,
+    sort: str = "departure",
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    params = FlightSearchParams(
+        depart=depart,
+        arrive=arrive,
+        date=date,
+        depart_from=depart_from,
+        depart_to=depart_to,
+        min_price=min_price,
+        max_price=max_price,
+        max_stops=max_stops,
+        status=status,
+        sort=sort,
+        limit=limit,
+        cursor=cursor,
+    )
+
+    async def build():
+        try:
+            flights, next_cursor = await inventory.search_async(session, params)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # body stays a plain list; the next page is reached through the header
+        return flights, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # 🔔 price alerts are evaluated by the background evaluator when
+    # fares change, not here on the read path
+    return await response_cache.respond_async(request, ("flights",), build)
+
+
+@router.get("/connections")
+def search_connections(
+    depart: str,
+    arrive: str,
+    date: Optional[Date] = None,
+    depart_from: Optional[datetime] = None,
+    depart_to: Optional[datetime] = None,
+    max_stops: int = Query(1, ge=1, le=2),
+    min_layover: int = Query(45, ge=0, description="minutes"),
+    max_layover: int = Query(360, ge=0, description="minutes"),
+    seats: int = Query(1, ge=1),
+    sort: str = "price",
+    k: int = Query(10, ge=1, le=50),
+    include_direct: bool = True,
     session: Session = Depends(get_session),
 ):
-    q = select(Flight)
-
-    if depart:
-        q = q.where(Flight.Dept_Location == depart)
-    if arrive:
-        q = q.where(Flight.Arr_Location == arrive)
-
-    flights = session.exec(q).all()
-
-    # 🔔 PRICE ALERT TRIGGER (CORRECT PLACE)
-    for f in flights:
-        route = f"{f.Dept_Location}-{f.Arr_Location}"
-        PriceAlertsService.check_alerts_for_route(
-            session,
-            route=route,
-            current_price=f.Price_Per_Seat,
+    if date:
+        depart_from = datetime.combine(date, time.min)
+        depart_to = depart_from + timedelta(days=1)
+    if not depart_from or not depart_to:
+        raise HTTPException(400, "Give either date or depart_from and depart_to")
+
+    route_graph.ensure(session)
+
+    try:
+        itineraries, complete = route_graph.search(
+            origin=depart,
+            dest=arrive,
+            depart_from=depart_from,
+            depart_to=depart_to,
+            max_stops=max_stops,
+            min_layover_min=min_layover,
+            max_layover_min=max_layover,
+            seats=seats,
+            sort=sort,
+            k=k,
+            include_direct=include_direct,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"itineraries": itineraries, "complete": complete}
+
+
+@router.get("/calendar")
+def fare_calendar(
+    request: Request,
+    depart: str,
+    arrive: str,
+    day_from: Date = Query(..., alias="from"),
+    day_to: Date = Query(..., alias="to"),
+    session: Session = Depends(get_session),
+):
+    def build():
+        try:
+            days = FareCalendarService.calendar(session, depart, arrive, day_from, day_to)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"depart": depart, "arrive": arrive, "days": days}, {}
+
+    # the calendar rows change when the fare-calendar worker refreshes them
+    return response_cache.respond(request, ("fare-calendar",), build)
 
-    return flights
 
 @router.get("/{flight_id}", response_model=Flight)
-def get_flight(
+def get_flight(flight_id: int, request: Request):
+    def build():
+        flight = inventory.get(flight_id)
+        if not flight:
+            raise HTTPException(404, "Flight not found")
+        return flight, {}
+
+    return response_cache.respond(request, ("flights",), build)
+
+
+@router.get("/{flight_id}/seatmap")
+def get_seat_map(
+    flight_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+):
+    """
+    Occupancy as one base64 bitmap: seat i (row-major over the layout
+    letters, aisles "-" skipped) is byte i // 8, bit i % 8; 1 = taken.
+    """
+    def build():
+        flight = inventory.get(flight_id)
+        if not flight:
+            raise HTTPException(404, "Flight not found")
+        return SeatMapService.payload(session, flight_id, flight["Total_Seats"], flight["Available_Seats"]), {}
+
+    # every seat claim or release publishes flight_changed, which bumps "flights"
+    return response_cache.respond(request, ("flights",), build)
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    # stored times are naive UTC
+    return dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+
+
+class FlightStatusIn(BaseModel):
+    status: FlightStatus
+    # new schedule for a delay
+    departure_time: Optional[datetime] = None
+    arrival_time: Optional[datetime] = None
+    reason: Optional[str] = None
+
+
+@router.patch("/{flight_id}/status", dependencies=[Depends(require_admin)])
+def update_flight_status(
     flight_id: int,
+    payload: FlightStatusIn,
     session: Session = Depends(get_session),
 ):
+    """
+    Set a flight's status. CANCELLED re-accommodates all its bookings in
+    one batch; DELAYED notifies its customers of the new schedule.
+    """
     flight = session.get(Flight, flight_id)
     if not flight:
         raise HTTPException(404, "Flight not found")
-    return flight
+
+    old_departure = flight.Departure_Time
+    departure = _naive_utc(payload.departure_time) if payload.departure_time else flight.Departure_Time
+    arrival = _naive_utc(payload.arrival_time) if payload.arrival_time else flight.Arrival_Time
+    if arrival <= departure:
+        raise HTTPException(400, "Arrival_Time must be after Departure_Time")
+
+    def apply(f: Flight) -> None:
+        f.Status = payload.status
+        f.Departure_Time = departure
+        f.Arrival_Time = arrival
+
+    out = {"flight_id": flight_id, "status": payload.status}
+    if payload.status == FlightStatus.CANCELLED:
+        # committed together with the re-accommodation: a 409 leaves the
+        # flight and its bookings untouched
+        try:
+            out["reaccommodation"] = DisruptionAssistant.reaccommodate(
+                session, flight_id, payload.reason, update_flight=apply
+            )
+        except ValueError as e:
+            raise HTTPException(409, str(e))
+    else:
+        apply(flight)
+        session.add(flight)
+        session.commit()
+        session.refresh(flight)
+        flight_changed(flight)
+        if payload.status == FlightStatus.DELAYED:
+            out["notified"] = DisruptionAssistant.notify_customers_of_disruption(
+                session, flight_id, payload.reason or "delayed"
+            )
+
+    # flight_changed queued the new day's calendar; the old one too
+    if old_departure.date() != departure.date():
+        calendar_updater.mark(flight.Dept_Location, flight.Arr_Location, [old_departure.date()])
+    return out
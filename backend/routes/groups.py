@@ -1,17 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Body
 from sqlmodel import Session
+from typing import List
+from pydantic import BaseModel
 
 from backend.db import get_session
 from backend.model import GroupBooking
-from backend.routes.auth_dependency import get_current_user, security
+from backend.routes.auth_dependency import get_current_user
+from backend.services.booking_service import BookingService, NotFound
 
 router = APIRouter(prefix="/groups", tags=["Groups"])
 
 
+# =========================
+# BODY MODELS
+# =========================
+class GroupTravellerIn(BaseModel):
+    member_id: int
+    full_name: str
+    age: int
+    gender: str
+
+
+class GroupBookIn(BaseModel):
+    flight_id: int
+    seats_per_member: int = 1
+    # optional; a member with travellers gets one seat per traveller
+    travellers: List[GroupTravellerIn] = []
+
+
 # =========================
 # CREATE GROUP
 # =========================
-@router.post("/create", dependencies=[Depends(security)])
+@router.post("/create")
 def create_group(
     name: str,
     user: dict = Depends(get_current_user),
@@ -31,7 +51,7 @@ def create_group(
 # =========================
 # INVITE MEMBER
 # =========================
-@router.post("/{group_id}/invite", dependencies=[Depends(security)])
+@router.post("/{group_id}/invite")
 def invite_member(
     group_id: int,
     member_id: int,
@@ -60,7 +80,7 @@ def invite_member(
 # =========================
 # GET GROUP
 # =========================
-@router.get("/{group_id}", dependencies=[Depends(security)])
+@router.get("/{group_id}")
 def get_group(
     group_id: int,
     user: dict = Depends(get_current_user),
@@ -75,3 +95,41 @@ def get_group(
         raise HTTPException(403, "Not a group member")
 
     return g
+
+
+# =========================
+# BOOK WHOLE GROUP
+# =========================
+@router.post("/{group_id}/book")
+def book_group(
+    group_id: int,
+    body: GroupBookIn = Body(...),
+    user: dict = Depends(get_current_user),
+    session: Session = Depends(get_session),
+):
+    g = session.get(GroupBooking, group_id)
+    if not g:
+        raise HTTPException(404, "Group not found")
+
+    # ❌ only owner can book for everyone
+    if g.Owner_Customer_ID != user["user_id"]:
+        raise HTTPException(403, "Only owner can book for the group")
+
+    travellers = {}
+    for t in body.travellers:
+        travellers.setdefault(t.member_id, []).append(
+            {"full_name": t.full_name, "age": t.age, "gender": t.gender}
+        )
+
+    try:
+        return BookingService.create_group_order(
+            session=session,
+            group=g,
+            flight_id=body.flight_id,
+            seats_per_member=body.seats_per_member,
+            travellers=travellers,
+        )
+    except NotFound as e:
+        raise HTTPException(404, str(e))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
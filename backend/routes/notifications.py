@@ -4,18 +4,19 @@ from sqlmodel import Session, select
 from datetime import datetime
 from pydantic import BaseModel
 
-from ..db import get_session
+from ..db import get_session, get_async_read_session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from ..model import Notification
 from .auth_dependency import get_current_user
-from ..routes.realtime import ws_mgr
+from ..utils.ws_manager import ws_mgr
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 # inbox (JWT-based)
 @router.get("/inbox")
-def inbox(
-    session: Session = Depends(get_session),
+async def inbox(
+    session: AsyncSession = Depends(get_async_read_session),
     user=Depends(get_current_user),
 ):
     stmt = (
@@ -23,7 +24,7 @@ def inbox(
         .where(Notification.Customer_ID == user["user_id"])
         .order_by(Notification.Created_At.desc())
     )
-    return session.exec(stmt).all()
+    return (await session.exec(stmt)).all()
 
 
 class TestNotifyIn(BaseModel):
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from sqlmodel import select
 
-from backend.db import get_session
-from backend.routes.auth_dependency import get_current_user, security
+from backend.db import get_async_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from backend.routes.auth_dependency import get_current_user
 from backend.model import Booking, Payment
 
 router = APIRouter(
@@ -13,23 +14,20 @@ router = APIRouter(
 # =========================
 # GET PAYMENT BY BOOKING
 # =========================
-@router.get(
-    "/by-booking/{booking_id}",
-    dependencies=[Depends(security)]
-)
-def get_payment_for_booking(
+@router.get("/by-booking/{booking_id}")
+async def get_payment_for_booking(
     booking_id: int,
     user: dict = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    booking = session.get(Booking, booking_id)
+    booking = await session.get(Booking, booking_id)
 
     if not booking or booking.Customer_ID != user["user_id"]:
         raise HTTPException(404, "Booking not found")
 
-    payment = session.exec(
+    payment = (await session.exec(
         select(Payment).where(Payment.Booking_ID == booking_id)
-    ).first()
+    )).first()
 
     if not payment:
         raise HTTPException(404, "Payment not found")
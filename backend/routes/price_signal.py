@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlmodel import Session, select, func
 from backend.db import get_session
 from backend.model import Flight
+from backend.utils.response_cache import response_cache
 
 router = APIRouter()
 
 @router.get("/price-signal")
-def price_signal(session: Session = Depends(get_session)):
+def price_signal(request: Request, session: Session = Depends(get_session)):
+    return response_cache.respond(request, ("flights",), lambda: (_lowest_fare_signal(session), {}))
+
+
+def _lowest_fare_signal(session: Session) -> dict:
     row = session.exec(
         select(
             Flight.Dept_Location,
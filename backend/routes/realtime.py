@@ -1,26 +1,47 @@
 # backend/routes/realtime.py
 from fastapi import APIRouter, WebSocket, Query
-from ..utils.ws_manager import WSManager
+from typing import Optional
+
+from ..model import UserRole
+from ..services.tokens import tokens, InvalidToken
+from ..utils.ws_manager import ws_mgr
 
 router = APIRouter(prefix="/realtime", tags=["realtime"])
 
-# single manager instance used by app
-ws_mgr = WSManager()
+# 1008 "policy violation": bad or missing credentials
+AUTH_CLOSE_CODE = 1008
+
 
 @router.websocket("/ws")
-async def websocket_endpoint(ws: WebSocket, customer_id: int = Query(..., description="Customer ID for this websocket")):
+async def websocket_endpoint(
+    ws: WebSocket,
+    token: str = Query(..., description="access token from /auth/login"),
+    customer_id: Optional[int] = Query(None, description="admins only: listen as this customer"),
+):
     """
-    Connect with: ws://HOST/realtime/ws?customer_id=1
-    Note: this is a demo auth-free connection. For production, authenticate (JWT).
+    Connect with: ws://HOST/realtime/ws?token=<access token>
+    Messages for the token's customer arrive here whichever worker sent them.
     """
-    await ws_mgr.connect(customer_id, ws)
+    try:
+        user = tokens.verify(token)
+    except InvalidToken:
+        await ws.close(code=AUTH_CLOSE_CODE)
+        return
+    if customer_id is None:
+        customer_id = user["user_id"]
+    elif customer_id != user["user_id"] and user.get("role") != UserRole.ADMIN.value:
+        await ws.close(code=AUTH_CLOSE_CODE)
+        return
+
+    conn = await ws_mgr.connect(customer_id, ws)
     try:
         while True:
             # keep connection alive; optionally receive pings from client
             msg = await ws.receive_text()
             # echo ping/pong or ignore
             if msg.lower() == "ping":
-                await ws.send_text('{"type":"pong"}')
+                # through the outbox: its writer task owns the socket's sends
+                ws_mgr.push(conn, '{"type":"pong"}')
     except Exception:
         # disconnect on any error / client close
         ws_mgr.disconnect(customer_id, ws)
@@ -5,7 +5,7 @@ from pydantic import BaseModel
 
 from backend.db import get_session
 from backend.model import Traveller, Booking
-from backend.routes.auth_dependency import get_current_user, security
+from backend.routes.auth_dependency import get_current_user
 
 router = APIRouter(prefix="/travellers", tags=["Travellers"])
 
@@ -14,10 +14,7 @@ class TravellerIn(BaseModel):
     age: int
     gender: str
 
-@router.post(
-    "/add/{booking_id}",
-    dependencies=[Depends(security)]
-)
+@router.post("/add/{booking_id}")
 def add_travellers(
     booking_id: int,
     travellers: List[TravellerIn],
@@ -1,10 +1,7 @@
 from sqlmodel import Session, select
 from backend.db import engine
 from backend.model import Customer, UserRole
-from passlib.context import CryptContext
-
-# ✅ Argon2id ONLY
-pwd = CryptContext(schemes=["argon2"], deprecated="auto")
+from backend.services.passwords import context as pwd
 
 users = [
     ("Rahul Sharma","rahul@example.com","9876543210"),
@@ -0,0 +1,132 @@
+# backend/services/booking_list.py
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlmodel import select
+
+from ..model import Booking, Flight, Payment, Traveller
+from ..utils.pagination import encode_cursor, decode_cursor
+
+MAX_PAGE_SIZE = 100
+WHEN = ("all", "upcoming", "past")
+
+# slim projection; the prefix keeps same-named columns apart
+_BOOKING_COLUMNS = (Booking.Booking_ID, Booking.Seats, Booking.Status, Booking.Seat_Labels, Booking.Created_At)
+_FLIGHT_COLUMNS = (
+    Flight.Flight_ID,
+    Flight.Flight_Code,
+    Flight.Dept_Location,
+    Flight.Arr_Location,
+    Flight.Departure_Time,
+    Flight.Arrival_Time,
+    Flight.Price_Per_Seat,
+    Flight.Status,
+)
+_PAYMENT_COLUMNS = (
+    Payment.Payment_ID,
+    Payment.Status,
+    Payment.Amount,
+    Payment.Gateway_Txn_ID,
+    Payment.Gateway_Payment_ID,
+)
+_TRAVELLER_COLUMNS = (Traveller.Traveller_ID, Traveller.Full_Name, Traveller.Age, Traveller.Gender)
+
+_GROUPS = (
+    ("Booking", "b_", _BOOKING_COLUMNS),
+    ("Flight", "f_", _FLIGHT_COLUMNS),
+    ("Payment", "p_", _PAYMENT_COLUMNS),
+    ("Traveller", "t_", _TRAVELLER_COLUMNS),
+)
+
+
+def _pick(row: Dict, prefix: str, columns) -> Dict:
+    return {c.key: row[prefix + c.key] for c in columns}
+
+
+class BookingListService:
+    """
+    A customer's bookings, one page per query.
+
+    A CTE picks the page of booking ids by keyset on (Departure_Time,
+    Booking_ID); the outer select joins that page to its flight, payment
+    and travellers, so the page with everything the bookings screens show
+    comes back in a single round trip.
+    """
+
+    @staticmethod
+    def build_query(customer_id: int, when: str, limit: int, cursor: Optional[str], now: datetime):
+        if when not in WHEN:
+            raise ValueError(f"when must be one of {', '.join(WHEN)}")
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+        # upcoming trips soonest first, everything else latest first
+        ascending = when == "upcoming"
+        dep = Flight.Departure_Time
+
+        page = (
+            select(Booking.Booking_ID.label("booking_id"), dep.label("departure"))
+            .join(Flight, Flight.Flight_ID == Booking.Flight_ID)
+            .where(Booking.Customer_ID == customer_id)
+        )
+        if when == "upcoming":
+            page = page.where(dep >= now)
+        elif when == "past":
+            page = page.where(dep < now)
+
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2:
+                raise ValueError("Invalid cursor")
+            last_dep, last_id = values
+            if ascending:
+                after = or_(dep > last_dep, and_(dep == last_dep, Booking.Booking_ID > last_id))
+            else:
+                after = or_(dep < last_dep, and_(dep == last_dep, Booking.Booking_ID < last_id))
+            page = page.where(after)
+
+        order = (dep, Booking.Booking_ID) if ascending else (dep.desc(), Booking.Booking_ID.desc())
+        page = page.order_by(*order).limit(limit + 1).cte("page")
+
+        columns = [c.label(prefix + c.key) for _, prefix, cols in _GROUPS for c in cols]
+        outer_order = (
+            (page.c.departure, page.c.booking_id)
+            if ascending else
+            (page.c.departure.desc(), page.c.booking_id.desc())
+        )
+        return (
+            select(*columns)
+            .select_from(page)
+            .join(Booking, Booking.Booking_ID == page.c.booking_id)
+            .join(Flight, Flight.Flight_ID == Booking.Flight_ID)
+            .outerjoin(Payment, Payment.Booking_ID == Booking.Booking_ID)
+            .outerjoin(Traveller, Traveller.Booking_ID == Booking.Booking_ID)
+            .order_by(*outer_order, Traveller.Traveller_ID)
+        )
+
+    @staticmethod
+    def shape(rows, limit: int) -> Tuple[List[Dict], Optional[str]]:
+        """Fold the joined rows into one entry per booking, plus the next cursor."""
+        out: Dict[int, Dict] = {}
+        for r in rows:
+            r = r._mapping
+            booking_id = r["b_Booking_ID"]
+            entry = out.get(booking_id)
+            if entry is None:
+                entry = out[booking_id] = {
+                    "Booking": _pick(r, "b_", _BOOKING_COLUMNS),
+                    "Flight": _pick(r, "f_", _FLIGHT_COLUMNS),
+                    "Payment": _pick(r, "p_", _PAYMENT_COLUMNS) if r["p_Payment_ID"] is not None else None,
+                    "Travellers": [],
+                }
+            if r["t_Traveller_ID"] is not None and all(
+                t["Traveller_ID"] != r["t_Traveller_ID"] for t in entry["Travellers"]
+            ):
+                entry["Travellers"].append(_pick(r, "t_", _TRAVELLER_COLUMNS))
+
+        entries = list(out.values())
+        if len(entries) <= limit:
+            return entries, None
+        last = entries[limit - 1]
+        return entries[:limit], encode_cursor(last["Flight"]["Departure_Time"], last["Booking"]["Booking_ID"])
@@ -1,14 +1,24 @@
 from sqlmodel import Session, select
-from sqlalchemy.exc import SQLAlchemyError
-from typing import Dict, Optional, List
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
 import random
 
-from .payment_service import PaymentService
-from ..model import Payment, Flight, Booking, BookingStatus
+from .flight_events import flight_changed
+from .seat_holds import seat_holds
+from .idempotency import idempotency
+from .seat_map import SeatMapService
+from .fare_engine import fare_engine
+from .payment_outbox import PaymentOutboxRelay, ORDER_PENDING, worker as outbox_worker
+from ..model import Payment, Flight, Booking, BookingStatus, GroupBooking, Traveller
 from ..config import USE_FAKE_PAYMENTS
 
 
+class NotFound(LookupError):
+    """A row the request refers to does not exist; routes answer 404."""
+
+
 # -------------------------------
 # FAKE HELPERS
 # -------------------------------
@@ -25,11 +35,55 @@ def _simulate_failure(prob=0.05):
     return random.random() < prob
 
 
+def _insert_ids(session: Session, model, pk, rows: List[Dict]) -> List[int]:
+    """
+    executemany INSERT of plain dicts, returning the new primary keys in
+    row order. Uses INSERT .. RETURNING where the dialect can batch it
+    (SQLite, MariaDB, Postgres); on MySQL it falls back to ORM objects,
+    whose flush reads each id back.
+    """
+    if session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        return list(session.scalars(insert(model).returning(pk, sort_by_parameter_order=True), rows))
+    objs = [model(**r) for r in rows]
+    session.add_all(objs)
+    session.flush()
+    return [getattr(o, pk.key) for o in objs]
+
+
 # -------------------------------
 # BOOKING SERVICE
 # -------------------------------
 class BookingService:
 
+    # ============================
+    # ATOMIC SEAT INVENTORY
+    # ============================
+    # Seat counts are only ever changed by one conditional UPDATE, so the
+    # check and the write happen in the same statement: concurrent
+    # bookings can neither lose an update nor drive the count below 0.
+    @staticmethod
+    def reserve_seats(session: Session, flight_id: int, seats: int) -> bool:
+        res = session.execute(
+            update(Flight)
+            .where(Flight.Flight_ID == flight_id, Flight.Available_Seats >= seats)
+            .values(Available_Seats=Flight.Available_Seats - seats)
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount == 1
+
+    @staticmethod
+    def release_seats(session: Session, flight_id: int, seats: int) -> bool:
+        res = session.execute(
+            update(Flight)
+            .where(
+                Flight.Flight_ID == flight_id,
+                Flight.Available_Seats + seats <= Flight.Total_Seats,
+            )
+            .values(Available_Seats=Flight.Available_Seats + seats)
+            .execution_options(synchronize_session=False)
+        )
+        return res.rowcount == 1
+
     # ============================
     # CREATE BOOKING + ORDER
     # ============================
@@ -48,161 +102,474 @@ class BookingService:
         if seats < 1:
             raise ValueError("Seats must be >= 1")
 
-        flight = session.get(Flight, flight_id)
-        if not flight:
-            raise ValueError("Flight not found")
-
-        if flight.Available_Seats < seats:
-            raise ValueError("Not enough seats available")
-
         # ---------------------------
-        # BASE PRICE
+        # IDEMPOTENT REPLAY
         # ---------------------------
-        price_per_seat = float(flight.Price_Per_Seat)
-        base_total = price_per_seat * seats
+        # a retry is answered from the stored response before any
+        # flight lookup, pricing or gateway call
+        record = None
+        if idempotency_key is not None:
+            idempotency.validate_key(idempotency_key)
+            request_hash = idempotency.request_hash(
+                flight_id=flight_id,
+                seats=seats,
+                selected_seats=selected_seats,
+                extra_baggage_kg=extra_baggage_kg,
+                currency=currency,
+            )
+            replay = idempotency.lookup(session, customer_id, idempotency_key, request_hash)
+            if replay is not None:
+                return replay
+
+        flight = session.get(Flight, flight_id)
+        if not flight:
+            raise NotFound("Flight not found")
 
         # ---------------------------
-        # SEAT PRICING
-        # ---------------------------
+        # SEAT SELECTION
         # ---------------------------
-        seat_total = 0
+        seat_indexes: List[int] = []
         if selected_seats:
-            for s in selected_seats:
-                row = int(s[:-1])   # "12A" → 12
-                col = s[-1]         # "A"
-        # row-based pricing (0 for all, kept for future)
-                if row < 5:
-                    seat_total += flight.Seat_Pricing.get("high", 0)
-                elif row < 15:
-                    seat_total += flight.Seat_Pricing.get("low", 0)
-                else:
-                    seat_total += flight.Seat_Pricing.get("free", 0)
-
-        # column-based pricing
-                if col in ("A", "F"):
-                    seat_total += 400
-                elif col in ("C", "D"):
-                    seat_total += 250
-
+            seat_indexes = SeatMapService.parse(flight, selected_seats)
+            if len(seat_indexes) != seats:
+                raise ValueError(f"Select exactly {seats} seat(s)")
+            SeatMapService.ensure(flight)
+        layout = SeatMapService.layout(flight)
 
         # ---------------------------
-        # BAGGAGE PRICING
+        # PRICING
         # ---------------------------
-        baggage_total = max(0, extra_baggage_kg) * 300
+        # base fare, seat surcharges and baggage from the flight's
+        # compiled fare table, in paise
+        fare = fare_engine.quote(fare_engine.table(flight), seats, seat_indexes, extra_baggage_kg)
+        total_amount_paise = fare["total"]
+        total_amount = total_amount_paise / 100
 
         # ---------------------------
-        # FINAL TOTAL
+        # HOLD SEATS
         # ---------------------------
-        total_amount = base_total + seat_total + baggage_total
-        total_amount_paise = int(total_amount * 100)
+        # seats leave inventory now, in the booking's own transaction;
+        # the hold gives them back if the order is never paid
+        if not BookingService.reserve_seats(session, flight_id, seats):
+            session.rollback()
+            raise ValueError("Not enough seats available")
+
+        if seat_indexes:
+            try:
+                SeatMapService.claim(session, flight_id, seat_indexes)
+            except ValueError:
+                session.rollback()
+                raise
 
-        # ---------------------------
-        # CREATE BOOKING
-        # ---------------------------
         booking = Booking(
             Customer_ID=customer_id,
             Flight_ID=flight_id,
             Seats=seats,
-            Status=BookingStatus.CREATED
+            Status=BookingStatus.CREATED,
+            Seat_Labels=[layout.label(i) for i in seat_indexes] or None
         )
 
-        session.add(booking)
-        session.commit()
-        session.refresh(booking)
-
         # ---------------------------
-        # CREATE PAYMENT ORDER
+        # ONE UNIT OF WORK
         # ---------------------------
-        order = PaymentService.create_order(
-            amount_paise=total_amount_paise,
-            currency=currency,
-            notes={
-                "booking_id": str(booking.Booking_ID),
-                "customer_id": str(customer_id),
-                "flight_id": str(flight_id),
-                "seats": str(seats)
+        # booking, payment, hold, idempotency record and the gateway
+        # order request are flushed (ids come back with the INSERT) and
+        # committed together; the outbox relay creates the order later
+        try:
+            session.add(booking)
+            session.flush()
+
+            payment = Payment(
+                Customer_ID=customer_id,
+                Booking_ID=booking.Booking_ID,
+                Company_ID=flight.Company_ID,
+                Amount=total_amount,
+                Tax=0.0,
+                Gateway_Provider=_fake_gateway() if USE_FAKE_PAYMENTS else "razorpay",
+                Status=ORDER_PENDING,
+                Created_At=datetime.utcnow()
+            )
+            session.add(payment)
+            session.flush()
+
+            seat_holds.place(session, booking.Booking_ID, flight_id, seats)
+            PaymentOutboxRelay.enqueue(
+                session, payment, booking,
+                amount_paise=total_amount_paise,
+                currency=currency,
+                notes={
+                    "booking_id": str(booking.Booking_ID),
+                    "customer_id": str(customer_id),
+                    "flight_id": str(flight_id),
+                    "seats": str(seats)
+                }
+            )
+
+            response = {
+                "booking_id": booking.Booking_ID,
+                "order_id": None,
+                "order_status": "pending",
+                "amount": total_amount_paise,
+                "currency": currency
             }
-        )
+            if idempotency_key is not None:
+                record = idempotency.claim(session, customer_id, idempotency_key, request_hash)
+                record.Booking_ID = booking.Booking_ID
+                idempotency.complete(session, record, response)
 
-        payment = Payment(
-            Customer_ID=customer_id,
-            Booking_ID=booking.Booking_ID,
-            Company_ID=flight.Company_ID,
-            Amount=total_amount,
-            Tax=0.0,
-            Gateway_Provider=_fake_gateway() if USE_FAKE_PAYMENTS else "razorpay",
-            Gateway_Txn_ID=order["order_id"],
-            Status="authorized" if USE_FAKE_PAYMENTS else "created",
-            Created_At=datetime.utcnow()
-        )
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            if record is None:
+                raise
+            # a concurrent retry with the same key committed first
+            replay = idempotency.lookup(session, customer_id, idempotency_key, request_hash)
+            if replay is None:
+                raise
+            return replay
+        except SQLAlchemyError:
+            session.rollback()
+            raise
 
-        booking.Razorpay_Order_ID = order["order_id"]
+        outbox_worker.wake()
+        flight_changed(flight)
+        return response
 
+    # ============================
+    # GROUP BOOKING
+    # ============================
+    @staticmethod
+    def create_group_order(
+        session: Session,
+        group: GroupBooking,
+        flight_id: int,
+        seats_per_member: int = 1,
+        travellers: Optional[Dict[int, List[Dict]]] = None,
+        currency: str = "INR"
+    ) -> Dict:
+        """
+        Book every member of the group on one flight, all or nothing.
+
+        The whole group's seats come out of inventory in one conditional
+        UPDATE; bookings, payments, holds, outbox rows and travellers are
+        then inserted one executemany per table and committed once, so a
+        group of 50 costs about as many round trips as a single booking.
+        """
+        members = list(dict.fromkeys(group.Members or []))
+        if not members:
+            raise ValueError("Group has no members")
+        if seats_per_member < 1:
+            raise ValueError("Seats must be >= 1")
+
+        travellers = travellers or {}
+        unknown = set(travellers) - set(members)
+        if unknown:
+            raise ValueError(f"Travellers given for non-members: {sorted(unknown)}")
+
+        flight = session.get(Flight, flight_id)
+        if not flight:
+            raise NotFound("Flight not found")
+
+        # a member's seats are their travellers, if any were listed
+        seats_of = {m: len(travellers.get(m) or ()) or seats_per_member for m in members}
+        total_seats = sum(seats_of.values())
+        fares = fare_engine.table(flight)
+
+        if not BookingService.reserve_seats(session, flight_id, total_seats):
+            session.rollback()
+            raise ValueError(f"Not enough seats available for the group ({total_seats} needed)")
+
+        # plain dicts and executemany: no ORM object per row
         try:
-            session.add(payment)
-            session.add(booking)
+            now = datetime.utcnow()
+            booking_ids = _insert_ids(session, Booking, Booking.Booking_ID, [
+                {
+                    "Customer_ID": m,
+                    "Flight_ID": flight_id,
+                    "Seats": seats_of[m],
+                    "Status": BookingStatus.CREATED,
+                    "Created_At": now
+                }
+                for m in members
+            ])
+
+            # paise; no seat selection or baggage on group bookings
+            amounts = [fare_engine.quote(fares, seats_of[m])["total"] for m in members]
+            gateway = _fake_gateway() if USE_FAKE_PAYMENTS else "razorpay"
+            payment_ids = _insert_ids(session, Payment, Payment.Payment_ID, [
+                {
+                    "Customer_ID": m,
+                    "Booking_ID": booking_id,
+                    "Company_ID": flight.Company_ID,
+                    "Amount": amount / 100,
+                    "Tax": 0.0,
+                    "Gateway_Provider": gateway,
+                    "Status": ORDER_PENDING,
+                    "Created_At": now
+                }
+                for m, booking_id, amount in zip(members, booking_ids, amounts)
+            ])
+
+            seat_holds.place_many(session, flight_id, [
+                (booking_id, seats_of[m]) for m, booking_id in zip(members, booking_ids)
+            ])
+            PaymentOutboxRelay.enqueue_many(session, [
+                {
+                    "Payment_ID": payment_id,
+                    "Booking_ID": booking_id,
+                    "Amount_Paise": amount,
+                    "Currency": currency,
+                    "Notes": {
+                        "booking_id": str(booking_id),
+                        "customer_id": str(m),
+                        "flight_id": str(flight_id),
+                        "seats": str(seats_of[m]),
+                        "group_id": str(group.Group_ID)
+                    }
+                }
+                for m, booking_id, payment_id, amount in zip(members, booking_ids, payment_ids, amounts)
+            ])
+
+            traveller_rows = [
+                {
+                    "Booking_ID": booking_id,
+                    "Full_Name": t["full_name"],
+                    "Age": t["age"],
+                    "Gender": t["gender"]
+                }
+                for m, booking_id in zip(members, booking_ids)
+                for t in travellers.get(m) or ()
+            ]
+            if traveller_rows:
+                session.execute(insert(Traveller), traveller_rows)
+
+            response = {
+                "group_id": group.Group_ID,
+                "flight_id": flight_id,
+                "seats": total_seats,
+                "order_status": "pending",
+                "currency": currency,
+                "bookings": [
+                    {
+                        "customer_id": m,
+                        "booking_id": booking_id,
+                        "seats": seats_of[m],
+                        "amount": amount
+                    }
+                    for m, booking_id, amount in zip(members, booking_ids, amounts)
+                ]
+            }
             session.commit()
-            session.refresh(payment)
+        except IntegrityError:
+            # e.g. a member id that is not a customer; nobody is booked
+            session.rollback()
+            raise ValueError("Group contains members that are not valid customers")
         except SQLAlchemyError:
             session.rollback()
             raise
 
-        return {
-            "booking_id": booking.Booking_ID,
-            "order_id": order["order_id"],
-            "amount": order["amount"],
-            "currency": order["currency"]
-        }
+        outbox_worker.wake()
+        flight_changed(flight)
+        return response
 
     # ============================
     # FINALIZE PAYMENT (WEBHOOK)
     # ============================
     @staticmethod
-    def finalize_on_payment_captured(
+    def _apply_capture(
         session: Session,
-        payment_id: str,
-        order_id: str
-    ):
-        stmt = select(Payment).where(Payment.Gateway_Txn_ID == order_id)
-        payment = session.exec(stmt).first()
-
-        if not payment:
-            raise ValueError("Local payment record not found")
+        payment: Payment,
+        booking: Booking,
+        flight: Flight,
+        payment_id: str
+    ) -> bool:
+        """
+        Capture one loaded payment inside the caller's transaction.
+        Returns False if a concurrent capture already claimed it.
+        """
+        # claim the capture: of concurrent webhooks for one order only
+        # the first one gets past this update
+        claimed = session.execute(
+            update(Payment)
+            .where(Payment.Payment_ID == payment.Payment_ID, Payment.Status != "captured")
+            .values(
+                Status="captured",
+                Gateway_Payment_ID=payment_id,
+                Captured_At=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+        if not claimed:
+            return False
+
+        # a live hold already has the seats; after expiry they must
+        # be taken from inventory again
+        seats_ok = seat_holds.take(session, booking.Booking_ID)
+        if not seats_ok:
+            seats_ok = BookingService.reserve_seats(session, flight.Flight_ID, booking.Seats)
+            if seats_ok and booking.Seat_Labels:
+                try:
+                    SeatMapService.claim(
+                        session, flight.Flight_ID,
+                        SeatMapService.parse(flight, booking.Seat_Labels),
+                    )
+                except ValueError:
+                    # the chosen seats went to someone else meanwhile
+                    BookingService.release_seats(session, flight.Flight_ID, booking.Seats)
+                    seats_ok = False
+
+        # CREATED -> PAID (or REFUNDED when sold out while paying);
+        # conditional so a concurrent cancel is never overwritten
+        flipped = session.execute(
+            update(Booking)
+            .where(Booking.Booking_ID == booking.Booking_ID, Booking.Status == BookingStatus.CREATED)
+            .values(Status=BookingStatus.PAID if seats_ok else BookingStatus.REFUNDED)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+        if not flipped and seats_ok:
+            BookingService.release_seats(session, flight.Flight_ID, booking.Seats)
+            SeatMapService.release(session, flight.Flight_ID, booking.Seat_Labels)
+            seats_ok = False
+
+        if not seats_ok:
+            session.execute(
+                update(Payment)
+                .where(Payment.Payment_ID == payment.Payment_ID)
+                .values(Status="refund_pending")
+                .execution_options(synchronize_session=False)
+            )
+        return True
 
-        if payment.Status == "captured":
-            return payment
-
-        booking = session.get(Booking, payment.Booking_ID)
-        if not booking:
-            raise ValueError("Booking not found")
+    @staticmethod
+    def capture_batch(
+        session: Session,
+        captures: List[Tuple[str, str]]
+    ) -> Tuple[List[Tuple[str, Optional[str]]], List[Flight]]:
+        """
+        Apply many (payment_id, order_id) captures in the caller's
+        transaction; the caller commits, then publish()es the flights.
+
+        Payments, bookings and flights for the whole batch are loaded with
+        one IN query each. Returns an (outcome, error) pair per capture -
+        processed, duplicate, ignored, payment_failed or failed - and the
+        flights whose seats changed.
+        """
+        order_ids = {order_id for _, order_id in captures}
+        payments = {
+            p.Gateway_Txn_ID: p
+            for p in session.exec(select(Payment).where(Payment.Gateway_Txn_ID.in_(order_ids))).all()
+        }
+        bookings = {
+            b.Booking_ID: b
+            for b in session.exec(
+                select(Booking).where(Booking.Booking_ID.in_({p.Booking_ID for p in payments.values()}))
+            ).all()
+        }
+        flights = {
+            f.Flight_ID: f
+            for f in session.exec(
+                select(Flight).where(Flight.Flight_ID.in_({b.Flight_ID for b in bookings.values()}))
+            ).all()
+        }
 
-        if booking.Status == BookingStatus.CANCELLED:
-            return payment
+        outcomes: List[Tuple[str, Optional[str]]] = []
+        changed: Dict[int, Flight] = {}
+        for payment_id, order_id in captures:
+            payment = payments.get(order_id)
+            if not payment:
+                outcomes.append(("failed", "Local payment record not found"))
+                continue
+            if payment.Status == "captured":
+                outcomes.append(("duplicate", None))
+                continue
+
+            booking = bookings.get(payment.Booking_ID)
+            if not booking:
+                outcomes.append(("failed", "Booking not found"))
+                continue
+            if booking.Status == BookingStatus.CANCELLED:
+                outcomes.append(("ignored", None))
+                continue
+
+            flight = flights.get(booking.Flight_ID)
+            if not flight:
+                outcomes.append(("failed", "Flight not found"))
+                continue
+
+            if USE_FAKE_PAYMENTS and _simulate_failure():
+                payment.Status = "failed"
+                session.add(payment)
+                outcomes.append(("payment_failed", None))
+                continue
+
+            if BookingService._apply_capture(session, payment, booking, flight, payment_id):
+                changed[flight.Flight_ID] = flight
+                outcomes.append(("processed", None))
+            else:
+                outcomes.append(("duplicate", None))
+
+        return outcomes, list(changed.values())
 
-        flight = session.get(Flight, booking.Flight_ID)
-        if not flight:
-            raise ValueError("Flight not found")
+    @staticmethod
+    def publish(session: Session, flights: List[Flight]) -> None:
+        """flight_changed() for flights a committed capture batch touched."""
+        for flight in flights:
+            session.refresh(flight)
+            flight_changed(flight)
 
-        if USE_FAKE_PAYMENTS and _simulate_failure():
-            payment.Status = "failed"
-            session.add(payment)
+    @staticmethod
+    def finalize_on_payment_captured(
+        session: Session,
+        payment_id: str,
+        order_id: str
+    ):
+        try:
+            ((outcome, error),), flights = BookingService.capture_batch(session, [(payment_id, order_id)])
             session.commit()
-            return payment
+        except SQLAlchemyError:
+            session.rollback()
+            raise
 
-        payment.Status = "captured"
-        payment.Gateway_Txn_ID = payment_id
-        payment.Captured_At = datetime.utcnow()
+        if outcome == "failed":
+            raise ValueError(error)
 
-        booking.Status = BookingStatus.PAID
-        flight.Available_Seats -= booking.Seats
+        BookingService.publish(session, flights)
+        return session.exec(select(Payment).where(Payment.Gateway_Txn_ID == order_id)).first()
+
+    # ============================
+    # CANCEL BOOKING
+    # ============================
+    @staticmethod
+    def cancel(session: Session, booking: Booking, flight: Flight) -> None:
+        previous = booking.Status
+
+        # only the request that flips the status gives the seats back
+        flipped = session.execute(
+            update(Booking)
+            .where(Booking.Booking_ID == booking.Booking_ID, Booking.Status == previous)
+            .values(Status=BookingStatus.CANCELLED)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+        if not flipped:
+            session.rollback()
+            raise ValueError("Booking was modified concurrently")
 
         try:
-            session.add(payment)
-            session.add(booking)
-            session.add(flight)
+            # CREATED bookings only have seats while their hold lasts
+            if previous in (BookingStatus.PAID, BookingStatus.REBOOKED) or (
+                previous == BookingStatus.CREATED
+                and seat_holds.take(session, booking.Booking_ID, converted=False)
+            ):
+                BookingService.release_seats(session, flight.Flight_ID, booking.Seats)
+                SeatMapService.release(session, flight.Flight_ID, booking.Seat_Labels)
             session.commit()
-            session.refresh(payment)
-            return payment
+            session.refresh(booking)
+            session.refresh(flight)
         except SQLAlchemyError:
             session.rollback()
             raise
+
+        flight_changed(flight)
@@ -0,0 +1,96 @@
+# backend/services/customer_history.py
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlmodel import select, func
+
+from ..model import Booking, Company, Flight, Payment
+from ..utils.pagination import encode_cursor, decode_cursor
+from .booking_list import MAX_PAGE_SIZE
+
+
+class CustomerHistoryService:
+    """
+    A customer's travel history, latest departure first, one page per
+    query: booking, flight, airline and payment come back joined in a
+    slim projection, keyset-paginated on (Departure_Time, Booking_ID).
+    """
+
+    @staticmethod
+    def build_query(
+        customer_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ):
+        if limit < 1 or limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+
+        dep = Flight.Departure_Time
+        # the booking's latest payment, so a retried payment cannot
+        # duplicate the booking's row
+        latest_payment = (
+            select(func.max(Payment.Payment_ID))
+            .where(Payment.Booking_ID == Booking.Booking_ID)
+            .correlate(Booking)
+            .scalar_subquery()
+        )
+
+        q = (
+            select(
+                Booking.Booking_ID,
+                Booking.Seats,
+                Booking.Status,
+                Booking.Created_At,
+                Flight.Dept_Location,
+                Flight.Arr_Location,
+                dep,
+                Flight.Arrival_Time,
+                Company.Name.label("Company_Name"),
+                Payment.Amount.label("Payment_Amount"),
+                Payment.Status.label("Payment_Status"),
+            )
+            .join(Flight, Flight.Flight_ID == Booking.Flight_ID)
+            .outerjoin(Company, Company.Company_ID == Flight.Company_ID)
+            .outerjoin(Payment, Payment.Payment_ID == latest_payment)
+            .where(Booking.Customer_ID == customer_id)
+        )
+        if date_from:
+            q = q.where(dep >= datetime.combine(date_from, time.min))
+        if date_to:
+            q = q.where(dep < datetime.combine(date_to + timedelta(days=1), time.min))
+
+        if cursor:
+            values = decode_cursor(cursor)
+            if len(values) != 2:
+                raise ValueError("Invalid cursor")
+            last_dep, last_id = values
+            q = q.where(or_(dep < last_dep, and_(dep == last_dep, Booking.Booking_ID < last_id)))
+
+        return q.order_by(dep.desc(), Booking.Booking_ID.desc()).limit(limit + 1)
+
+    @staticmethod
+    def shape(rows, limit: int) -> Tuple[List[Dict], Optional[str]]:
+        history = [
+            {
+                "booking_id": r.Booking_ID,
+                "route": f"{r.Dept_Location} → {r.Arr_Location}",
+                "company": r.Company_Name,
+                "departure": r.Departure_Time,
+                "arrival": r.Arrival_Time,
+                "seats": r.Seats,
+                "status": r.Status,
+                "payment_amount": r.Payment_Amount,
+                "payment_status": r.Payment_Status,
+                "booking_date": r.Created_At,
+            }
+            for r in rows[:limit]
+        ]
+        if len(rows) <= limit:
+            return history, None
+        last = history[-1]
+        return history, encode_cursor(last["departure"], last["booking_id"])
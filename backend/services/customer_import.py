@@ -0,0 +1,288 @@
+# backend/services/customer_import.py
+import csv
+import io
+import json
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import insert
+from sqlmodel import Session, select
+
+from ..config import (
+    CUSTOMER_IMPORT_BATCH,
+    CUSTOMER_IMPORT_WORKERS,
+    CUSTOMER_IMPORT_DIR,
+    CUSTOMER_IMPORT_KEEP_JOBS,
+)
+from ..db import engine
+from ..model import Customer, UserRole
+from ..utils.streaming import STREAM_FORMATS
+from .passwords import _hash, is_prehashed
+
+FIELDS = ("name", "email", "phone", "password")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+class ImportJob:
+    """One upload's progress; counters are written by the import thread only."""
+
+    __slots__ = (
+        "id", "format", "path", "errors_path", "status", "error",
+        "bytes_total", "bytes_read", "rows", "imported", "duplicates", "invalid",
+        "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, job_id: str, fmt: str, path: str, errors_path: str, bytes_total: int):
+        self.id = job_id
+        self.format = fmt
+        self.path = path
+        self.errors_path = errors_path
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.bytes_total = bytes_total
+        self.bytes_read = 0
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def progress(self) -> dict:
+        end = self.finished_at or datetime.utcnow()
+        elapsed = (end - self.started_at).total_seconds() if self.started_at else 0.0
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "format": self.format,
+            "bytes_total": self.bytes_total,
+            "bytes_read": self.bytes_read,
+            "percent": round(100 * self.bytes_read / self.bytes_total, 1) if self.bytes_total else 100.0,
+            "rows": self.rows,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class CustomerImporter:
+    """
+    Bulk customer import from a CSV or NDJSON upload.
+
+    Jobs run one at a time on a background thread, reading the upload
+    from disk in CUSTOMER_IMPORT_BATCH-row batches. Per batch: rows are
+    validated, emails deduplicated against the file and against the
+    table with one IN lookup on ix_customer_email, plain passwords hashed
+    across a process pool, and the rows inserted with one executemany and
+    one commit. Hashing of the next batch overlaps the insert of the
+    previous one. Rejected rows go to the job's error CSV
+    (line, email, error).
+    """
+
+    def __init__(
+        self,
+        batch_size: int = CUSTOMER_IMPORT_BATCH,
+        workers: int = CUSTOMER_IMPORT_WORKERS,
+        directory: str = CUSTOMER_IMPORT_DIR,
+        keep_jobs: int = CUSTOMER_IMPORT_KEEP_JOBS,
+    ):
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+        self.directory = directory
+        self.keep_jobs = keep_jobs
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._runner: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    # ---------------------------
+    # JOBS
+    # ---------------------------
+    def new_path(self, suffix: str) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        return os.path.join(self.directory, f"{uuid.uuid4().hex}.{suffix}")
+
+    def submit(self, path: str, fmt: str) -> ImportJob:
+        """Queue an upload already written to `path`; the job owns the file."""
+        if fmt not in STREAM_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(STREAM_FORMATS)}")
+
+        job_id = uuid.uuid4().hex
+        job = ImportJob(job_id, fmt, path, os.path.join(self.directory, f"{job_id}.errors.csv"), os.path.getsize(path))
+        with self._lock:
+            if self._runner is None:
+                self._runner = ThreadPoolExecutor(1, thread_name_prefix="customer-import")
+            self._jobs[job_id] = job
+            self._evict()
+            self._runner.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _evict(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        for job in finished[: max(0, len(finished) - self.keep_jobs)]:
+            del self._jobs[job.id]
+            if os.path.exists(job.errors_path):
+                os.remove(job.errors_path)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            runner, self._runner = self._runner, None
+        if runner is not None:
+            runner.shutdown(wait=False, cancel_futures=True)
+
+    # ---------------------------
+    # READING
+    # ---------------------------
+    @staticmethod
+    def _records(job: ImportJob, f: io.TextIOWrapper) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+        """(line, record, parse error) per data row."""
+        if job.format == "csv":
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record, None
+            return
+
+        for line, text in enumerate(f, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError:
+                yield line, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line, None, "Expected a JSON object"
+                continue
+            yield line, record, None
+
+    def _batches(self, job: ImportJob, f: io.TextIOWrapper) -> Iterator[List[Tuple[int, Optional[dict], Optional[str]]]]:
+        batch = []
+        for item in self._records(job, f):
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                job.bytes_read = f.buffer.tell()
+                yield batch
+                batch = []
+        job.bytes_read = job.bytes_total
+        if batch:
+            yield batch
+
+    # ---------------------------
+    # VALIDATION / DEDUPE
+    # ---------------------------
+    @staticmethod
+    def _validate(fields: dict) -> Tuple[Optional[Dict], Optional[str]]:
+        values = {k: str(fields.get(k) or "").strip() for k in FIELDS}
+        missing = [k for k in FIELDS if not values[k]]
+        if missing:
+            return None, f"Missing {', '.join(missing)}"
+        if not _EMAIL.match(values["email"]):
+            return None, "Invalid email"
+        return {
+            "Name": values["name"],
+            "Email": values["email"],
+            "Phone": values["phone"],
+            "Password": values["password"],
+            # imports never grant roles
+            "Role": UserRole.CUSTOMER,
+        }, None
+
+    def _prepare(
+        self,
+        session: Session,
+        job: ImportJob,
+        batch: List[Tuple[int, Optional[dict], Optional[str]]],
+        seen: Set[str],
+        errors,
+    ) -> List[Dict]:
+        rows: Dict[str, Tuple[int, Dict]] = {}
+        for line, record, error in batch:
+            job.rows += 1
+            # header case and padding do not matter; extra CSV cells (key None) are dropped
+            fields = {str(k).strip().lower(): v for k, v in (record or {}).items() if k is not None}
+            row = None
+            if error is None:
+                row, error = self._validate(fields)
+            if error is not None:
+                job.invalid += 1
+                errors.writerow([line, fields.get("email") or "", error])
+                continue
+            email = row["Email"]
+            if email in seen or email in rows:
+                job.duplicates += 1
+                errors.writerow([line, email, "Duplicate email in file"])
+                continue
+            rows[email] = (line, row)
+
+        if rows:
+            existing = session.exec(select(Customer.Email).where(Customer.Email.in_(list(rows)))).all()
+            for email in existing:
+                line, _ = rows.pop(email)
+                job.duplicates += 1
+                errors.writerow([line, email, "Email already registered"])
+
+        seen.update(rows)
+        return [row for _, row in rows.values()]
+
+    # ---------------------------
+    # RUN
+    # ---------------------------
+    def _insert(self, session: Session, job: ImportJob, rows: List[Dict], plain: List[int], hashes) -> None:
+        for i, hashed in zip(plain, hashes):
+            rows[i]["Password"] = hashed
+        if rows:
+            session.execute(insert(Customer), rows)
+            session.commit()
+        job.imported += len(rows)
+
+    def _run(self, job: ImportJob) -> None:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        # one pool per job: no idle hashing processes between imports
+        pool = ProcessPoolExecutor(self.workers)
+        try:
+            with open(job.path, encoding="utf-8-sig", newline="") as f, \
+                    open(job.errors_path, "w", newline="") as ef, \
+                    Session(engine) as session:
+                errors = csv.writer(ef)
+                errors.writerow(["line", "email", "error"])
+                seen: Set[str] = set()
+                pending = None
+                for batch in self._batches(job, f):
+                    rows = self._prepare(session, job, batch, seen, errors)
+                    plain = [i for i, r in enumerate(rows) if not is_prehashed(r["Password"])]
+                    chunk = max(1, len(plain) // (self.workers * 4))
+                    # submitted now, collected after the previous batch is written
+                    hashes = pool.map(_hash, [rows[i]["Password"] for i in plain], chunksize=chunk)
+                    if pending is not None:
+                        self._insert(session, job, *pending)
+                    pending = (rows, plain, hashes)
+                if pending is not None:
+                    self._insert(session, job, *pending)
+            job.status = "done"
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            pool.shutdown(cancel_futures=True)
+            job.finished_at = datetime.utcnow()
+            if os.path.exists(job.path):
+                os.remove(job.path)
+
+
+importer = CustomerImporter()
@@ -1,10 +1,39 @@
 # backend/services/disruption_assistant.py
-from sqlmodel import select
-from ..model import Flight, Notification
-from sqlmodel import Session
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from ..config import DISRUPTION_WINDOW_HOURS, DISRUPTION_RETRIES
+from ..model import Booking, BookingStatus, Flight, FlightStatus, Notification, SeatHold
+from .booking_service import BookingService
+from .flight_events import flight_changed
+
+# bookings that own paid seats; these are moved, unpaid ones are cancelled
+_PAID = (BookingStatus.PAID, BookingStatus.REBOOKED)
+_ACTIVE = (BookingStatus.CREATED, BookingStatus.PAID, BookingStatus.REBOOKED)
+
+
+class _CapacityChanged(Exception):
+    """An alternative flight sold seats between planning and reserving."""
+
 
 class DisruptionAssistant:
+    """
+    Customer handling for delayed and cancelled flights.
+
+    reaccommodate() handles a whole cancelled flight at once: one query
+    for its bookings, one for the alternatives, an in-memory assignment
+    and then one seat UPDATE per target flight, one bulk booking UPDATE
+    and one executemany notification INSERT, all in a single transaction.
+    The cost grows with the number of alternative flights, not with the
+    number of passengers.
+    """
+
     @staticmethod
     def suggest_alternatives(session: Session, flight_id: int, max_suggestions: int = 3):
         # fetch original
@@ -27,8 +56,228 @@ class DisruptionAssistant:
         return cand[:max_suggestions]
 
     @staticmethod
-    def notify_customers_of_disruption(session: Session, flight_id: int, reason: str):
-        # create notifications for customers who booked this flight
-        q = select(Notification)  # placeholder - real implementation should fetch bookings and customers
-        # implement per your booking model
-        return True
+    def notify_customers_of_disruption(session: Session, flight_id: int, reason: str) -> int:
+        """One notification per active booking on the flight; commits."""
+        flight = session.get(Flight, flight_id)
+        if flight is None:
+            return 0
+
+        bookings = session.exec(
+            select(Booking.Booking_ID, Booking.Customer_ID)
+            .where(Booking.Flight_ID == flight_id, Booking.Status.in_(_ACTIVE))
+        ).all()
+        if not bookings:
+            return 0
+
+        now = datetime.utcnow()
+        session.execute(insert(Notification), [
+            {
+                "Customer_ID": customer_id,
+                "Kind": "flight_disruption",
+                "Payload": {
+                    "booking_id": booking_id,
+                    "flight_id": flight_id,
+                    "status": FlightStatus(flight.Status).value,
+                    "reason": reason,
+                    "departure_time": flight.Departure_Time.isoformat(),
+                    "arrival_time": flight.Arrival_Time.isoformat(),
+                },
+                "Sent": False,
+                "Created_At": now,
+            }
+            for booking_id, customer_id in bookings
+        ])
+        session.commit()
+        return len(bookings)
+
+    # ---------------------------
+    # RE-ACCOMMODATION
+    # ---------------------------
+    @staticmethod
+    def assign(
+        bookings: List[Tuple[int, int]],
+        flights: List[Tuple[int, int]],
+    ) -> Tuple[Dict[int, int], List[int]]:
+        """
+        First-fit decreasing: the largest parties go first, each onto the
+        best-ranked flight with room for the whole party, so groups are
+        never split. bookings are (Booking_ID, Seats), flights are
+        (Flight_ID, free seats) best first. Returns {Booking_ID: Flight_ID}
+        and the bookings that did not fit anywhere.
+        """
+        free = dict(flights)
+        order = [flight_id for flight_id, _ in flights]
+        placed: Dict[int, int] = {}
+        unplaced: List[int] = []
+
+        for booking_id, seats in sorted(bookings, key=lambda b: (-b[1], b[0])):
+            for flight_id in order:
+                if free[flight_id] >= seats:
+                    free[flight_id] -= seats
+                    placed[booking_id] = flight_id
+                    break
+            else:
+                unplaced.append(booking_id)
+        return placed, unplaced
+
+    @staticmethod
+    def _alternatives(session: Session, flight: Flight, now: datetime) -> List[Flight]:
+        d0 = flight.Departure_Time
+        rows = session.exec(
+            select(Flight)
+            .where(
+                Flight.Dept_Location == flight.Dept_Location,
+                Flight.Arr_Location == flight.Arr_Location,
+                Flight.Flight_ID != flight.Flight_ID,
+                Flight.Status != FlightStatus.CANCELLED,
+                Flight.Departure_Time > max(now, d0 - timedelta(days=1)),
+                Flight.Departure_Time <= d0 + timedelta(hours=DISRUPTION_WINDOW_HOURS),
+                Flight.Available_Seats > 0,
+            )
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).all()
+        # closest to the original departure first
+        rows.sort(key=lambda f: (abs(f.Departure_Time - d0), f.Flight_ID))
+        return rows
+
+    @staticmethod
+    def _reaccommodate(session: Session, flight: Flight, reason: Optional[str]) -> Tuple[dict, List[Flight]]:
+        now = datetime.utcnow()
+        bookings = session.exec(
+            select(Booking.Booking_ID, Booking.Customer_ID, Booking.Seats, Booking.Status)
+            .where(Booking.Flight_ID == flight.Flight_ID, Booking.Status.in_(_ACTIVE))
+            .with_for_update()
+        ).all()
+        by_id = {b.Booking_ID: b for b in bookings}
+        paid = [(b.Booking_ID, b.Seats) for b in bookings if b.Status in _PAID]
+        unpaid = [b.Booking_ID for b in bookings if b.Status == BookingStatus.CREATED]
+
+        alternatives = DisruptionAssistant._alternatives(session, flight, now) if paid else []
+        targets = {f.Flight_ID: f for f in alternatives}
+        placed, unplaced = DisruptionAssistant.assign(
+            paid, [(f.Flight_ID, f.Available_Seats) for f in alternatives]
+        )
+
+        seats_by_flight: Dict[int, int] = defaultdict(int)
+        for booking_id, flight_id in placed.items():
+            seats_by_flight[flight_id] += by_id[booking_id].Seats
+        for flight_id, seats in seats_by_flight.items():
+            if not BookingService.reserve_seats(session, flight_id, seats):
+                raise _CapacityChanged()
+
+        if placed:
+            # moved in place so payment, travellers and history follow;
+            # seat selections do not carry over to another aircraft
+            session.execute(update(Booking), [
+                {
+                    "Booking_ID": booking_id,
+                    "Flight_ID": flight_id,
+                    "Status": BookingStatus.REBOOKED,
+                    "Seat_Labels": None,
+                }
+                for booking_id, flight_id in placed.items()
+            ])
+
+        if unpaid:
+            # unpaid bookings lose their hold; a later capture is refunded
+            session.execute(delete(SeatHold).where(SeatHold.Booking_ID.in_(unpaid)))
+            session.execute(
+                update(Booking)
+                .where(Booking.Booking_ID.in_(unpaid), Booking.Status == BookingStatus.CREATED)
+                .values(Status=BookingStatus.CANCELLED)
+                .execution_options(synchronize_session=False)
+            )
+
+        notifications = []
+        for booking_id, flight_id in placed.items():
+            to = targets[flight_id]
+            notifications.append({
+                "Customer_ID": by_id[booking_id].Customer_ID,
+                "Kind": "flight_rebooked",
+                "Payload": {
+                    "booking_id": booking_id,
+                    "from_flight_id": flight.Flight_ID,
+                    "to_flight_id": flight_id,
+                    "flight_code": to.Flight_Code,
+                    "departure_time": to.Departure_Time.isoformat(),
+                    "arrival_time": to.Arrival_Time.isoformat(),
+                    "reason": reason,
+                },
+                "Sent": False,
+                "Created_At": now,
+            })
+        for booking_id in unplaced + unpaid:
+            notifications.append({
+                "Customer_ID": by_id[booking_id].Customer_ID,
+                "Kind": "flight_cancelled",
+                "Payload": {
+                    "booking_id": booking_id,
+                    "flight_id": flight.Flight_ID,
+                    "booking_cancelled": booking_id in unpaid,
+                    "reason": reason,
+                },
+                "Sent": False,
+                "Created_At": now,
+            })
+        if notifications:
+            session.execute(insert(Notification), notifications)
+
+        result = {
+            "flight_id": flight.Flight_ID,
+            "affected": len(bookings),
+            "rebooked": len(placed),
+            "unplaced": sorted(unplaced),
+            "cancelled_unpaid": len(unpaid),
+            "notifications": len(notifications),
+            "seats_by_flight": dict(seats_by_flight),
+        }
+        return result, [targets[flight_id] for flight_id in seats_by_flight]
+
+    @staticmethod
+    def reaccommodate(
+        session: Session,
+        flight_id: int,
+        reason: Optional[str] = None,
+        update_flight: Optional[Callable[[Flight], None]] = None,
+    ) -> dict:
+        """
+        Move every paid booking off a cancelled flight onto alternatives on
+        the same route, cancel its unpaid bookings and notify everyone.
+        Paid bookings that fit nowhere stay on the flight and are reported
+        in "unplaced". The cancelled flight's own inventory is left as is.
+
+        `update_flight` (e.g. setting the status to CANCELLED) is applied
+        in the same transaction, so the flight is only changed if its
+        bookings were handled too.
+        """
+        t0 = time.perf_counter()
+        flight = session.get(Flight, flight_id)
+        if flight is None:
+            raise ValueError("Flight not found")
+
+        for _ in range(DISRUPTION_RETRIES):
+            try:
+                if update_flight is not None:
+                    # re-applied after a rollback discarded it
+                    update_flight(flight)
+                    session.add(flight)
+                result, touched = DisruptionAssistant._reaccommodate(session, flight, reason)
+                session.commit()
+                break
+            except _CapacityChanged:
+                session.rollback()
+            except SQLAlchemyError:
+                session.rollback()
+                raise
+        else:
+            raise ValueError("Alternative flights kept changing, please retry")
+
+        if update_flight is not None:
+            touched = [flight] + touched
+        for f in touched:
+            session.refresh(f)
+            flight_changed(f)
+
+        result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return result
@@ -0,0 +1,254 @@
+# backend/services/fare_calendar.py
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, func
+
+from ..config import FARE_CALENDAR_INTERVAL_SECONDS
+from ..db import engine
+from ..model import FareCalendarDay, Flight, FlightStatus
+from ..utils.response_cache import response_cache
+from ..utils.workers import PeriodicWorker, register
+from .flight_events import subscribe
+
+MAX_CALENDAR_DAYS = 370
+
+
+def _as_date(v) -> date:
+    # DATE() comes back as a string from SQLite and a date from MySQL
+    return date.fromisoformat(v) if isinstance(v, str) else v
+
+
+class FareCalendarService:
+    """
+    Cheapest fare per departure day, kept in fare_calendar_day.
+
+    A route is materialized in one grouped aggregate the first time it is
+    asked for; after that committed flight writes queue their (route,
+    day) for FareCalendarUpdater, which re-aggregates only those days.
+    Reading a 60-day calendar is then a single range scan on
+    ux_fare_calendar_route_day.
+    """
+
+    @staticmethod
+    def _aggregate(
+        session: Session,
+        dept: str,
+        arr: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Dict[date, tuple]:
+        day = func.date(Flight.Departure_Time)
+        q = (
+            select(
+                day.label("day"),
+                func.min(Flight.Price_Per_Seat),
+                func.sum(Flight.Available_Seats),
+                func.count(Flight.Flight_ID),
+            )
+            .where(
+                Flight.Dept_Location == dept,
+                Flight.Arr_Location == arr,
+                Flight.Status != FlightStatus.CANCELLED,
+            )
+            .group_by(day)
+        )
+        if start:
+            q = q.where(Flight.Departure_Time >= start)
+        if end:
+            q = q.where(Flight.Departure_Time < end)
+
+        return {
+            _as_date(d): (float(min_price), int(seats or 0), int(n))
+            for d, min_price, seats, n in session.exec(q).all()
+        }
+
+    @staticmethod
+    def is_materialized(session: Session, dept: str, arr: str) -> bool:
+        return session.exec(
+            select(FareCalendarDay.Calendar_ID)
+            .where(FareCalendarDay.Dept_Location == dept, FareCalendarDay.Arr_Location == arr)
+            .limit(1)
+        ).first() is not None
+
+    @staticmethod
+    def rebuild_route(session: Session, dept: str, arr: str) -> int:
+        days = FareCalendarService._aggregate(session, dept, arr)
+        session.execute(
+            delete(FareCalendarDay).where(
+                FareCalendarDay.Dept_Location == dept,
+                FareCalendarDay.Arr_Location == arr,
+            )
+        )
+        now = datetime.utcnow()
+        session.add_all(
+            FareCalendarDay(
+                Dept_Location=dept,
+                Arr_Location=arr,
+                Day=d,
+                Min_Price=min_price,
+                Seats_Available=seats,
+                Flights=n,
+                Updated_At=now,
+            )
+            for d, (min_price, seats, n) in days.items()
+        )
+        session.commit()
+        return len(days)
+
+    @staticmethod
+    def refresh_day(session: Session, dept: str, arr: str, day: date) -> None:
+        start = datetime.combine(day, time.min)
+        agg = FareCalendarService._aggregate(session, dept, arr, start, start + timedelta(days=1))
+
+        # a second pass only follows a lost INSERT race and finds the row
+        for _ in range(2):
+            row = session.exec(
+                select(FareCalendarDay).where(
+                    FareCalendarDay.Dept_Location == dept,
+                    FareCalendarDay.Arr_Location == arr,
+                    FareCalendarDay.Day == day,
+                )
+            ).first()
+
+            if day not in agg:
+                if row:
+                    session.delete(row)
+                    session.commit()
+                return
+
+            min_price, seats, n = agg[day]
+            row = row or FareCalendarDay(Dept_Location=dept, Arr_Location=arr, Day=day, Min_Price=min_price)
+            row.Min_Price = min_price
+            row.Seats_Available = seats
+            row.Flights = n
+            row.Updated_At = datetime.utcnow()
+            session.add(row)
+            try:
+                session.commit()
+                return
+            except IntegrityError:
+                # another worker inserted the day first; update its row
+                session.rollback()
+        raise RuntimeError(f"Could not store fare calendar day {dept}-{arr} {day}")
+
+    @staticmethod
+    def calendar(session: Session, dept: str, arr: str, day_from: date, day_to: date) -> List[dict]:
+        if day_to < day_from:
+            raise ValueError("'to' must not be before 'from'")
+        if (day_to - day_from).days >= MAX_CALENDAR_DAYS:
+            raise ValueError(f"Date range is limited to {MAX_CALENDAR_DAYS} days")
+
+        if not FareCalendarService.is_materialized(session, dept, arr):
+            try:
+                FareCalendarService.rebuild_route(session, dept, arr)
+            except IntegrityError:
+                # a concurrent request materialized the route first
+                session.rollback()
+
+        rows = session.exec(
+            select(FareCalendarDay)
+            .where(
+                FareCalendarDay.Dept_Location == dept,
+                FareCalendarDay.Arr_Location == arr,
+                FareCalendarDay.Day >= day_from,
+                FareCalendarDay.Day <= day_to,
+            )
+            .order_by(FareCalendarDay.Day)
+        ).all()
+        by_day = {r.Day: r for r in rows}
+
+        out = []
+        d = day_from
+        while d <= day_to:
+            r = by_day.get(d)
+            out.append({
+                "date": d,
+                "min_price": r.Min_Price if r else None,
+                "seats_available": r.Seats_Available if r else 0,
+                "flights": r.Flights if r else 0,
+            })
+            d += timedelta(days=1)
+        return out
+
+    @staticmethod
+    def refresh_days(session: Session, dept: str, arr: str, days: List[date]) -> int:
+        # unmaterialized routes are built in full on first read
+        if not FareCalendarService.is_materialized(session, dept, arr):
+            return 0
+        for day in days:
+            FareCalendarService.refresh_day(session, dept, arr, day)
+        return len(days)
+
+
+class FareCalendarUpdater:
+    """
+    Keeps materialized calendars current off the write path.
+
+    flight_changed() only queues the flight's (route, day); the worker
+    re-aggregates each queued day once per batch, however many writes
+    touched it in between, and then bumps the "fare-calendar" response
+    cache version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Set[Tuple[str, str, date]] = set()
+
+        self.batches = 0
+        self.days_refreshed = 0
+
+    def mark(self, dept: str, arr: str, days: List[date]) -> None:
+        with self._lock:
+            self._pending.update((dept, arr, d) for d in days)
+        worker.wake()
+
+    def on_flight_change(self, flight: Flight) -> None:
+        # a flight moved to another day also needs mark() for the day it
+        # left; the event only carries the new departure
+        self.mark(flight.Dept_Location, flight.Arr_Location, [flight.Departure_Time.date()])
+
+    def run_once(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return 0
+
+        by_route: Dict[Tuple[str, str], List[date]] = {}
+        for dept, arr, day in sorted(pending):
+            by_route.setdefault((dept, arr), []).append(day)
+
+        refreshed = 0
+        try:
+            with Session(engine) as session:
+                for (dept, arr), days in by_route.items():
+                    refreshed += FareCalendarService.refresh_days(session, dept, arr, days)
+        except Exception:
+            # keep the days for the next run
+            with self._lock:
+                self._pending.update(pending)
+            raise
+
+        if refreshed:
+            # cached /flights/calendar responses were built from the old rows
+            response_cache.bump("fare-calendar")
+        with self._lock:
+            self.batches += 1
+            self.days_refreshed += refreshed
+        return refreshed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending_days": len(self._pending),
+                "batches": self.batches,
+                "days_refreshed": self.days_refreshed,
+            }
+
+
+calendar_updater = FareCalendarUpdater()
+worker = register(PeriodicWorker("fare-calendar", FARE_CALENDAR_INTERVAL_SECONDS, calendar_updater.run_once))
+subscribe(calendar_updater.on_flight_change)
@@ -0,0 +1,217 @@
+# backend/services/fare_engine.py
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple, Union
+
+from ..config import (
+    SEAT_LAYOUT,
+    FARE_HIGH_ROWS,
+    FARE_LOW_ROWS,
+    FARE_WINDOW_SURCHARGE,
+    FARE_AISLE_SURCHARGE,
+    FARE_BAGGAGE_PER_KG,
+    FARE_TABLE_CACHE,
+)
+from ..model import Flight
+from .seat_map import SeatLayout
+
+
+def _paise(rupees) -> int:
+    return int(round(float(rupees) * 100))
+
+
+def _inputs(flight: Union[Flight, dict]) -> Tuple[int, float, int, Dict]:
+    # a Flight or an inventory row
+    if isinstance(flight, dict):
+        return flight["Flight_ID"], flight["Price_Per_Seat"], flight["Total_Seats"], flight.get("Seat_Pricing") or {}
+    return flight.Flight_ID, flight.Price_Per_Seat, flight.Total_Seats, flight.Seat_Pricing or {}
+
+
+# =========================
+# FARE TABLE
+# =========================
+class FareTable:
+    """
+    One flight's pricing, compiled. All amounts are paise; seat[i] is the
+    surcharge of seat index i (the seat map's row-major order).
+    """
+
+    __slots__ = ("flight_id", "key", "layout", "base", "seat", "baggage_per_kg")
+
+    def __init__(self, flight_id: int, key: tuple, layout: SeatLayout, base: int, seat: array, baggage_per_kg: int):
+        self.flight_id = flight_id
+        self.key = key
+        self.layout = layout
+        self.base = base
+        self.seat = seat
+        self.baggage_per_kg = baggage_per_kg
+
+    def indexes(self, labels: Sequence[str]) -> List[int]:
+        indexes = [self.layout.index(l) for l in labels]
+        if len(set(indexes)) != len(indexes):
+            raise ValueError("The same seat was selected more than once")
+        return indexes
+
+
+# =========================
+# FARE ENGINE
+# =========================
+class FareEngine:
+    """
+    Pricing rules compiled per flight.
+
+    A flight's fare inputs (Price_Per_Seat, Total_Seats, Seat_Pricing)
+    are turned once into a FareTable: the fare per seat and a typed array
+    holding every seat's surcharge with the row bands and window/aisle
+    rules already applied. A quote is then index lookups and integer
+    sums. Tables are cached per flight and recompiled when the inputs
+    change.
+
+    Seat_Pricing keys: "high", "low", "free" (row band surcharges), and
+    optionally "high_rows", "low_rows", "window", "aisle" and
+    "baggage_per_kg" to override the FARE_* defaults for one flight.
+    """
+
+    def __init__(self, max_tables: int = FARE_TABLE_CACHE):
+        self.max_tables = max_tables
+        self._tables: "OrderedDict[int, FareTable]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.compiled = 0
+
+    # ---------------------------
+    # COMPILE
+    # ---------------------------
+    @staticmethod
+    def compile(flight: Union[Flight, dict]) -> FareTable:
+        flight_id, price, total_seats, pricing = _inputs(flight)
+        layout = SeatLayout(SEAT_LAYOUT, total_seats)
+
+        high_rows = int(pricing.get("high_rows", FARE_HIGH_ROWS))
+        low_rows = int(pricing.get("low_rows", FARE_LOW_ROWS))
+        bands = (
+            _paise(pricing.get("high", 0)),
+            _paise(pricing.get("low", 0)),
+            _paise(pricing.get("free", 0)),
+        )
+        row_charge = [
+            bands[0] if row <= high_rows else bands[1] if row <= low_rows else bands[2]
+            for row in range(1, layout.rows + 1)
+        ]
+
+        # window: outermost letters; aisle: letters next to a "-"
+        blocks = [b for b in layout.layout.split("-") if b]
+        window = {blocks[0][0], blocks[-1][-1]}
+        aisle = {b[-1] for b in blocks[:-1]} | {b[0] for b in blocks[1:]}
+        window_charge = _paise(pricing.get("window", FARE_WINDOW_SURCHARGE))
+        aisle_charge = _paise(pricing.get("aisle", FARE_AISLE_SURCHARGE))
+        col_charge = [
+            window_charge if c in window else aisle_charge if c in aisle else 0
+            for c in layout.letters
+        ]
+
+        cols = layout.cols
+        seat = array("l", (row_charge[i // cols] + col_charge[i % cols] for i in range(total_seats)))
+        return FareTable(
+            flight_id=flight_id,
+            key=FareEngine._key(flight),
+            layout=layout,
+            base=_paise(price),
+            seat=seat,
+            baggage_per_kg=_paise(pricing.get("baggage_per_kg", FARE_BAGGAGE_PER_KG)),
+        )
+
+    @staticmethod
+    def _key(flight: Union[Flight, dict]) -> tuple:
+        _, price, total_seats, pricing = _inputs(flight)
+        return (float(price), total_seats, SEAT_LAYOUT, repr(sorted(pricing.items())))
+
+    def table(self, flight: Union[Flight, dict]) -> FareTable:
+        flight_id = _inputs(flight)[0]
+        key = self._key(flight)
+        with self._lock:
+            table = self._tables.get(flight_id)
+            if table is not None and table.key == key:
+                self._tables.move_to_end(flight_id)
+                self.hits += 1
+                return table
+
+        table = self.compile(flight)
+        with self._lock:
+            self.compiled += 1
+            self._tables[flight_id] = table
+            self._tables.move_to_end(flight_id)
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+        return table
+
+    # ---------------------------
+    # QUOTE
+    # ---------------------------
+    @staticmethod
+    def quote(table: FareTable, seats: int, indexes: Sequence[int] = (), baggage_kg: int = 0) -> Dict[str, int]:
+        base = table.base * seats
+        seat = sum(table.seat[i] for i in indexes)
+        baggage = table.baggage_per_kg * max(0, baggage_kg)
+        return {"base": base, "seat": seat, "baggage": baggage, "total": base + seat + baggage}
+
+    @staticmethod
+    def quote_many(
+        table: FareTable,
+        selections: Sequence[Sequence[str]],
+        seats: int,
+        baggage_kg: Sequence[int],
+    ) -> List[dict]:
+        """
+        Every seat selection x baggage option. Each selection is resolved
+        and summed once and each baggage charge computed once; the grid
+        is then plain additions. An empty selection prices `seats` seats
+        with no seat choice.
+        """
+        baggage = [(kg, table.baggage_per_kg * max(0, kg)) for kg in baggage_kg]
+        out = []
+        for labels in selections:
+            try:
+                indexes = table.indexes(labels)
+            except ValueError as e:
+                out.append({"seats": list(labels), "error": str(e)})
+                continue
+
+            base = table.base * (len(indexes) or seats)
+            fixed = base + sum(table.seat[i] for i in indexes)
+            for kg, charge in baggage:
+                out.append({
+                    "seats": list(labels),
+                    "baggage_kg": kg,
+                    "base": base,
+                    "seat": fixed - base,
+                    "baggage": charge,
+                    "total": fixed + charge,
+                })
+        return out
+
+    @staticmethod
+    def seat_prices(table: FareTable) -> dict:
+        """Price of every seat, in seat map order, for one passenger."""
+        base = table.base
+        return {
+            "layout": table.layout.layout,
+            "rows": table.layout.rows,
+            "seats": table.layout.seats,
+            "prices": [base + s for s in table.seat],
+        }
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.compiled
+            return {
+                "tables": len(self._tables),
+                "hits": self.hits,
+                "compiled": self.compiled,
+                "hit_ratio": round(self.hits / total, 3) if total else None,
+            }
+
+
+fare_engine = FareEngine()
@@ -0,0 +1,40 @@
+# backend/services/flight_events.py
+import logging
+from typing import Callable, List
+
+from ..model import Flight
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# FLIGHT CHANGE HOOK
+# =========================
+# Write paths (add flight, booking capture, cancellation) call
+# flight_changed() after their commit; in-process read models subscribe
+# here instead of being called from every route. A write that sets
+# Price_Per_Seat passes price_changed=True, which also reaches the
+# listeners subscribed with prices_only.
+
+FlightListener = Callable[[Flight], None]
+
+_listeners: List[FlightListener] = []
+_price_listeners: List[FlightListener] = []
+
+
+def subscribe(fn: FlightListener, prices_only: bool = False) -> FlightListener:
+    listeners = _price_listeners if prices_only else _listeners
+    if fn not in listeners:
+        listeners.append(fn)
+    return fn
+
+
+def flight_changed(flight: Flight, price_changed: bool = False) -> None:
+    listeners = list(_listeners)
+    if price_changed:
+        listeners += _price_listeners
+    for fn in listeners:
+        try:
+            fn(flight)
+        except Exception:
+            # a broken read model must never fail the write that fed it
+            logger.exception("flight listener %r failed", fn)
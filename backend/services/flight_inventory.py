@@ -0,0 +1,381 @@
+# backend/services/flight_inventory.py
+import calendar
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import INVENTORY_TTL_SECONDS, INVENTORY_MAX_ROUTES, INVENTORY_MAX_FLIGHTS
+from ..db import engine, get_async_engine
+from ..model import Flight, FlightStatus
+from ..utils.pagination import encode_cursor
+from .flight_events import subscribe
+from .flight_search import FlightSearchParams, FlightSearchService
+
+Route = Tuple[str, str]
+
+_STATUSES = list(FlightStatus)
+
+
+# =========================
+# HELPERS
+# =========================
+def epoch_seconds(dt: datetime) -> float:
+    """Epoch seconds; naive datetimes are UTC like everywhere else here."""
+    return calendar.timegm(dt.utctimetuple()) + dt.microsecond / 1e6
+
+
+def flight_row(flight: Flight) -> dict:
+    # getattr (not model_dump) so an expired instance is reloaded first
+    row = {name: getattr(flight, name) for name in Flight.model_fields}
+    if isinstance(row.get("Seat_Pricing"), dict):
+        row["Seat_Pricing"] = dict(row["Seat_Pricing"])
+    return row
+
+
+# =========================
+# ROUTE SNAPSHOT
+# =========================
+class RouteSnapshot:
+    """
+    Flights of one route, sorted by (Departure_Time, Flight_ID).
+
+    Filter columns live in parallel typed arrays so a search is a bisect
+    on `departures` plus a scan of plain numbers; the full rows are only
+    touched for the page that is returned.
+    """
+
+    __slots__ = ("built_at", "departures", "ids", "prices", "seats", "stops", "status", "rows")
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+        self.departures = array("d")
+        self.ids = array("q")
+        self.prices = array("d")
+        self.seats = array("l")
+        self.stops = array("h")
+        self.status = array("b")
+        self.rows: Dict[int, dict] = {}
+
+    def _position(self, dep: float, flight_id: int) -> int:
+        i = bisect_left(self.departures, dep)
+        while i < len(self.ids) and self.departures[i] == dep and self.ids[i] < flight_id:
+            i += 1
+        return i
+
+    def _index_of(self, flight_id: int) -> int:
+        row = self.rows[flight_id]
+        i = self._position(epoch_seconds(row["Departure_Time"]), flight_id)
+        if i >= len(self.ids) or self.ids[i] != flight_id:
+            # departure time drifted from the arrays; fall back to a scan
+            i = self.ids.index(flight_id)
+        return i
+
+    def insert(self, row: dict) -> None:
+        dep = epoch_seconds(row["Departure_Time"])
+        fid = row["Flight_ID"]
+        i = self._position(dep, fid)
+        self.departures.insert(i, dep)
+        self.ids.insert(i, fid)
+        self.prices.insert(i, float(row["Price_Per_Seat"]))
+        self.seats.insert(i, int(row["Available_Seats"]))
+        self.stops.insert(i, int(row["Stops"]))
+        self.status.insert(i, _STATUSES.index(FlightStatus(row["Status"])))
+        self.rows[fid] = row
+
+    def remove(self, flight_id: int) -> None:
+        if flight_id not in self.rows:
+            return
+        i = self._index_of(flight_id)
+        for col in (self.departures, self.ids, self.prices, self.seats, self.stops, self.status):
+            del col[i]
+        del self.rows[flight_id]
+
+    def update(self, row: dict) -> None:
+        fid = row["Flight_ID"]
+        old = self.rows.get(fid)
+        if old is not None and old["Departure_Time"] == row["Departure_Time"]:
+            # hot path (seat counts, fares, status): patch in place
+            i = self._index_of(fid)
+            self.prices[i] = float(row["Price_Per_Seat"])
+            self.seats[i] = int(row["Available_Seats"])
+            self.stops[i] = int(row["Stops"])
+            self.status[i] = _STATUSES.index(FlightStatus(row["Status"]))
+            self.rows[fid] = row
+            return
+        self.remove(fid)
+        self.insert(row)
+
+    def search(self, params: FlightSearchParams) -> Tuple[List[dict], Optional[str]]:
+        start, end = params.window()
+        lo = bisect_left(self.departures, epoch_seconds(start)) if start else 0
+        hi = bisect_left(self.departures, epoch_seconds(end)) if end else len(self.ids)
+
+        status = _STATUSES.index(params.status) if params.status is not None else None
+        prices, stops = self.prices, self.stops
+
+        idx = [
+            i for i in range(lo, hi)
+            if (params.min_price is None or prices[i] >= params.min_price)
+            and (params.max_price is None or prices[i] <= params.max_price)
+            and (params.max_stops is None or stops[i] <= params.max_stops)
+            and (status is None or self.status[i] == status)
+        ]
+
+        by_price = params.sort == "price"
+        if by_price:
+            idx.sort(key=lambda i: (prices[i], self.ids[i]))
+
+        if params.cursor:
+            last_key, last_id = FlightSearchService.resume_after(params)
+            last = (float(last_key), last_id) if by_price else (epoch_seconds(last_key), last_id)
+            keys = prices if by_price else self.departures
+            idx = [i for i in idx if (keys[i], self.ids[i]) > last]
+
+        page = [self.rows[self.ids[i]] for i in idx[: params.limit + 1]]
+
+        cursor = None
+        if len(page) > params.limit:
+            tail = page[params.limit - 1]
+            key = tail["Price_Per_Seat"] if by_price else tail["Departure_Time"]
+            cursor = encode_cursor(key, tail["Flight_ID"])
+        return page[: params.limit], cursor
+
+
+# =========================
+# INVENTORY
+# =========================
+class FlightInventory:
+    """
+    Process-local read model of the flight table.
+
+    Route snapshots are loaded on first use and kept current by
+    flight_changed() events from this process. Writes made by other
+    workers are picked up when a snapshot outlives INVENTORY_TTL_SECONDS
+    (counted as `stale`).
+
+    Snapshots and single flights are always loaded from the primary, not
+    the caller's read session: an entry refilled right after a write
+    would otherwise cache whatever a lagging replica still returns.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = INVENTORY_TTL_SECONDS,
+        max_routes: int = INVENTORY_MAX_ROUTES,
+        max_flights: int = INVENTORY_MAX_FLIGHTS,
+    ):
+        self.ttl = ttl_seconds
+        self.max_routes = max_routes
+        self.max_flights = max_flights
+
+        self._lock = threading.RLock()
+        self._routes: "OrderedDict[Route, RouteSnapshot]" = OrderedDict()
+        # flight id -> route of the loaded snapshot holding it
+        self._route_of: Dict[int, Route] = {}
+        # single flights read by id outside a loaded route: id -> (loaded_at, row)
+        self._flights: "OrderedDict[int, Tuple[float, dict]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.updates = 0
+        self.evictions = 0
+
+    def _fresh(self, built_at: float) -> bool:
+        return time.monotonic() - built_at < self.ttl
+
+    # ---------------------------
+    # ROUTE SNAPSHOTS
+    # ---------------------------
+    def _snapshot(self, route: Route) -> Optional[RouteSnapshot]:
+        snap = self._routes.get(route)
+        if snap is None:
+            self.misses += 1
+            return None
+        if not self._fresh(snap.built_at):
+            self.stale += 1
+            self._drop(route)
+            return None
+        self.hits += 1
+        self._routes.move_to_end(route)
+        return snap
+
+    @staticmethod
+    def route_query(dept: str, arr: str):
+        return (
+            select(Flight)
+            .where(Flight.Dept_Location == dept, Flight.Arr_Location == arr)
+            .order_by(Flight.Departure_Time, Flight.Flight_ID)
+        )
+
+    def load_route(self, dept: str, arr: str) -> RouteSnapshot:
+        with Session(engine) as session:
+            flights = session.exec(self.route_query(dept, arr)).all()
+            rows = [flight_row(f) for f in flights]
+        return self.put_route(dept, arr, rows)
+
+    async def load_route_async(self, dept: str, arr: str) -> RouteSnapshot:
+        async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+            flights = (await session.exec(self.route_query(dept, arr))).all()
+        return self.put_route(dept, arr, [flight_row(f) for f in flights])
+
+    def put_route(self, dept: str, arr: str, rows: List[dict]) -> RouteSnapshot:
+        snap = RouteSnapshot()
+        for row in rows:
+            snap.insert(row)
+
+        route = (dept, arr)
+        with self._lock:
+            self._drop(route)
+            self._routes[route] = snap
+            for fid in snap.rows:
+                self._route_of[fid] = route
+            while len(self._routes) > self.max_routes:
+                self._drop(next(iter(self._routes)))
+                self.evictions += 1
+        return snap
+
+    def _drop(self, route: Route) -> None:
+        snap = self._routes.pop(route, None)
+        if snap is None:
+            return
+        for fid in snap.rows:
+            if self._route_of.get(fid) == route:
+                del self._route_of[fid]
+
+    def lookup(self, params: FlightSearchParams) -> Optional[Tuple[List[dict], Optional[str]]]:
+        """Answer a routed search from memory; None if the route is not loaded."""
+        FlightSearchService.validate(params)
+        with self._lock:
+            snap = self._snapshot((params.depart, params.arrive))
+            return snap.search(params) if snap is not None else None
+
+    def search(self, session: Session, params: FlightSearchParams) -> Tuple[List[dict], Optional[str]]:
+        """
+        Routed searches are answered from the route snapshot (loaded on a
+        miss); searches without both ends of a route go to the database.
+        """
+        if not (params.depart and params.arrive):
+            flights, cursor = FlightSearchService.search(session, params)
+            return [flight_row(f) for f in flights], cursor
+
+        found = self.lookup(params)
+        if found is not None:
+            return found
+        snap = self.load_route(params.depart, params.arrive)
+        with self._lock:
+            return snap.search(params)
+
+    async def search_async(self, session: AsyncSession, params: FlightSearchParams) -> Tuple[List[dict], Optional[str]]:
+        """search() for the async read path."""
+        if not (params.depart and params.arrive):
+            rows = (await session.exec(FlightSearchService.build_query(params))).all()
+            cursor = FlightSearchService.next_cursor(params, rows)
+            return [flight_row(f) for f in rows[: params.limit]], cursor
+
+        found = self.lookup(params)
+        if found is not None:
+            return found
+        snap = await self.load_route_async(params.depart, params.arrive)
+        with self._lock:
+            return snap.search(params)
+
+    # ---------------------------
+    # SINGLE FLIGHTS
+    # ---------------------------
+    def get(self, flight_id: int) -> Optional[dict]:
+        with self._lock:
+            route = self._route_of.get(flight_id)
+            if route is not None:
+                snap = self._routes[route]
+                if self._fresh(snap.built_at):
+                    self.hits += 1
+                    return snap.rows[flight_id]
+
+            cached = self._flights.get(flight_id)
+            if cached is not None:
+                if self._fresh(cached[0]):
+                    self.hits += 1
+                    self._flights.move_to_end(flight_id)
+                    return cached[1]
+                self.stale += 1
+                del self._flights[flight_id]
+
+            self.misses += 1
+
+        with Session(engine) as session:
+            flight = session.get(Flight, flight_id)
+            if not flight:
+                return None
+            row = flight_row(flight)
+        self._remember(row)
+        return row
+
+    def _remember(self, row: dict) -> None:
+        with self._lock:
+            self._flights[row["Flight_ID"]] = (time.monotonic(), row)
+            self._flights.move_to_end(row["Flight_ID"])
+            while len(self._flights) > self.max_flights:
+                self._flights.popitem(last=False)
+
+    # ---------------------------
+    # INVALIDATION
+    # ---------------------------
+    def apply(self, flight: Flight) -> None:
+        """Fold a committed flight write into every structure holding it."""
+        row = flight_row(flight)
+        fid = row["Flight_ID"]
+        route = (row["Dept_Location"], row["Arr_Location"])
+
+        with self._lock:
+            self.updates += 1
+
+            previous = self._route_of.get(fid)
+            if previous is not None and previous != route:
+                self._routes[previous].remove(fid)
+                del self._route_of[fid]
+
+            snap = self._routes.get(route)
+            if snap is not None:
+                snap.update(row)
+                self._route_of[fid] = route
+
+            if fid in self._flights:
+                self._flights[fid] = (time.monotonic(), row)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._route_of.clear()
+            self._flights.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            now = time.monotonic()
+            ages = [now - s.built_at for s in self._routes.values()]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "updates": self.updates,
+                "evictions": self.evictions,
+                "routes": len(self._routes),
+                "route_flights": sum(len(s.ids) for s in self._routes.values()),
+                "single_flights": len(self._flights),
+                "oldest_snapshot_age_s": round(max(ages), 3) if ages else None,
+                "ttl_seconds": self.ttl,
+            }
+
+
+# single inventory instance used by app
+inventory = FlightInventory()
+subscribe(inventory.apply)
@@ -0,0 +1,142 @@
+# backend/services/flight_search.py
+from sqlmodel import Session, select
+from sqlalchemy import and_, or_
+from datetime import datetime, date as Date, time, timedelta
+from typing import Any, List, Optional, Tuple
+from pydantic import BaseModel
+
+from ..model import Flight, FlightStatus
+from ..utils.pagination import encode_cursor, decode_cursor
+
+MAX_PAGE_SIZE = 200
+SORT_KEYS = ("departure", "price")
+
+
+# =========================
+# SEARCH CRITERIA
+# =========================
+class FlightSearchParams(BaseModel):
+    depart: Optional[str] = None
+    arrive: Optional[str] = None
+
+    # departure window; `date` is shorthand for one whole day
+    date: Optional[Date] = None
+    depart_from: Optional[datetime] = None
+    depart_to: Optional[datetime] = None
+
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    max_stops: Optional[int] = None
+    status: Optional[FlightStatus] = None
+
+    sort: str = "departure"
+    limit: int = 50
+    cursor: Optional[str] = None
+
+    def window(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Departure window as a half-open [start, end) pair."""
+        start, end = self.depart_from, self.depart_to
+        if self.date:
+            day_start = datetime.combine(self.date, time.min)
+            day_end = day_start + timedelta(days=1)
+            start = max(start, day_start) if start else day_start
+            end = min(end, day_end) if end else day_end
+        return start, end
+
+
+# =========================
+# SEARCH SERVICE
+# =========================
+class FlightSearchService:
+
+    @staticmethod
+    def validate(params: FlightSearchParams) -> None:
+        if params.sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        if params.limit < 1 or params.limit > MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    @staticmethod
+    def resume_after(params: FlightSearchParams) -> Tuple[Any, int]:
+        """
+        The (sort key, Flight_ID) the cursor resumes after. A cursor is
+        client input: a key of the wrong type for the sort raises
+        ValueError instead of failing the comparison later.
+        """
+        values = decode_cursor(params.cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        last_key, last_id = values
+        if params.sort == "price":
+            key_ok = isinstance(last_key, (int, float))
+        else:
+            key_ok = isinstance(last_key, datetime)
+        # decode_cursor never returns bools
+        if not key_ok or not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        return last_key, last_id
+
+    @staticmethod
+    def _sort_column(params: FlightSearchParams):
+        return Flight.Price_Per_Seat if params.sort == "price" else Flight.Departure_Time
+
+    @staticmethod
+    def build_query(params: FlightSearchParams):
+        """
+        Every filter is a range/equality on an indexed column, so with a
+        route the query is answered by ix_flight_route_departure (or
+        ix_flight_route_price) and only `limit + 1` rows are read,
+        whatever the size of the table.
+        """
+        FlightSearchService.validate(params)
+
+        q = select(Flight)
+
+        if params.depart:
+            q = q.where(Flight.Dept_Location == params.depart)
+        if params.arrive:
+            q = q.where(Flight.Arr_Location == params.arrive)
+
+        start, end = params.window()
+        if start:
+            q = q.where(Flight.Departure_Time >= start)
+        if end:
+            q = q.where(Flight.Departure_Time < end)
+
+        if params.min_price is not None:
+            q = q.where(Flight.Price_Per_Seat >= params.min_price)
+        if params.max_price is not None:
+            q = q.where(Flight.Price_Per_Seat <= params.max_price)
+        if params.max_stops is not None:
+            q = q.where(Flight.Stops <= params.max_stops)
+        if params.status is not None:
+            q = q.where(Flight.Status == params.status)
+
+        key = FlightSearchService._sort_column(params)
+
+        # keyset pagination: resume strictly after (key, Flight_ID)
+        if params.cursor:
+            last_key, last_id = FlightSearchService.resume_after(params)
+            q = q.where(
+                or_(
+                    key > last_key,
+                    and_(key == last_key, Flight.Flight_ID > last_id),
+                )
+            )
+
+        return q.order_by(key, Flight.Flight_ID).limit(params.limit + 1)
+
+    @staticmethod
+    def next_cursor(params: FlightSearchParams, rows: List[Flight]) -> Optional[str]:
+        """Cursor for the page after `rows` (None on the last page)."""
+        if len(rows) <= params.limit:
+            return None
+        last = rows[params.limit - 1]
+        key = last.Price_Per_Seat if params.sort == "price" else last.Departure_Time
+        return encode_cursor(key, last.Flight_ID)
+
+    @staticmethod
+    def search(session: Session, params: FlightSearchParams) -> Tuple[List[Flight], Optional[str]]:
+        rows = session.exec(FlightSearchService.build_query(params)).all()
+        cursor = FlightSearchService.next_cursor(params, rows)
+        return rows[: params.limit], cursor
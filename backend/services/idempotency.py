@@ -0,0 +1,135 @@
+# backend/services/idempotency.py
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from ..config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_CLEANUP_SECONDS
+from ..db import engine
+from ..model import IdempotencyRecord
+from ..utils.workers import PeriodicWorker, register
+
+MAX_KEY_LENGTH = 128
+
+
+class IdempotencyConflict(Exception):
+    """The key is in use by a different or still-running request."""
+
+
+class IdempotencyStore:
+    """
+    Stored responses of POST requests keyed by (customer, Idempotency-Key).
+
+    The record is inserted in the same transaction as the booking it
+    guards, together with its response, so the unique index lets exactly
+    one of several concurrent retries through. A retry is answered from
+    the record by one indexed lookup. Records live for
+    IDEMPOTENCY_TTL_SECONDS and are then deleted by a background worker.
+    """
+
+    def __init__(self, ttl_seconds: int = IDEMPOTENCY_TTL_SECONDS):
+        self.ttl = ttl_seconds
+        self._lock = threading.Lock()
+
+        self.claimed = 0
+        self.replayed = 0
+        self.conflicts = 0
+        self.purged = 0
+
+    @staticmethod
+    def request_hash(**fields) -> str:
+        return hashlib.sha256(
+            json.dumps(fields, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def validate_key(key: str) -> None:
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    # ---------------------------
+    # LOOKUP / CLAIM / COMPLETE
+    # ---------------------------
+    def lookup(self, session: Session, customer_id: int, key: str, request_hash: str) -> Optional[Dict]:
+        """Stored response for the key, or None if the request is new."""
+        record = session.exec(
+            select(IdempotencyRecord).where(
+                IdempotencyRecord.Customer_ID == customer_id,
+                IdempotencyRecord.Key == key,
+            )
+        ).first()
+        if record is None:
+            return None
+
+        if record.Expires_At <= datetime.utcnow():
+            # not swept yet; make room for the new claim
+            session.execute(
+                delete(IdempotencyRecord)
+                .where(IdempotencyRecord.Record_ID == record.Record_ID)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            return None
+
+        if record.Request_Hash != request_hash:
+            self._count("conflicts")
+            raise IdempotencyConflict("Idempotency-Key was already used for a different request")
+        if record.Response is None:
+            self._count("conflicts")
+            raise IdempotencyConflict("A request with this Idempotency-Key is still in progress")
+
+        self._count("replayed")
+        return record.Response
+
+    def claim(self, session: Session, customer_id: int, key: str, request_hash: str) -> IdempotencyRecord:
+        """Add the record to the caller's transaction; not committed."""
+        record = IdempotencyRecord(
+            Customer_ID=customer_id,
+            Key=key,
+            Request_Hash=request_hash,
+            Expires_At=datetime.utcnow() + timedelta(seconds=self.ttl),
+        )
+        session.add(record)
+        self._count("claimed")
+        return record
+
+    @staticmethod
+    def complete(session: Session, record: IdempotencyRecord, response: Dict) -> None:
+        record.Response = response
+        session.add(record)
+
+    # ---------------------------
+    # CLEANUP
+    # ---------------------------
+    def purge_expired(self) -> int:
+        with Session(engine) as session:
+            n = session.execute(
+                delete(IdempotencyRecord)
+                .where(IdempotencyRecord.Expires_At <= datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+        self._count("purged", n)
+        return n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "claimed": self.claimed,
+                "replayed": self.replayed,
+                "conflicts": self.conflicts,
+                "purged": self.purged,
+                "ttl_seconds": self.ttl,
+            }
+
+
+idempotency = IdempotencyStore()
+worker = register(PeriodicWorker("idempotency-cleanup", IDEMPOTENCY_CLEANUP_SECONDS, idempotency.purge_expired))
@@ -0,0 +1,159 @@
+# backend/services/passwords.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from ..config import (
+    PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_POOL,
+    PASSWORD_POOL_WORKERS,
+    PASSWORD_MAX_PENDING,
+)
+
+# Argon2 for new hashes; bcrypt still verifies (and is upgraded on login)
+context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=PASSWORD_ARGON2_TIME_COST,
+    argon2__memory_cost=PASSWORD_ARGON2_MEMORY_COST,
+    argon2__parallelism=PASSWORD_ARGON2_PARALLELISM,
+)
+
+
+def is_prehashed(raw: str) -> bool:
+    """Argon2/bcrypt hash or legacy SHA-256 hex digest: store as given."""
+    if raw.startswith("$argon2") or raw.startswith("$2"):
+        return True
+    if len(raw) != 64:
+        return False
+    try:
+        int(raw, 16)
+        return True
+    except ValueError:
+        return False
+
+
+class PasswordServiceBusy(Exception):
+    """Too many hashes queued; the caller should answer 503."""
+
+
+# module level so a process pool can pickle them
+def _hash(password: str) -> str:
+    return context.hash(password)
+
+
+def _verify(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    try:
+        return context.verify_and_update(password, hashed)
+    except Exception:
+        # not a hash this context knows (e.g. a legacy SHA-256 digest),
+        # or no working backend for its scheme
+        return False, None
+
+
+class PasswordService:
+    """
+    Argon2/bcrypt hashing off the request path.
+
+    Hashes run on a small dedicated pool (threads by default: argon2-cffi
+    and bcrypt release the GIL) sized to the cores it may use, so a login
+    storm cannot take over the request threadpool or the event loop.
+    Work admitted but not finished is capped at PASSWORD_MAX_PENDING;
+    past that, callers get PasswordServiceBusy at once instead of
+    queueing behind seconds of CPU work.
+    """
+
+    def __init__(
+        self,
+        kind: str = PASSWORD_POOL,
+        workers: int = PASSWORD_POOL_WORKERS,
+        max_pending: int = PASSWORD_MAX_PENDING,
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError("PASSWORD_POOL must be 'thread' or 'process'")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_pending = max_pending
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.peak_pending = 0
+        self.hashed = 0
+        self.verified = 0
+        self.rejected = 0
+        self.busy_ms = 0.0
+
+    def _executor(self) -> Executor:
+        # created on first use; a process pool must not fork at import
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        self._pool = ProcessPoolExecutor(self.workers)
+                    else:
+                        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="passwords")
+        return self._pool
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordServiceBusy("Too many password operations in progress, retry shortly")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+    def _done(self, field: str, started: float) -> None:
+        with self._lock:
+            self.pending -= 1
+            setattr(self, field, getattr(self, field) + 1)
+            self.busy_ms += (time.perf_counter() - started) * 1000
+
+    async def _run(self, field: str, fn, *args):
+        self._admit()
+        started = time.perf_counter()
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._done(field, started)
+            raise
+        # counted when the pool finishes, even if the request went away
+        future.add_done_callback(lambda _: self._done(field, started))
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hashed", _hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """(valid, new hash if the stored one should be upgraded)."""
+        return await self._run("verified", _verify, password, hashed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.hashed + self.verified
+            return {
+                "pool": self.kind,
+                "workers": self.workers,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "max_pending": self.max_pending,
+                "hashed": self.hashed,
+                "verified": self.verified,
+                "rejected": self.rejected,
+                "avg_latency_ms": round(self.busy_ms / done, 3) if done else None,
+            }
+
+
+passwords = PasswordService()
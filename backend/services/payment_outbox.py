@@ -0,0 +1,264 @@
+# backend/services/payment_outbox.py
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, insert, or_, update
+from sqlmodel import Session, select
+
+from ..config import (
+    USE_FAKE_PAYMENTS,
+    PAYMENT_OUTBOX_INTERVAL_SECONDS,
+    PAYMENT_OUTBOX_BATCH,
+    PAYMENT_OUTBOX_MAX_ATTEMPTS,
+    PAYMENT_OUTBOX_RETRY_BASE_SECONDS,
+    PAYMENT_OUTBOX_RETRY_MAX_SECONDS,
+    PAYMENT_OUTBOX_LEASE_SECONDS,
+)
+from ..db import engine
+from ..model import Booking, Payment, PaymentOutbox
+from ..utils.workers import PeriodicWorker, register
+from .payment_service import PaymentService
+
+# Payment.Status until the gateway order exists
+ORDER_PENDING = "order_pending"
+
+
+class PaymentOutboxRelay:
+    """
+    Creates gateway orders for bookings after they are committed.
+
+    create_razorpay_order writes the booking, payment and a
+    payment_outbox row in one transaction and returns without calling
+    the gateway. The relay works in three steps per batch: claim due
+    rows (status "sending", commit), call the gateway with no
+    transaction open, then record every order id (payment, booking,
+    outbox row) in a second commit. Each row sends the receipt
+    "outbox_<Outbox_ID>"; a row that was claimed before first looks its
+    order up by that receipt, so a call that went through before a
+    crash or a timeout is not turned into a second order.
+
+    A failed call goes back to "pending" with an exponential backoff
+    (PAYMENT_OUTBOX_RETRY_BASE_SECONDS, capped at ..._MAX_SECONDS) and is
+    parked as "failed" after PAYMENT_OUTBOX_MAX_ATTEMPTS. A claim left
+    behind by a relay that died is taken again once it is
+    PAYMENT_OUTBOX_LEASE_SECONDS old, and counts as a failed attempt: if
+    it was the last one the row is parked instead. Results are only
+    written while the row is still "sending" under the same claim, so a
+    relay that outlived its lease cannot overwrite the relay that took
+    the row over.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = PAYMENT_OUTBOX_BATCH,
+        max_attempts: int = PAYMENT_OUTBOX_MAX_ATTEMPTS,
+        retry_base: float = PAYMENT_OUTBOX_RETRY_BASE_SECONDS,
+        retry_max: float = PAYMENT_OUTBOX_RETRY_MAX_SECONDS,
+        lease: float = PAYMENT_OUTBOX_LEASE_SECONDS,
+    ):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease = lease
+        self._lock = threading.Lock()
+
+        self.batches = 0
+        self.sent = 0
+        self.errors = 0
+        self.failed = 0
+
+    @staticmethod
+    def enqueue(
+        session: Session,
+        payment: Payment,
+        booking: Booking,
+        amount_paise: int,
+        currency: str,
+        notes: Optional[Dict] = None,
+    ) -> PaymentOutbox:
+        """Add the order request to the caller's transaction; not committed."""
+        row = PaymentOutbox(
+            Payment_ID=payment.Payment_ID,
+            Booking_ID=booking.Booking_ID,
+            Amount_Paise=amount_paise,
+            Currency=currency,
+            Notes=notes,
+        )
+        session.add(row)
+        return row
+
+    @staticmethod
+    def enqueue_many(session: Session, rows: List[Dict]) -> None:
+        """Bulk enqueue() from column dicts; one executemany INSERT."""
+        session.execute(insert(PaymentOutbox), rows)
+
+    def backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.retry_max, self.retry_base * 2 ** (attempts - 1)))
+
+    @staticmethod
+    def receipt(row: PaymentOutbox) -> str:
+        # the same row always sends the same receipt, so retries can find its order
+        return f"outbox_{row.Outbox_ID}"
+
+    def _claim(self, now: datetime) -> List[PaymentOutbox]:
+        """Mark a batch of due rows "sending" and commit; returns them detached."""
+        due = or_(
+            and_(
+                PaymentOutbox.Status == "pending",
+                or_(PaymentOutbox.Next_Attempt_At.is_(None), PaymentOutbox.Next_Attempt_At <= now),
+            ),
+            # claimed by a relay that never recorded the result
+            and_(PaymentOutbox.Status == "sending", PaymentOutbox.Next_Attempt_At <= now),
+        )
+        with Session(engine) as session:
+            rows = session.exec(
+                select(PaymentOutbox)
+                .where(due)
+                .order_by(PaymentOutbox.Outbox_ID)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not rows:
+                return []
+            # detached, so they stay readable after the commit
+            session.expunge_all()
+
+            # an expired claim already counted its attempt; one that used
+            # the last attempt is parked, or a relay that crashes on the row
+            # would retry it forever
+            parked, claimed = [], []
+            for row in rows:
+                spent = row.Status == "sending" and row.Attempts >= self.max_attempts
+                (parked if spent else claimed).append(row)
+            if parked:
+                session.execute(update(PaymentOutbox), [
+                    {
+                        "Outbox_ID": row.Outbox_ID,
+                        "Status": "failed",
+                        "Last_Error": "claim expired without a result",
+                        "Next_Attempt_At": None,
+                        "Processed_At": now,
+                    }
+                    for row in parked
+                ])
+            if claimed:
+                session.execute(update(PaymentOutbox), [
+                    {
+                        "Outbox_ID": row.Outbox_ID,
+                        "Status": "sending",
+                        "Attempts": row.Attempts + 1,
+                        "Next_Attempt_At": now + timedelta(seconds=self.lease),
+                    }
+                    for row in claimed
+                ])
+            session.commit()
+
+        if parked:
+            with self._lock:
+                self.failed += len(parked)
+            if not claimed:
+                # the batch was all parked rows; due rows may follow them
+                worker.wake()
+        return claimed
+
+    @staticmethod
+    def _record(session: Session, row: PaymentOutbox, **values) -> bool:
+        """Write a claimed row's outcome; False if the claim was lost."""
+        return session.execute(
+            update(PaymentOutbox)
+            .where(
+                PaymentOutbox.Outbox_ID == row.Outbox_ID,
+                PaymentOutbox.Status == "sending",
+                # row is the detached pre-claim copy
+                PaymentOutbox.Attempts == row.Attempts + 1,
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    def run_once(self) -> int:
+        rows = self._claim(datetime.utcnow())
+        if not rows:
+            return 0
+
+        # no transaction or row lock is held while the gateway is called
+        sent, retry = [], []
+        for row in rows:
+            try:
+                # Attempts is the count before this claim
+                order = PaymentService.find_order(self.receipt(row)) if row.Attempts else None
+                if order is None:
+                    order = PaymentService.create_order(
+                        amount_paise=row.Amount_Paise,
+                        currency=row.Currency,
+                        notes=row.Notes,
+                        receipt=self.receipt(row),
+                    )
+                sent.append((row, order["order_id"]))
+            except Exception as e:
+                retry.append((row, repr(e)[:500]))
+
+        now = datetime.utcnow()
+        gave_up = 0
+        with Session(engine) as session:
+            # rows another relay took over after our lease expired are left
+            # to it: only the claim still holding the row records a result
+            sent = [
+                (row, order_id) for row, order_id in sent
+                if self._record(session, row, Status="sent", Next_Attempt_At=None, Processed_At=now)
+            ]
+            if sent:
+                session.execute(update(Payment), [
+                    {
+                        "Payment_ID": row.Payment_ID,
+                        "Gateway_Txn_ID": order_id,
+                        "Status": "authorized" if USE_FAKE_PAYMENTS else "created",
+                    }
+                    for row, order_id in sent
+                ])
+                session.execute(update(Booking), [
+                    {"Booking_ID": row.Booking_ID, "Razorpay_Order_ID": order_id}
+                    for row, order_id in sent
+                ])
+
+            for row, error in retry:
+                # counted when the row was claimed
+                attempts = row.Attempts + 1
+                done = attempts >= self.max_attempts
+                if self._record(
+                    session,
+                    row,
+                    Status="failed" if done else "pending",
+                    Last_Error=error,
+                    Next_Attempt_At=None if done else now + self.backoff(attempts),
+                    Processed_At=now if done else None,
+                ):
+                    gave_up += done
+
+            session.commit()
+
+        with self._lock:
+            self.batches += 1
+            self.sent += len(sent)
+            self.errors += len(retry)
+            self.failed += gave_up
+
+        # more backlog than one batch: keep going
+        if len(rows) == self.batch_size:
+            worker.wake()
+        return len(sent)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "sent": self.sent,
+                "errors": self.errors,
+                "failed": self.failed,
+            }
+
+
+relay = PaymentOutboxRelay()
+worker = register(PeriodicWorker("payment-outbox", PAYMENT_OUTBOX_INTERVAL_SECONDS, relay.run_once))
@@ -1,24 +1,32 @@
 from typing import Dict, Optional
 from datetime import datetime
+import hashlib
+import hmac
+import uuid
 from ..config import USE_FAKE_PAYMENTS
 
 _fake_store: Dict[str, dict] = {}
+# receipt -> order, like the gateway's order list filtered by receipt
+_fake_receipts: Dict[str, dict] = {}
 
 
-def _fake_order(amount_paise: int, currency: str, notes: Optional[dict]):
-    oid = f"order_fake_{int(datetime.utcnow().timestamp())}"
+def _fake_order(amount_paise: int, currency: str, notes: Optional[dict], receipt: Optional[str] = None):
+    oid = f"order_fake_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
     _fake_store[oid] = notes or {}
-    return {
+    order = {
         "order_id": oid,
         "amount": amount_paise,
         "currency": currency,
         "notes": notes or {}
     }
+    if receipt:
+        _fake_receipts[receipt] = order
+    return order
 
 
 def _fake_payment(order_id: str):
     return {
-        "payment_id": f"pay_fake_{int(datetime.utcnow().timestamp())}",
+        "payment_id": f"pay_fake_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}",
         "order_id": order_id,
         "notes": _fake_store.get(order_id, {})
     }
@@ -27,9 +35,27 @@ def _fake_payment(order_id: str):
 class PaymentService:
 
     @staticmethod
-    def create_order(amount_paise: int, currency: str = "INR", notes: Optional[dict] = None):
+    def create_order(
+        amount_paise: int,
+        currency: str = "INR",
+        notes: Optional[dict] = None,
+        receipt: Optional[str] = None,
+    ):
+        """`receipt` is our reference for the order; see find_order()."""
+        if USE_FAKE_PAYMENTS:
+            return _fake_order(amount_paise, currency, notes, receipt)
+
+        raise RuntimeError("Real Razorpay disabled")
+
+    @staticmethod
+    def find_order(receipt: str) -> Optional[dict]:
+        """
+        The order created earlier with this receipt, or None. The gateway
+        does not dedupe on receipt, so a caller retrying a create that may
+        have gone through must look first (GET /orders?receipt=...).
+        """
         if USE_FAKE_PAYMENTS:
-            return _fake_order(amount_paise, currency, notes)
+            return _fake_receipts.get(receipt)
 
         raise RuntimeError("Real Razorpay disabled")
 
@@ -39,3 +65,11 @@ class PaymentService:
             return _fake_payment(order_id)
 
         raise RuntimeError("Real Razorpay disabled")
+
+    @staticmethod
+    def verify_webhook_signature(body: bytes, signature: str, secret: str) -> bool:
+        # Razorpay signs the raw request body: hex HMAC-SHA256 with the webhook secret
+        if not secret or not signature:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
@@ -0,0 +1,79 @@
+# backend/services/price_alert_evaluator.py
+import threading
+from typing import Dict
+
+from sqlmodel import Session
+
+from ..config import PRICE_ALERT_INTERVAL_SECONDS
+from ..db import engine
+from ..model import Flight
+from ..utils.workers import PeriodicWorker, register
+from .flight_events import subscribe
+from .price_alerts import PriceAlertsService
+
+
+class PriceAlertEvaluator:
+    """
+    Evaluates price alerts off the request path.
+
+    Subscribed to price changes only: the write path that sets
+    Price_Per_Seat says so in its flight_changed() event, so seat and
+    status updates never reach here. Each change marks its route dirty;
+    the worker then checks all dirty routes against their lowest new
+    fare with one alert query per batch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, float] = {}
+
+        self.batches = 0
+        self.routes_evaluated = 0
+        self.notifications = 0
+
+    def on_price_change(self, flight: Flight) -> None:
+        price = float(flight.Price_Per_Seat)
+        route = f"{flight.Dept_Location}-{flight.Arr_Location}"
+
+        with self._lock:
+            current = self._pending.get(route)
+            self._pending[route] = price if current is None else min(current, price)
+
+        worker.wake()
+
+    def run_once(self) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        try:
+            with Session(engine) as session:
+                created = PriceAlertsService.check_alerts_for_routes(session, pending)
+        except Exception:
+            # keep the routes for the next run, merged with any newer prices
+            with self._lock:
+                for route, price in pending.items():
+                    current = self._pending.get(route)
+                    self._pending[route] = price if current is None else min(current, price)
+            raise
+
+        with self._lock:
+            self.batches += 1
+            self.routes_evaluated += len(pending)
+            self.notifications += len(created)
+        return len(created)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending_routes": len(self._pending),
+                "batches": self.batches,
+                "routes_evaluated": self.routes_evaluated,
+                "notifications": self.notifications,
+            }
+
+
+evaluator = PriceAlertEvaluator()
+worker = register(PeriodicWorker("price-alerts", PRICE_ALERT_INTERVAL_SECONDS, evaluator.run_once))
+subscribe(evaluator.on_price_change, prices_only=True)
@@ -1,6 +1,6 @@
 from sqlmodel import Session, select
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 
 from ..model import PriceAlert, Notification
 
@@ -49,40 +49,47 @@ class PriceAlertsService:
         return True
 
     @staticmethod
-    def check_alerts_for_route(
+    def check_alerts_for_routes(
         session: Session,
-        route: str,
-        current_price: float,
+        prices: Dict[str, float],
     ) -> List[Notification]:
+        """
+        Notify every active alert whose target the route's new lowest
+        fare meets, and deactivate it; one query, one commit.
+        """
+        if not prices:
+            return []
+
         alerts = session.exec(
             select(PriceAlert).where(
-                PriceAlert.Route == route,
+                PriceAlert.Route.in_(list(prices)),
                 PriceAlert.Active == True,
             )
         ).all()
 
         created: List[Notification] = []
+        now = datetime.utcnow()
 
         for alert in alerts:
+            current_price = prices[alert.Route]
             if current_price <= alert.Target_Price:
                 n = Notification(
                     Customer_ID=alert.Customer_ID,
                     Kind="price_alert",
                     Payload={
-                        "route": route,
+                        "route": alert.Route,
                         "price": current_price,
                         "target": alert.Target_Price,
                     },
                     Sent=False,
-                    Created_At=datetime.utcnow(),
+                    Created_At=now,
                 )
                 session.add(n)
                 alert.Active = False
+                session.add(alert)
                 created.append(n)
 
         if created:
             session.commit()
-            for n in created:
-                session.refresh(n)
 
         return created
@@ -0,0 +1,286 @@
+# backend/services/route_graph.py
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from ..config import ROUTE_GRAPH_TTL_SECONDS, CONNECTION_BUDGET_MS
+from ..model import Flight, FlightStatus
+from .flight_events import subscribe
+from .flight_inventory import epoch_seconds
+
+SORT_KEYS = ("price", "duration")
+
+# columns needed to chain legs; the graph never holds full Flight rows
+_LEG_COLUMNS = (
+    Flight.Flight_ID,
+    Flight.Flight_Code,
+    Flight.Company_ID,
+    Flight.Dept_Location,
+    Flight.Arr_Location,
+    Flight.Departure_Time,
+    Flight.Arrival_Time,
+    Flight.Price_Per_Seat,
+    Flight.Available_Seats,
+    Flight.Status,
+)
+
+
+class Leg:
+    __slots__ = ("flight_id", "code", "company_id", "origin", "dest",
+                 "departure", "arrival", "dep_ts", "arr_ts", "price", "seats", "cancelled")
+
+    def __init__(self, flight_id, code, company_id, origin, dest,
+                 departure, arrival, price, seats, status):
+        self.flight_id = flight_id
+        self.code = code
+        self.company_id = company_id
+        self.origin = origin
+        self.dest = dest
+        self.departure = departure
+        self.arrival = arrival
+        self.dep_ts = epoch_seconds(departure)
+        self.arr_ts = epoch_seconds(arrival)
+        self.price = float(price)
+        self.seats = int(seats)
+        self.cancelled = FlightStatus(status) == FlightStatus.CANCELLED
+
+    def to_dict(self) -> dict:
+        return {
+            "Flight_ID": self.flight_id,
+            "Flight_Code": self.code,
+            "Company_ID": self.company_id,
+            "Dept_Location": self.origin,
+            "Arr_Location": self.dest,
+            "Departure_Time": self.departure,
+            "Arrival_Time": self.arrival,
+            "Price_Per_Seat": self.price,
+            "Available_Seats": self.seats,
+        }
+
+
+# =========================
+# DEPARTURE BOARD
+# =========================
+class _Board:
+    """Departures of one airport sorted by (departure, flight id)."""
+
+    __slots__ = ("dep_ts", "ids")
+
+    def __init__(self):
+        self.dep_ts = array("d")
+        self.ids = array("q")
+
+    def _position(self, dep: float, flight_id: int) -> int:
+        i = bisect_left(self.dep_ts, dep)
+        while i < len(self.ids) and self.dep_ts[i] == dep and self.ids[i] < flight_id:
+            i += 1
+        return i
+
+    def insert(self, leg: Leg) -> None:
+        i = self._position(leg.dep_ts, leg.flight_id)
+        self.dep_ts.insert(i, leg.dep_ts)
+        self.ids.insert(i, leg.flight_id)
+
+    def remove(self, leg: Leg) -> None:
+        i = self._position(leg.dep_ts, leg.flight_id)
+        if i < len(self.ids) and self.ids[i] == leg.flight_id:
+            del self.dep_ts[i]
+            del self.ids[i]
+
+    def between(self, lo: float, hi: float) -> range:
+        """Positions of departures in [lo, hi)."""
+        return range(bisect_left(self.dep_ts, lo), bisect_left(self.dep_ts, hi))
+
+
+# =========================
+# ROUTE GRAPH
+# =========================
+class RouteGraph:
+    """
+    Time-expanded flight graph: every flight is an edge from
+    (origin, departure) to (destination, arrival). A connection at an
+    airport is a bisect on its departure board over the layover window,
+    so itinerary search never joins the flight table with itself.
+    """
+
+    def __init__(self, ttl_seconds: int = ROUTE_GRAPH_TTL_SECONDS):
+        self.ttl = ttl_seconds
+        self._lock = threading.RLock()
+        self._legs: Dict[int, Leg] = {}
+        self._boards: Dict[str, _Board] = {}
+        self._built_at: Optional[float] = None
+
+    # ---------------------------
+    # BUILD / MAINTAIN
+    # ---------------------------
+    def build(self, session: Session) -> None:
+        # departed flights can never start an itinerary again
+        since = datetime.utcnow() - timedelta(days=1)
+        rows = session.exec(
+            select(*_LEG_COLUMNS).where(Flight.Departure_Time >= since)
+        ).all()
+
+        legs = {r[0]: Leg(*r) for r in rows}
+        boards: Dict[str, _Board] = {}
+        for leg in sorted(legs.values(), key=lambda l: (l.dep_ts, l.flight_id)):
+            board = boards.setdefault(leg.origin, _Board())
+            board.dep_ts.append(leg.dep_ts)
+            board.ids.append(leg.flight_id)
+
+        with self._lock:
+            self._legs = legs
+            self._boards = boards
+            self._built_at = time.monotonic()
+
+    def ensure(self, session: Session) -> None:
+        with self._lock:
+            fresh = self._built_at is not None and time.monotonic() - self._built_at < self.ttl
+        if not fresh:
+            self.build(session)
+
+    def apply(self, flight: Flight) -> None:
+        with self._lock:
+            if self._built_at is None:
+                return
+            leg = Leg(*(getattr(flight, c.key) for c in _LEG_COLUMNS))
+            old = self._legs.get(leg.flight_id)
+            if old is not None:
+                self._boards[old.origin].remove(old)
+            self._legs[leg.flight_id] = leg
+            self._boards.setdefault(leg.origin, _Board()).insert(leg)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "airports": len(self._boards),
+                "legs": len(self._legs),
+                "age_s": round(time.monotonic() - self._built_at, 3) if self._built_at else None,
+            }
+
+    # ---------------------------
+    # SEARCH
+    # ---------------------------
+    def search(
+        self,
+        origin: str,
+        dest: str,
+        depart_from: datetime,
+        depart_to: datetime,
+        max_stops: int = 1,
+        min_layover_min: int = 45,
+        max_layover_min: int = 360,
+        seats: int = 1,
+        sort: str = "price",
+        k: int = 10,
+        include_direct: bool = True,
+        budget_ms: int = CONNECTION_BUDGET_MS,
+    ) -> Tuple[List[dict], bool]:
+        """
+        Top-k itineraries from origin to dest leaving in the window.
+
+        Depth-first over at most max_stops connections; a partial path is
+        abandoned once its cost can no longer beat the current k-th best.
+        Returns (itineraries, complete) where complete is False if the
+        latency budget ran out first.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        if max_stops not in (1, 2):
+            raise ValueError("max_stops must be 1 or 2")
+        if min_layover_min < 0 or max_layover_min < min_layover_min:
+            raise ValueError("Invalid layover bounds")
+
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        min_lay = min_layover_min * 60.0
+        max_lay = max_layover_min * 60.0
+        by_price = sort == "price"
+
+        # max-heap of the k best so far: (-cost, seq, legs)
+        best: List[Tuple[float, int, Tuple[Leg, ...]]] = []
+        seq = 0
+        complete = True
+
+        def cost(path: Tuple[Leg, ...]) -> float:
+            if by_price:
+                return sum(l.price for l in path)
+            return path[-1].arr_ts - path[0].dep_ts
+
+        def worse_than_kth(c: float) -> bool:
+            return len(best) >= k and c >= -best[0][0]
+
+        def usable(leg: Leg) -> bool:
+            return not leg.cancelled and leg.seats >= seats
+
+        with self._lock:
+            board = self._boards.get(origin)
+            if board is None:
+                return [], True
+
+            stack: List[Tuple[Leg, ...]] = [
+                (self._legs[board.ids[i]],)
+                for i in reversed(board.between(epoch_seconds(depart_from), epoch_seconds(depart_to)))
+            ]
+
+            while stack:
+                if time.perf_counter() > deadline:
+                    complete = False
+                    break
+
+                path = stack.pop()
+                last = path[-1]
+                if not usable(last):
+                    continue
+
+                c = cost(path)
+                if worse_than_kth(c):
+                    continue
+
+                if last.dest == dest:
+                    if len(path) > 1 or include_direct:
+                        seq += 1
+                        if len(best) < k:
+                            heapq.heappush(best, (-c, seq, path))
+                        else:
+                            heapq.heapreplace(best, (-c, seq, path))
+                    continue
+
+                if len(path) > max_stops:
+                    continue
+
+                visited = {l.origin for l in path}
+                nxt = self._boards.get(last.dest)
+                if nxt is None:
+                    continue
+                for i in nxt.between(last.arr_ts + min_lay, last.arr_ts + max_lay + 1):
+                    leg = self._legs[nxt.ids[i]]
+                    if leg.dest in visited:
+                        continue
+                    stack.append(path + (leg,))
+
+        ranked = sorted(best, key=lambda e: (-e[0], e[1]))
+        return [self._itinerary(path) for _, _, path in ranked], complete
+
+    @staticmethod
+    def _itinerary(path: Tuple[Leg, ...]) -> dict:
+        return {
+            "stops": len(path) - 1,
+            "total_price": sum(l.price for l in path),
+            "departure": path[0].departure,
+            "arrival": path[-1].arrival,
+            "duration_minutes": int((path[-1].arr_ts - path[0].dep_ts) // 60),
+            "layovers_minutes": [
+                int((b.dep_ts - a.arr_ts) // 60) for a, b in zip(path, path[1:])
+            ],
+            "legs": [l.to_dict() for l in path],
+        }
+
+
+# single graph instance used by app
+route_graph = RouteGraph()
+subscribe(route_graph.apply)
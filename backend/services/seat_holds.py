@@ -0,0 +1,168 @@
+# backend/services/seat_holds.py
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, select, func
+
+from ..config import SEAT_HOLD_TTL_SECONDS, SEAT_HOLD_SWEEP_SECONDS, SEAT_HOLD_SWEEP_BATCH
+from ..db import engine
+from ..model import Booking, Flight, SeatHold
+from ..utils.workers import PeriodicWorker, register
+from .flight_events import flight_changed
+from .seat_map import SeatMapService
+
+
+class SeatHoldManager:
+    """
+    Seats taken out of inventory for an unpaid booking, for a limited time.
+
+    create_razorpay_order reserves the seats and places a hold; payment
+    capture or cancel takes the hold back by Booking_ID (unique index).
+    Holds nobody took before Expires_At are swept in batches off the
+    ix_seat_hold_expires index and their seats returned, one UPDATE per
+    flight. Every hold is removed by a single conditional DELETE, so a
+    sweep racing a capture can never hand the same seats back twice.
+    """
+
+    def __init__(self, ttl_seconds: int = SEAT_HOLD_TTL_SECONDS, batch_size: int = SEAT_HOLD_SWEEP_BATCH):
+        self.ttl = ttl_seconds
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+        self.placed = 0
+        self.converted = 0
+        self.released = 0
+        self.expired = 0
+        self.seats_expired = 0
+        self.sweeps = 0
+        self.last_sweep_ms = None
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    # ---------------------------
+    # PLACE / TAKE
+    # ---------------------------
+    def place(self, session: Session, booking_id: int, flight_id: int, seats: int) -> SeatHold:
+        """Record a hold for seats the caller already reserved; not committed."""
+        hold = SeatHold(
+            Booking_ID=booking_id,
+            Flight_ID=flight_id,
+            Seats=seats,
+            Expires_At=datetime.utcnow() + timedelta(seconds=self.ttl),
+        )
+        session.add(hold)
+        self._count("placed")
+        return hold
+
+    def place_many(self, session: Session, flight_id: int, holds: List[Tuple[int, int]]) -> None:
+        """Bulk place() for (booking_id, seats) pairs; one executemany INSERT."""
+        expires = datetime.utcnow() + timedelta(seconds=self.ttl)
+        session.execute(insert(SeatHold), [
+            {"Booking_ID": booking_id, "Flight_ID": flight_id, "Seats": seats, "Expires_At": expires}
+            for booking_id, seats in holds
+        ])
+        self._count("placed", len(holds))
+
+    def take(self, session: Session, booking_id: int, converted: bool = True) -> bool:
+        """
+        Remove the booking's hold. True means its seats are still out of
+        inventory and now belong to the caller; False means there was no
+        hold (never placed, or already swept).
+        """
+        taken = session.execute(
+            delete(SeatHold)
+            .where(SeatHold.Booking_ID == booking_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        if taken:
+            self._count("converted" if converted else "released")
+        return taken
+
+    # ---------------------------
+    # SWEEP
+    # ---------------------------
+    def sweep(self) -> int:
+        t0 = time.perf_counter()
+        now = datetime.utcnow()
+        swept = 0
+        freed: Dict[int, int] = defaultdict(int)
+        labels: Dict[int, List[str]] = defaultdict(list)
+
+        with Session(engine) as session:
+            expired = session.exec(
+                select(SeatHold.Hold_ID, SeatHold.Flight_ID, SeatHold.Seats, Booking.Seat_Labels)
+                .join(Booking, Booking.Booking_ID == SeatHold.Booking_ID)
+                .where(SeatHold.Expires_At <= now)
+                .order_by(SeatHold.Expires_At)
+                .limit(self.batch_size)
+            ).all()
+
+            for hold_id, flight_id, seats, seat_labels in expired:
+                # a concurrent capture/cancel may have taken it meanwhile
+                gone = session.execute(
+                    delete(SeatHold)
+                    .where(SeatHold.Hold_ID == hold_id)
+                    .execution_options(synchronize_session=False)
+                ).rowcount == 1
+                if gone:
+                    freed[flight_id] += seats
+                    labels[flight_id].extend(seat_labels or ())
+                    swept += 1
+
+            for flight_id, seats in freed.items():
+                session.execute(
+                    update(Flight)
+                    .where(
+                        Flight.Flight_ID == flight_id,
+                        Flight.Available_Seats + seats <= Flight.Total_Seats,
+                    )
+                    .values(Available_Seats=Flight.Available_Seats + seats)
+                    .execution_options(synchronize_session=False)
+                )
+                SeatMapService.release(session, flight_id, labels[flight_id])
+            session.commit()
+
+            for flight_id in freed:
+                flight = session.get(Flight, flight_id)
+                if flight:
+                    flight_changed(flight)
+
+        with self._lock:
+            self.sweeps += 1
+            self.expired += swept
+            self.seats_expired += sum(freed.values())
+            self.last_sweep_ms = round((time.perf_counter() - t0) * 1000, 3)
+
+        # a full batch means there is more backlog: go again right away
+        if len(expired) == self.batch_size:
+            worker.wake()
+        return swept
+
+    def stats(self, session: Session) -> dict:
+        now = datetime.utcnow()
+        active = session.exec(select(func.count()).select_from(SeatHold)).one()
+        overdue = session.exec(
+            select(func.count()).select_from(SeatHold).where(SeatHold.Expires_At <= now)
+        ).one()
+        with self._lock:
+            return {
+                "active": active,
+                "awaiting_sweep": overdue,
+                "placed": self.placed,
+                "converted": self.converted,
+                "released": self.released,
+                "expired": self.expired,
+                "seats_expired": self.seats_expired,
+                "sweeps": self.sweeps,
+                "last_sweep_ms": self.last_sweep_ms,
+            }
+
+
+seat_holds = SeatHoldManager()
+worker = register(PeriodicWorker("seat-hold-sweeper", SEAT_HOLD_SWEEP_SECONDS, seat_holds.sweep))
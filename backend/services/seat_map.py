@@ -0,0 +1,202 @@
+# backend/services/seat_map.py
+import base64
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ..config import SEAT_LAYOUT
+from ..db import engine
+from ..model import Flight, FlightSeatMap
+
+CAS_RETRIES = 5
+
+
+# =========================
+# LAYOUT
+# =========================
+class SeatLayout:
+    """
+    Maps seat labels to bit positions: "12A" on an "ABC-DEF" cabin is
+    seat (12 - 1) * 6 + 0. Rows are filled in order, so the last row is
+    partial when Total_Seats is not a multiple of the row width.
+    """
+
+    __slots__ = ("layout", "letters", "cols", "seats", "rows", "_col")
+
+    def __init__(self, layout: str, seats: int):
+        self.layout = layout
+        self.letters = layout.replace("-", "")
+        self.cols = len(self.letters)
+        self.seats = seats
+        self.rows = -(-seats // self.cols)
+        self._col = {c: i for i, c in enumerate(self.letters)}
+
+    def index(self, label: str) -> int:
+        label = label.strip().upper()
+        row, letter = label[:-1], label[-1:]
+        if not row.isdigit() or letter not in self._col:
+            raise ValueError(f"Invalid seat '{label}'")
+
+        i = (int(row) - 1) * self.cols + self._col[letter]
+        if int(row) < 1 or i >= self.seats:
+            raise ValueError(f"Seat {label} does not exist on this flight")
+        return i
+
+    def position(self, i: int) -> Tuple[int, str]:
+        return i // self.cols + 1, self.letters[i % self.cols]
+
+    def label(self, i: int) -> str:
+        row, letter = self.position(i)
+        return f"{row}{letter}"
+
+
+def _taken(bitmap: bytearray, i: int) -> bool:
+    return bool(bitmap[i >> 3] >> (i & 7) & 1)
+
+
+# =========================
+# SEAT MAP SERVICE
+# =========================
+class SeatMapService:
+    """
+    Per-flight seat occupancy as a bitmap in flight_seat_map.
+
+    Checking a seat is one bit test. A claim or release reads the row,
+    flips the bits for all requested seats and writes it back with a
+    compare-and-set on Version, inside the caller's transaction, so a
+    multi-seat claim either takes every seat or none.
+    """
+
+    @staticmethod
+    def layout(flight: Flight) -> SeatLayout:
+        return SeatLayout(SEAT_LAYOUT, flight.Total_Seats)
+
+    @staticmethod
+    def parse(flight: Flight, labels: Iterable[str]) -> List[int]:
+        layout = SeatMapService.layout(flight)
+        indexes = [layout.index(l) for l in labels]
+        if len(set(indexes)) != len(indexes):
+            raise ValueError("The same seat was selected more than once")
+        return indexes
+
+    @staticmethod
+    def ensure(flight: Flight) -> None:
+        """
+        Create the flight's empty map if it has none yet. Runs in its own
+        transaction, before the caller starts writing, so a concurrent
+        creator just loses on the primary key.
+        """
+        with Session(engine) as session:
+            if session.get(FlightSeatMap, flight.Flight_ID):
+                return
+            layout = SeatMapService.layout(flight)
+            session.add(FlightSeatMap(
+                Flight_ID=flight.Flight_ID,
+                Layout=layout.layout,
+                Rows=layout.rows,
+                Seats=layout.seats,
+                Occupied=bytes((layout.seats + 7) // 8),
+            ))
+            try:
+                session.commit()
+            except IntegrityError:
+                session.rollback()
+
+    @staticmethod
+    def _load(session: Session, flight_id: int) -> Optional[FlightSeatMap]:
+        return session.exec(
+            select(FlightSeatMap)
+            .where(FlightSeatMap.Flight_ID == flight_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).first()
+
+    @staticmethod
+    def _swap(session: Session, seat_map: FlightSeatMap, bitmap: bytearray) -> bool:
+        return session.execute(
+            update(FlightSeatMap)
+            .where(
+                FlightSeatMap.Flight_ID == seat_map.Flight_ID,
+                FlightSeatMap.Version == seat_map.Version,
+            )
+            .values(
+                Occupied=bytes(bitmap),
+                Version=seat_map.Version + 1,
+                Updated_At=datetime.utcnow(),
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+
+    @staticmethod
+    def claim(session: Session, flight_id: int, indexes: List[int]) -> None:
+        """Mark all seats taken or raise ValueError; not committed."""
+        for _ in range(CAS_RETRIES):
+            seat_map = SeatMapService._load(session, flight_id)
+            if seat_map is None:
+                raise ValueError("Seat map not found")
+
+            bitmap = bytearray(seat_map.Occupied)
+            for i in indexes:
+                if _taken(bitmap, i):
+                    label = SeatLayout(seat_map.Layout, seat_map.Seats).label(i)
+                    raise ValueError(f"Seat {label} is already taken")
+                bitmap[i >> 3] |= 1 << (i & 7)
+
+            if SeatMapService._swap(session, seat_map, bitmap):
+                return
+        raise ValueError("Seat map changed concurrently, please retry")
+
+    @staticmethod
+    def release(session: Session, flight_id: int, labels: Optional[Iterable[str]]) -> None:
+        """Free the seats; unknown labels are ignored. Not committed."""
+        if not labels:
+            return
+        for _ in range(CAS_RETRIES):
+            seat_map = SeatMapService._load(session, flight_id)
+            if seat_map is None:
+                return
+
+            layout = SeatLayout(seat_map.Layout, seat_map.Seats)
+            bitmap = bytearray(seat_map.Occupied)
+            for label in labels:
+                try:
+                    i = layout.index(label)
+                except ValueError:
+                    continue
+                bitmap[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+            if SeatMapService._swap(session, seat_map, bitmap):
+                return
+        raise ValueError("Seat map changed concurrently, please retry")
+
+    @staticmethod
+    def payload(session: Session, flight_id: int, total_seats: int, available_seats: int) -> dict:
+        """
+        The map as one packed bitmap (base64, seat i = byte i // 8,
+        bit i % 8) plus what a client needs to lay it out.
+        """
+        seat_map = session.get(FlightSeatMap, flight_id)
+        if seat_map is None:
+            layout = SeatLayout(SEAT_LAYOUT, total_seats)
+            occupied, version = bytes((layout.seats + 7) // 8), 0
+        else:
+            layout = SeatLayout(seat_map.Layout, seat_map.Seats)
+            occupied, version = seat_map.Occupied, seat_map.Version
+
+        taken = int.from_bytes(occupied, "little").bit_count()
+        return {
+            "flight_id": flight_id,
+            "layout": layout.layout,
+            "rows": layout.rows,
+            "seats": layout.seats,
+            # bookings without a seat choice take from Available_Seats but
+            # mark no bit, so unmarked seats can exceed what is for sale
+            "free": min(layout.seats - taken, available_seats),
+            "unassigned": layout.seats - taken,
+            "version": version,
+            "encoding": "bitmap-lsb0",
+            "occupied": base64.b64encode(occupied).decode(),
+        }
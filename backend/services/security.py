@@ -1,53 +1,23 @@
 import os
 import time
 import hmac
-import jwt
 import hashlib
 from typing import Dict
 from fastapi import Request, HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from ..routes.auth_dependency import get_current_user
 
 # =========================
 # CONFIG
 # =========================
 
-JWT_SECRET = os.getenv("SECRET_KEY", "change-me")
-JWT_ALGO = "HS256"
-
 HMAC_SECRET = os.getenv("HMAC_SECRET", "hmac-secret")
 MAX_DRIFT = int(os.getenv("MAX_DRIFT", 60))  # seconds
 
-security = HTTPBearer()
-
 # Demo-only nonce store (use Redis in production)
 USED_NONCES = set()
 
 
-# =========================
-# JWT AUTH
-# =========================
-
-def get_current_user(
-    creds: HTTPAuthorizationCredentials = Depends(security)
-) -> Dict:
-    """
-    Verifies JWT token and extracts user identity
-    """
-    token = creds.credentials
-
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGO])
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    return {
-        "user_id": payload["user_id"],
-        "role": payload.get("role")
-    }
-
-
 # =========================
 # HMAC ANOMALY DETECTION
 # =========================
@@ -0,0 +1,182 @@
+# backend/services/tokens.py
+import calendar
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import jwt
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import SECRET_KEY, JWT_ALGO, JWT_EXP_HOURS, AUTH_CACHE_SIZE, AUTH_REVOCATION_SYNC_SECONDS
+from ..db import engine
+from ..model import RevokedToken
+from ..utils.workers import PeriodicWorker, register
+
+
+class InvalidToken(Exception):
+    """The token cannot be used; the message is safe to return."""
+
+
+class TokenService:
+    """
+    Issues and verifies the API's JWTs.
+
+    A verified token is remembered with its principal until its own exp
+    (LRU, AUTH_CACHE_SIZE entries), so repeat requests skip the signature
+    check and claim parsing. Revocation is by jti: revoked ids sit in a
+    dict checked on every request, are stored in revoked_token, and each
+    process reloads that table every AUTH_REVOCATION_SYNC_SECONDS so a
+    logout on one worker reaches the others.
+    """
+
+    def __init__(self, max_entries: int = AUTH_CACHE_SIZE):
+        self.max_entries = max_entries
+        # token -> (principal, exp epoch, jti)
+        self._cache: "OrderedDict[str, Tuple[dict, float, Optional[str]]]" = OrderedDict()
+        # jti -> exp epoch
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.revocations = 0
+        self.syncs = 0
+
+    # ---------------------------
+    # ISSUE / VERIFY
+    # ---------------------------
+    @staticmethod
+    def create(user_id: int, role: str, hours: int = JWT_EXP_HOURS) -> str:
+        now = datetime.utcnow()
+        return jwt.encode(
+            {
+                "id": user_id,
+                "role": role,
+                "iat": now,
+                "exp": now + timedelta(hours=hours),
+                "jti": uuid.uuid4().hex,
+            },
+            SECRET_KEY,
+            algorithm=JWT_ALGO,
+        )
+
+    @staticmethod
+    def _decode(token: str) -> dict:
+        try:
+            return jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGO])
+        except jwt.ExpiredSignatureError:
+            raise InvalidToken("Token expired")
+        except jwt.InvalidTokenError:
+            raise InvalidToken("Invalid token")
+
+    def verify(self, token: str) -> dict:
+        """The token's principal, {"user_id", "role"}; raises InvalidToken."""
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None:
+                principal, exp, jti = entry
+                if exp <= now:
+                    del self._cache[token]
+                    self.rejected += 1
+                    raise InvalidToken("Token expired")
+                if jti is not None and jti in self._revoked:
+                    self.rejected += 1
+                    raise InvalidToken("Token revoked")
+                self._cache.move_to_end(token)
+                self.hits += 1
+                return dict(principal)
+            self.misses += 1
+
+        payload = self._decode(token)
+        # Backward compatible: supports both `id` and `user_id`
+        user_id = payload.get("user_id") or payload.get("id")
+        if not user_id:
+            raise InvalidToken("Invalid token payload")
+
+        principal = {"user_id": user_id, "role": payload.get("role")}
+        jti = payload.get("jti")
+        with self._lock:
+            if jti is not None and jti in self._revoked:
+                self.rejected += 1
+                raise InvalidToken("Token revoked")
+            # tokens without exp never expire; re-verify those every time
+            if payload.get("exp") is not None:
+                self._cache[token] = (principal, float(payload["exp"]), jti)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return dict(principal)
+
+    # ---------------------------
+    # REVOCATION
+    # ---------------------------
+    async def revoke(self, session: AsyncSession, token: str) -> bool:
+        """Revoke a valid token; False if it has no jti to revoke by."""
+        self.verify(token)
+        payload = self._decode(token)
+        jti, exp = payload.get("jti"), payload.get("exp")
+        if not jti or exp is None:
+            return False
+
+        user_id = payload.get("user_id") or payload.get("id")
+        session.add(RevokedToken(Jti=jti, Customer_ID=user_id, Expires_At=datetime.utcfromtimestamp(exp)))
+        try:
+            await session.commit()
+        except IntegrityError:
+            # revoked concurrently
+            await session.rollback()
+
+        with self._lock:
+            self._revoked[jti] = float(exp)
+            self._cache.pop(token, None)
+            self.revocations += 1
+        return True
+
+    def sync(self) -> int:
+        """Reload revocations from the table and drop the expired ones."""
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            session.execute(delete(RevokedToken).where(RevokedToken.Expires_At <= now))
+            session.commit()
+            rows = session.exec(select(RevokedToken.Jti, RevokedToken.Expires_At)).all()
+
+        loaded = {jti: float(calendar.timegm(exp.utctimetuple())) for jti, exp in rows}
+        now_ts = time.time()
+        with self._lock:
+            # keep local revocations a concurrent sync may not have seen
+            loaded.update({jti: exp for jti, exp in self._revoked.items() if exp > now_ts})
+            self._revoked = loaded
+            self.syncs += 1
+        return len(loaded)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else None,
+                "rejected": self.rejected,
+                "revocations": self.revocations,
+                "syncs": self.syncs,
+            }
+
+
+tokens = TokenService()
+worker = register(PeriodicWorker("token-revocations", AUTH_REVOCATION_SYNC_SECONDS, tokens.sync))
+# load the list as soon as the workers start, not one interval later
+worker.wake()
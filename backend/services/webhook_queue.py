@@ -0,0 +1,256 @@
+# backend/services/webhook_queue.py
+import argparse
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..config import WEBHOOK_INTERVAL_SECONDS, WEBHOOK_BATCH, WEBHOOK_MAX_ATTEMPTS
+from ..db import engine
+from ..model import WebhookEvent
+from ..utils.workers import PeriodicWorker, register
+from .booking_service import BookingService
+
+CAPTURED = "payment.captured"
+
+
+class WebhookQueue:
+    """
+    Gateway webhooks, stored first and processed later.
+
+    The route verifies the raw body, inserts one webhook_event row and
+    acknowledges; redeliveries of the same (event, payment id) are dropped
+    by the unique index. The worker drains pending events in batches,
+    keeps one capture per payment id and finalizes the whole batch in a
+    single transaction together with the events' new status. If the batch
+    transaction fails, its events are retried one at a time so a single
+    bad event cannot hold the others back.
+    """
+
+    def __init__(self, batch_size: int = WEBHOOK_BATCH, max_attempts: int = WEBHOOK_MAX_ATTEMPTS):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        self.received = 0
+        self.redelivered = 0
+        self.batches = 0
+        self.outcomes: Dict[str, int] = {}
+        self.last_batch_size = 0
+        self.last_batch_ms = None
+        self.last_events_per_s = None
+        self.last_lag_ms = None
+
+    # ---------------------------
+    # INGEST
+    # ---------------------------
+    async def ingest(self, session: AsyncSession, payload: dict) -> bool:
+        """Store one event; False if it was a redelivery."""
+        entity = self._entity(payload)
+        session.add(WebhookEvent(
+            Event=str(payload.get("event") or "")[:64],
+            Gateway_Payment_ID=self._text(entity.get("id")),
+            Order_ID=self._text(entity.get("order_id")),
+            Payload=payload,
+        ))
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            self._count("redelivered")
+            return False
+
+        self._count("received")
+        worker.wake()
+        return True
+
+    @staticmethod
+    def _entity(payload: dict) -> dict:
+        """payload.payment.entity, or {} if any level is missing or not an object."""
+        node = payload
+        for key in ("payload", "payment", "entity"):
+            node = node.get(key)
+            if not isinstance(node, dict):
+                return {}
+        return node
+
+    @staticmethod
+    def _text(value) -> Optional[str]:
+        # a malformed id is stored as missing; _plan() then ignores the event
+        return value if isinstance(value, str) and 0 < len(value) <= 64 else None
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    # ---------------------------
+    # DRAIN
+    # ---------------------------
+    @staticmethod
+    def _plan(events: List[WebhookEvent]) -> Tuple[List[WebhookEvent], Dict[int, Tuple[str, Optional[str]]]]:
+        """Split a batch into captures to run and events settled without one."""
+        captures, settled = [], {}
+        seen = set()
+        for ev in events:
+            if ev.Event != CAPTURED or not ev.Order_ID or not ev.Gateway_Payment_ID:
+                settled[ev.Event_ID] = ("ignored", None)
+            elif ev.Gateway_Payment_ID in seen:
+                settled[ev.Event_ID] = ("duplicate", None)
+            else:
+                seen.add(ev.Gateway_Payment_ID)
+                captures.append(ev)
+        return captures, settled
+
+    @staticmethod
+    def _mark(session: Session, results: Dict[int, Tuple[str, Optional[str]]], now: datetime) -> None:
+        session.execute(update(WebhookEvent), [
+            {
+                "Event_ID": event_id,
+                "Status": outcome,
+                "Last_Error": error,
+                "Processed_At": now,
+            }
+            for event_id, (outcome, error) in results.items()
+        ])
+
+    def _run_batch(self, session: Session, events: List[WebhookEvent]) -> Dict[int, Tuple[str, Optional[str]]]:
+        captures, results = self._plan(events)
+        outcomes, flights = BookingService.capture_batch(
+            session, [(ev.Gateway_Payment_ID, ev.Order_ID) for ev in captures]
+        ) if captures else ([], [])
+        results.update({ev.Event_ID: out for ev, out in zip(captures, outcomes)})
+
+        self._mark(session, results, datetime.utcnow())
+        session.commit()
+        BookingService.publish(session, flights)
+        return results
+
+    def _run_one(self, event: WebhookEvent) -> Tuple[str, Optional[str]]:
+        with Session(engine) as session:
+            try:
+                ev = session.get(WebhookEvent, event.Event_ID)
+                return self._run_batch(session, [ev])[ev.Event_ID]
+            except (SQLAlchemyError, ValueError) as e:
+                session.rollback()
+                attempts = event.Attempts + 1
+                gave_up = attempts >= self.max_attempts
+                session.execute(
+                    update(WebhookEvent)
+                    .where(WebhookEvent.Event_ID == event.Event_ID)
+                    .values(
+                        Status="failed" if gave_up else "pending",
+                        Attempts=attempts,
+                        Last_Error=repr(e)[:500],
+                        Processed_At=datetime.utcnow() if gave_up else None,
+                    )
+                )
+                session.commit()
+                return ("failed" if gave_up else "retry", repr(e)[:500])
+
+    def run_once(self) -> int:
+        t0 = time.perf_counter()
+        with Session(engine) as session:
+            events = session.exec(
+                select(WebhookEvent)
+                .where(WebhookEvent.Status == "pending")
+                .order_by(WebhookEvent.Event_ID)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not events:
+                return 0
+            oldest = min(ev.Received_At for ev in events)
+            # detached, so they stay readable after a rollback
+            session.expunge_all()
+
+            try:
+                results = self._run_batch(session, events)
+            except (SQLAlchemyError, ValueError):
+                session.rollback()
+                results = {ev.Event_ID: self._run_one(ev) for ev in events}
+
+        elapsed = time.perf_counter() - t0
+        with self._lock:
+            self.batches += 1
+            for outcome, _ in results.values():
+                self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self.last_batch_size = len(events)
+            self.last_batch_ms = round(elapsed * 1000, 3)
+            self.last_events_per_s = round(len(events) / elapsed, 1) if elapsed else None
+            self.last_lag_ms = round((datetime.utcnow() - oldest).total_seconds() * 1000, 3)
+
+        if len(events) == self.batch_size:
+            worker.wake()
+        return len(events)
+
+    # ---------------------------
+    # REPLAY / STATS
+    # ---------------------------
+    @staticmethod
+    def requeue(
+        status: Optional[str] = "failed",
+        ids: Optional[List[int]] = None,
+        since: Optional[datetime] = None,
+    ) -> int:
+        """Put stored events back to pending; captures are idempotent."""
+        q = update(WebhookEvent).values(Status="pending", Attempts=0, Last_Error=None, Processed_At=None)
+        if ids:
+            q = q.where(WebhookEvent.Event_ID.in_(ids))
+        if status:
+            q = q.where(WebhookEvent.Status == status)
+        if since:
+            q = q.where(WebhookEvent.Received_At >= since)
+
+        with Session(engine) as session:
+            n = session.execute(q.execution_options(synchronize_session=False)).rowcount
+            session.commit()
+        return n
+
+    def stats(self, session: Session) -> dict:
+        pending, oldest = session.exec(
+            select(func.count(), func.min(WebhookEvent.Received_At))
+            .where(WebhookEvent.Status == "pending")
+        ).one()
+        with self._lock:
+            return {
+                "pending": pending,
+                "lag_ms": round((datetime.utcnow() - oldest).total_seconds() * 1000, 3) if oldest else 0,
+                "received": self.received,
+                "redelivered": self.redelivered,
+                "batches": self.batches,
+                "outcomes": dict(self.outcomes),
+                "last_batch_size": self.last_batch_size,
+                "last_batch_ms": self.last_batch_ms,
+                "last_events_per_s": self.last_events_per_s,
+                "last_batch_lag_ms": self.last_lag_ms,
+            }
+
+
+webhook_queue = WebhookQueue()
+worker = register(PeriodicWorker("webhooks", WEBHOOK_INTERVAL_SECONDS, webhook_queue.run_once))
+
+
+# python -m backend.services.webhook_queue --status failed --drain
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Re-queue stored webhook events for processing")
+    p.add_argument("--status", default="failed", help="only events in this status ('' for any)")
+    p.add_argument("--ids", type=int, nargs="*", help="only these Event_IDs")
+    p.add_argument("--since", type=datetime.fromisoformat, help="only events received at/after this time")
+    p.add_argument("--drain", action="store_true", help="process the queue now instead of leaving it to the app")
+    args = p.parse_args()
+
+    n = WebhookQueue.requeue(status=args.status or None, ids=args.ids, since=args.since)
+    print(f"re-queued {n} events")
+    if args.drain:
+        done = 0
+        while True:
+            batch = webhook_queue.run_once()
+            if not batch:
+                break
+            done += batch
+        print(f"processed {done} events: {webhook_queue.outcomes}")
@@ -0,0 +1,47 @@
+# backend/tests/conftest.py
+import base64
+import os
+import tempfile
+import uuid
+
+# must be set before backend.config is imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.pop("DATABASE_REPLICA_URL", None)
+os.environ["USE_FAKE_PAYMENTS"] = "false"
+for k in ("SECRET_KEY", "HMAC_SECRET"):
+    os.environ.setdefault(k, "test")
+# AES-256: base64 of 32 bytes
+os.environ.setdefault("PAYMENT_AES_KEY", base64.b64encode(b"\0" * 32).decode())
+
+import pytest  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from backend.db import engine, create_db_and_tables  # noqa: E402
+from backend.model import Company, Customer  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def tables():
+    create_db_and_tables()
+
+
+@pytest.fixture
+def session():
+    with Session(engine) as s:
+        yield s
+
+
+@pytest.fixture
+def company(session):
+    company = Company(Name="Test Air", Type="test")
+    session.add(company)
+    session.commit()
+    return company
+
+
+@pytest.fixture
+def customer(session):
+    customer = Customer(Name="Test", Email=f"test-{uuid.uuid4().hex}@example.com", Phone="0", Password="x")
+    session.add(customer)
+    session.commit()
+    return customer
@@ -0,0 +1,82 @@
+# backend/tests/test_customer_history.py
+"""
+/customers/{id}/history costs one statement per page, whatever the
+history length (bench/bench_customer_history.py has the timings).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert
+from sqlmodel import Session
+
+from backend.db import engine
+from backend.model import Booking, BookingStatus, Flight, Payment
+from backend.services.customer_history import CustomerHistoryService
+
+LIMIT = 20
+
+
+def _history(session, company, customer, size: int) -> None:
+    dep = datetime.utcnow() - timedelta(days=size)
+    for i in range(size):
+        flight_id = session.execute(insert(Flight).values(
+            Company_ID=company.Company_ID,
+            Dept_Location="HIS",
+            Arr_Location="TRY",
+            Departure_Time=dep + timedelta(days=i),
+            Arrival_Time=dep + timedelta(days=i, hours=2),
+            Total_Seats=10,
+            Available_Seats=9,
+        )).inserted_primary_key[0]
+        booking_id = session.execute(insert(Booking).values(
+            Customer_ID=customer.Customer_ID,
+            Flight_ID=flight_id,
+            Seats=1,
+            Status=BookingStatus.PAID,
+        )).inserted_primary_key[0]
+        session.execute(insert(Payment).values(
+            Customer_ID=customer.Customer_ID,
+            Booking_ID=booking_id,
+            Company_ID=company.Company_ID,
+            Amount=1000.0,
+            Status="captured",
+        ))
+    session.commit()
+
+
+@pytest.fixture
+def statements():
+    counted = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        counted.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield counted
+    event.remove(engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize("size", [5, 3 * LIMIT])
+def test_history_is_one_statement_per_page(session, company, customer, statements, size):
+    _history(session, company, customer, size)
+    # read before counting: the commit expired the fixtures
+    customer_id, company_name = customer.Customer_ID, company.Name
+
+    rows, pages, cursor = [], 0, None
+    with Session(engine) as s:
+        statements.clear()
+        while True:
+            q = CustomerHistoryService.build_query(customer_id, LIMIT, cursor)
+            page, cursor = CustomerHistoryService.shape(s.exec(q).all(), LIMIT)
+            rows += page
+            pages += 1
+            if not cursor:
+                break
+
+    assert len(rows) == size
+    assert pages == -(-size // LIMIT)
+    assert len(statements) == pages
+    # latest departure first, and every row carries its joined columns
+    departures = [r["departure"] for r in rows]
+    assert departures == sorted(departures, reverse=True)
+    assert all(r["company"] == company_name and r["payment_amount"] == 1000.0 for r in rows)
@@ -0,0 +1,74 @@
+# backend/tests/test_fare_calendar.py
+"""
+A fare calendar day refreshed by two writers at once ends up with the
+latest aggregate instead of losing the second write to the unique index.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from backend.db import engine
+from backend.model import FareCalendarDay, Flight
+from backend.services.fare_calendar import FareCalendarService, calendar_updater
+
+
+def _flight(session, company, dep: datetime, price: float) -> Flight:
+    flight = Flight(
+        Company_ID=company.Company_ID,
+        Dept_Location="CAL",
+        Arr_Location="DAY",
+        Departure_Time=dep,
+        Arrival_Time=dep + timedelta(hours=2),
+        Total_Seats=10,
+        Available_Seats=10,
+        Price_Per_Seat=price,
+    )
+    session.add(flight)
+    session.commit()
+    return flight
+
+
+def _day(dep: datetime) -> FareCalendarDay:
+    with Session(engine) as s:
+        return s.exec(
+            select(FareCalendarDay).where(
+                FareCalendarDay.Dept_Location == "CAL",
+                FareCalendarDay.Arr_Location == "DAY",
+                FareCalendarDay.Day == dep.date(),
+            )
+        ).first()
+
+
+def test_refresh_day_that_loses_the_insert_race_updates_instead(session, company):
+    dep = datetime(2031, 3, 1, 9)
+    _flight(session, company, dep, 250.0)
+
+    def concurrent_insert(s, flush_context, instances):
+        # another worker stores the same (route, day) between our SELECT and INSERT
+        with Session(engine) as other:
+            other.add(FareCalendarDay(Dept_Location="CAL", Arr_Location="DAY", Day=dep.date(), Min_Price=1.0))
+            other.commit()
+
+    with Session(engine) as s:
+        event.listen(s, "before_flush", concurrent_insert, once=True)
+        FareCalendarService.refresh_day(s, "CAL", "DAY", dep.date())
+
+    row = _day(dep)
+    assert (row.Min_Price, row.Flights) == (250.0, 1)
+
+
+def test_flight_writes_are_queued_and_refreshed_in_one_batch(session, company):
+    dep = datetime(2031, 4, 1, 9)
+    _flight(session, company, dep - timedelta(days=1), 400.0)
+    with Session(engine) as s:
+        FareCalendarService.rebuild_route(s, "CAL", "DAY")
+
+    flight = _flight(session, company, dep, 300.0)
+    for _ in range(3):
+        calendar_updater.on_flight_change(flight)
+    assert _day(dep) is None
+
+    assert calendar_updater.run_once() == 1
+    row = _day(dep)
+    assert (row.Min_Price, row.Flights) == (300.0, 1)
@@ -0,0 +1,47 @@
+# backend/tests/test_flight_search.py
+"""
+Search cursors are client input: one whose values do not fit the sort
+is a 400, on the snapshot path and on the database path alike.
+"""
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.services.flight_inventory import RouteSnapshot
+from backend.services.flight_search import FlightSearchParams, FlightSearchService
+from backend.utils.pagination import encode_cursor
+
+BAD_CURSORS = [
+    ("departure", encode_cursor(1, 5)),
+    ("departure", encode_cursor("zz", 1)),
+    ("departure", encode_cursor(datetime(2030, 1, 1), "x")),
+    ("price", encode_cursor(datetime(2030, 1, 1), 1)),
+    ("price", encode_cursor(101.0, "x")),
+    ("price", encode_cursor(101.0)),
+]
+
+
+@pytest.mark.parametrize("sort, cursor", BAD_CURSORS)
+def test_mistyped_cursor_is_rejected(sort, cursor):
+    params = FlightSearchParams(depart="CUR", arrive="SOR", sort=sort, cursor=cursor)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        RouteSnapshot().search(params)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        FlightSearchService.build_query(params)
+
+
+@pytest.mark.parametrize("sort, cursor", BAD_CURSORS)
+def test_mistyped_cursor_is_a_400(sort, cursor):
+    for route in ({"depart": "CUR", "arrive": "SOR"}, {}):
+        r = TestClient(app).get("/flights/search", params={**route, "sort": sort, "cursor": cursor})
+        assert r.status_code == 400
+        assert r.json() == {"detail": "Invalid cursor"}
+
+
+@pytest.mark.parametrize("sort, key", [("departure", datetime(2030, 1, 1)), ("price", 101), ("price", 101.5)])
+def test_well_typed_cursor_is_accepted(sort, key):
+    params = FlightSearchParams(depart="CUR", arrive="SOR", sort=sort, cursor=encode_cursor(key, 7))
+    assert FlightSearchService.resume_after(params) == (key, 7)
+    assert RouteSnapshot().search(params) == ([], None)
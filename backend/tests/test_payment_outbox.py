@@ -0,0 +1,145 @@
+# backend/tests/test_payment_outbox.py
+"""
+The payment outbox relay: claim, call the gateway outside any
+transaction, record; retries must not create a second order.
+"""
+import itertools
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import Session
+
+from backend.db import engine
+from backend.model import Booking, Flight, Payment, PaymentOutbox
+from backend.services import payment_outbox
+from backend.services.payment_outbox import PaymentOutboxRelay
+from backend.services.payment_service import PaymentService
+
+
+class FakeGateway:
+    """Orders by receipt; create_order never dedupes, like the real one."""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.orders = {}
+        self.created = 0
+
+    def create_order(self, amount_paise, currency="INR", notes=None, receipt=None):
+        self.created += 1
+        order = {"order_id": f"order_test_{next(self.ids)}", "amount": amount_paise}
+        self.orders[receipt] = order
+        return order
+
+    def find_order(self, receipt):
+        return self.orders.get(receipt)
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    gw = FakeGateway()
+    monkeypatch.setattr(PaymentService, "create_order", staticmethod(gw.create_order))
+    monkeypatch.setattr(PaymentService, "find_order", staticmethod(gw.find_order))
+    # the app's worker is not running here
+    monkeypatch.setattr(payment_outbox.worker, "wake", lambda: None)
+    return gw
+
+
+@pytest.fixture
+def outbox_row(session, company, customer) -> int:
+    dep = datetime.utcnow() + timedelta(days=3)
+    flight = Flight(
+        Company_ID=company.Company_ID,
+        Dept_Location="OUT",
+        Arr_Location="BOX",
+        Departure_Time=dep,
+        Arrival_Time=dep + timedelta(hours=2),
+        Total_Seats=10,
+        Available_Seats=9,
+    )
+    session.add(flight)
+    session.flush()
+    booking = Booking(Customer_ID=customer.Customer_ID, Flight_ID=flight.Flight_ID, Seats=1)
+    session.add(booking)
+    session.flush()
+    payment = Payment(
+        Customer_ID=customer.Customer_ID,
+        Booking_ID=booking.Booking_ID,
+        Company_ID=company.Company_ID,
+        Amount=10.0,
+        Gateway_Txn_ID=f"pending_{booking.Booking_ID}",
+    )
+    session.add(payment)
+    session.flush()
+    row = PaymentOutbox(Payment_ID=payment.Payment_ID, Booking_ID=booking.Booking_ID, Amount_Paise=1000)
+    session.add(row)
+    session.commit()
+    # earlier tests' rows must not be claimed with this one
+    with Session(engine) as s:
+        s.execute(update(PaymentOutbox).where(PaymentOutbox.Outbox_ID != row.Outbox_ID).values(Status="sent"))
+        s.commit()
+    return row.Outbox_ID
+
+
+def _row(outbox_id: int) -> PaymentOutbox:
+    with Session(engine) as s:
+        return s.get(PaymentOutbox, outbox_id)
+
+
+def _expire_lease(outbox_id: int) -> None:
+    with Session(engine) as s:
+        row = s.get(PaymentOutbox, outbox_id)
+        row.Next_Attempt_At = datetime.utcnow() - timedelta(seconds=1)
+        s.add(row)
+        s.commit()
+
+
+def test_reclaimed_row_reuses_the_order_created_before_the_crash(gateway, outbox_row):
+    relay = PaymentOutboxRelay()
+    # the first relay created the order and died before recording it
+    (claimed,) = relay._claim(datetime.utcnow())
+    gateway.create_order(1000, receipt=relay.receipt(claimed))
+    _expire_lease(outbox_row)
+
+    assert relay.run_once() == 1
+    assert gateway.created == 1
+    with Session(engine) as s:
+        row = s.get(PaymentOutbox, outbox_row)
+        assert row.Status == "sent"
+        assert s.get(Payment, row.Payment_ID).Gateway_Txn_ID == "order_test_1"
+        assert s.get(Booking, row.Booking_ID).Razorpay_Order_ID == "order_test_1"
+
+
+def test_expired_claim_on_the_last_attempt_is_parked(gateway, outbox_row):
+    relay = PaymentOutboxRelay(max_attempts=2)
+    # two relays in a row die on this row after claiming it
+    for _ in range(2):
+        assert len(relay._claim(datetime.utcnow())) == 1
+        _expire_lease(outbox_row)
+
+    assert relay.run_once() == 0
+    row = _row(outbox_row)
+    assert (row.Status, row.Attempts, row.Processed_At is not None) == ("failed", 2, True)
+    assert gateway.created == 0
+    assert relay._claim(datetime.utcnow()) == []
+
+
+def test_relay_that_lost_its_claim_does_not_overwrite_the_result(monkeypatch, gateway, outbox_row):
+    slow, other = PaymentOutboxRelay(), PaymentOutboxRelay()
+
+    def stalled_create(*args, **kwargs):
+        # slow's lease runs out mid-call; other reclaims the row and records its order
+        monkeypatch.setattr(PaymentService, "create_order", staticmethod(gateway.create_order))
+        _expire_lease(outbox_row)
+        assert other.run_once() == 1
+        return gateway.create_order(*args, **kwargs)
+
+    monkeypatch.setattr(PaymentService, "create_order", staticmethod(stalled_create))
+    assert slow.run_once() == 0
+
+    with Session(engine) as s:
+        row = s.get(PaymentOutbox, outbox_row)
+        assert (row.Status, row.Attempts) == ("sent", 2)
+        assert s.get(Payment, row.Payment_ID).Gateway_Txn_ID == "order_test_1"
+        assert s.get(Booking, row.Booking_ID).Razorpay_Order_ID == "order_test_1"
+    assert slow.stats()["sent"] == 0
@@ -0,0 +1,45 @@
+# backend/tests/test_price_alert_evaluator.py
+"""
+Price alerts are evaluated on fare changes only: seat and status events
+never queue a route, whatever the process saw before.
+"""
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from backend.model import Flight, Notification
+from backend.services.flight_events import flight_changed
+from backend.services.price_alert_evaluator import evaluator
+from backend.services.price_alerts import PriceAlertsService
+
+
+def test_only_price_changes_trigger_alerts(session, company, customer):
+    alert = PriceAlertsService.create_alert(session, customer.Customer_ID, "PRC-ALR", 500.0)
+    dep = datetime.utcnow() + timedelta(days=10)
+    flight = Flight(
+        Company_ID=company.Company_ID,
+        Dept_Location="PRC",
+        Arr_Location="ALR",
+        Departure_Time=dep,
+        Arrival_Time=dep + timedelta(hours=2),
+        Total_Seats=10,
+        Available_Seats=10,
+        Price_Per_Seat=450.0,
+    )
+    session.add(flight)
+    session.commit()
+    evaluator.run_once()
+
+    # a seat or status write, even the first one this process sees
+    flight_changed(flight)
+    assert evaluator.stats()["pending_routes"] == 0
+    assert evaluator.run_once() == 0
+
+    flight_changed(flight, price_changed=True)
+    assert evaluator.stats()["pending_routes"] == 1
+    assert evaluator.run_once() == 1
+
+    notes = session.exec(select(Notification).where(Notification.Customer_ID == customer.Customer_ID)).all()
+    assert [(n.Kind, n.Payload["route"], n.Payload["price"]) for n in notes] == [("price_alert", "PRC-ALR", 450.0)]
+    session.refresh(alert)
+    assert not alert.Active
@@ -0,0 +1,97 @@
+# backend/tests/test_seat_inventory.py
+"""
+Seat inventory invariant under concurrent captures: no seat is lost and
+none is oversold. bench/bench_seat_inventory.py runs the same workload
+at scale for throughput.
+"""
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, select, func
+
+from backend.db import engine
+from backend.model import Booking, BookingStatus, Flight, Payment
+from backend.services.booking_service import BookingService
+
+SEATS = 40
+BOOKINGS = 80
+THREADS = 16
+
+
+def _flight_with_bookings(session, company, customer) -> int:
+    dep = datetime.utcnow() + timedelta(days=30)
+    flight = Flight(
+        Company_ID=company.Company_ID,
+        Dept_Location="TST",
+        Arr_Location="INV",
+        Departure_Time=dep,
+        Arrival_Time=dep + timedelta(hours=2),
+        Total_Seats=SEATS,
+        Available_Seats=SEATS,
+    )
+    session.add(flight)
+    session.commit()
+
+    # demand well above supply
+    for _ in range(BOOKINGS):
+        b = Booking(
+            Customer_ID=customer.Customer_ID,
+            Flight_ID=flight.Flight_ID,
+            Seats=random.choice([1, 1, 2]),
+            Status=BookingStatus.CREATED,
+        )
+        session.add(b)
+        session.flush()
+        session.add(Payment(
+            Customer_ID=customer.Customer_ID,
+            Booking_ID=b.Booking_ID,
+            Company_ID=company.Company_ID,
+            Amount=1000.0,
+            Gateway_Txn_ID=f"order_test_{b.Booking_ID}_{uuid.uuid4().hex[:6]}",
+        ))
+    session.commit()
+    return flight.Flight_ID
+
+
+def _capture(order_id: str) -> bool:
+    for attempt in range(10):
+        try:
+            with Session(engine) as s:
+                BookingService.finalize_on_payment_captured(s, payment_id=f"pay_{order_id}", order_id=order_id)
+            return True
+        except OperationalError:
+            # SQLite "database is locked" under heavy write contention
+            time.sleep(0.01 * (attempt + 1))
+    return False
+
+
+def test_concurrent_captures_neither_lose_nor_oversell_seats(session, company, customer):
+    flight_id = _flight_with_bookings(session, company, customer)
+    orders = session.exec(
+        select(Payment.Gateway_Txn_ID)
+        .join(Booking, Booking.Booking_ID == Payment.Booking_ID)
+        .where(Booking.Flight_ID == flight_id)
+    ).all()
+
+    # every order is captured twice to also exercise duplicate webhooks
+    work = list(orders) * 2
+    random.shuffle(work)
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(_capture, work))
+    assert all(results)
+
+    session.expire_all()
+    flight = session.get(Flight, flight_id)
+    sold = session.exec(
+        select(func.coalesce(func.sum(Booking.Seats), 0))
+        .where(Booking.Flight_ID == flight_id, Booking.Status == BookingStatus.PAID)
+    ).one()
+
+    assert flight.Available_Seats >= 0, "oversold"
+    assert sold + flight.Available_Seats == flight.Total_Seats, "seats lost"
+    # demand exceeds supply, so the flight sells out
+    assert flight.Available_Seats < 2
@@ -0,0 +1,64 @@
+# backend/tests/test_webhook_queue.py
+"""
+Webhook ingest stores whatever signed JSON object the gateway sends;
+a malformed body is settled by the worker, never a 500 the gateway
+keeps redelivering.
+"""
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.config import DATABASE_URL
+from backend.db import async_url, engine
+from backend.model import WebhookEvent
+from backend.services import webhook_queue as wq
+from backend.services.webhook_queue import WebhookQueue
+
+MALFORMED = [
+    {"event": "payment.captured", "payload": "oops"},
+    {"event": "payment.captured", "payload": {"payment": ["entity"]}},
+    {"event": "payment.captured", "payload": {"payment": {"entity": 7}}},
+    {"event": "payment.captured", "payload": {"payment": {"entity": {"id": 5, "order_id": {"x": 1}}}}},
+    {"event": "payment.captured", "payload": {"payment": {"entity": {"id": "p" * 65, "order_id": "o"}}}},
+]
+
+
+def _ingest(payload: dict) -> bool:
+    async def go():
+        e = create_async_engine(async_url(DATABASE_URL))
+        try:
+            async with AsyncSession(e) as session:
+                return await WebhookQueue().ingest(session, payload)
+        finally:
+            await e.dispose()
+
+    return asyncio.run(go())
+
+
+@pytest.mark.parametrize("payload", MALFORMED)
+def test_malformed_payload_is_stored_and_ignored(monkeypatch, payload):
+    # the app's worker is not running here
+    monkeypatch.setattr(wq.worker, "wake", lambda: None)
+    assert _ingest(payload) is True
+
+    with Session(engine) as s:
+        ev = s.exec(select(WebhookEvent).order_by(WebhookEvent.Event_ID.desc())).first()
+    assert ev.Payload == payload
+    assert ev.Gateway_Payment_ID is None
+    captures, settled = WebhookQueue._plan([ev])
+    assert captures == [] and settled == {ev.Event_ID: ("ignored", None)}
+
+
+def test_well_formed_capture_keeps_its_ids(monkeypatch):
+    monkeypatch.setattr(wq.worker, "wake", lambda: None)
+    payload = {"event": "payment.captured", "payload": {"payment": {"entity": {"id": "pay_wq1", "order_id": "order_wq1"}}}}
+    assert _ingest(payload) is True
+    # the gateway's redelivery hits the unique index
+    assert _ingest(payload) is False
+
+    with Session(engine) as s:
+        ev = s.exec(select(WebhookEvent).where(WebhookEvent.Gateway_Payment_ID == "pay_wq1")).one()
+    assert ev.Order_ID == "order_wq1"
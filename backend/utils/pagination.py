@@ -0,0 +1,50 @@
+# backend/utils/pagination.py
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+
+# =========================
+# KEYSET CURSORS
+# =========================
+# A cursor is the sort key of the last row of a page, e.g.
+# (Departure_Time, Flight_ID). It is opaque to the client.
+
+def encode_cursor(*values: Any) -> str:
+    out = []
+    for v in values:
+        if isinstance(v, datetime):
+            out.append({"dt": v.isoformat()})
+        else:
+            out.append(v)
+    raw = json.dumps(out, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        pad = "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + pad)
+        values = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+
+    out = []
+    for v in values:
+        if isinstance(v, dict):
+            # only {"dt": "<iso datetime>"}, as encode_cursor writes it
+            if list(v) != ["dt"] or not isinstance(v["dt"], str):
+                raise ValueError("Invalid cursor")
+            try:
+                out.append(datetime.fromisoformat(v["dt"]))
+            except ValueError:
+                raise ValueError("Invalid cursor")
+        elif v is None or (isinstance(v, (int, float, str)) and not isinstance(v, bool)):
+            out.append(v)
+        else:
+            raise ValueError("Invalid cursor")
+    return out
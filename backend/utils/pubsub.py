@@ -0,0 +1,276 @@
+# backend/utils/pubsub.py
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from ..config import REALTIME_PUBSUB, REALTIME_SOCKET, REALTIME_PEER_BUFFER
+
+logger = logging.getLogger(__name__)
+
+# (customer_id, or None for everyone; serialized message)
+Deliver = Callable[[Optional[int], str], None]
+Subscribed = Callable[[], Iterable[int]]
+
+BACKENDS = ("local", "unix")
+BROADCAST = b"*"
+# longest message line either side will read
+LINE_LIMIT = 1 << 20
+
+
+class LocalPubSub:
+    """
+    Single-process backend: every socket is already in this process's
+    WSManager, which delivers locally before publishing, so there is
+    nothing to carry.
+    """
+
+    name = "local"
+
+    async def start(self, deliver: Deliver, subscribed: Subscribed) -> None:
+        pass
+
+    def subscribe(self, customer_id: int) -> None:
+        pass
+
+    def unsubscribe(self, customer_id: int) -> None:
+        pass
+
+    def publish(self, customer_id: Optional[int], payload: str) -> bool:
+        """Hand a message to the other workers; False if it went nowhere."""
+        return False
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": self.name}
+
+
+class _Broker:
+    """
+    Relays lines between workers over a Unix socket.
+
+    Worker -> broker: "S <id>" / "U <id>" (first / last socket of a
+    customer on that worker) and "P <id|*> <payload>". A P line is
+    forwarded as-is to the other workers subscribed to the customer (all
+    of them for "*"). A worker whose unsent buffer passes peer_buffer is
+    dropped; it reconnects and resubscribes.
+    """
+
+    def __init__(self, peer_buffer: int):
+        self.peer_buffer = peer_buffer
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.peers: Dict[asyncio.StreamWriter, Set[bytes]] = {}
+        self.subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.routed = 0
+        self.dropped_peers = 0
+
+    async def start(self, path: str) -> None:
+        self.server = await asyncio.start_unix_server(self._peer, path=path, limit=LINE_LIMIT)
+
+    async def _peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.peers[writer] = set()
+        self._tasks.add(asyncio.current_task())
+        try:
+            async for raw in reader:
+                kind, target = raw[:1], raw[2:].split(b" ", 1)[0].rstrip(b"\n")
+                if kind == b"P":
+                    self._route(writer, target, raw)
+                elif kind == b"S":
+                    self.peers[writer].add(target)
+                    self.subscribers.setdefault(target, set()).add(writer)
+                elif kind == b"U":
+                    self.peers[writer].discard(target)
+                    self._unsubscribe(writer, target)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._tasks.discard(asyncio.current_task())
+            self._drop(writer)
+
+    def _route(self, sender: asyncio.StreamWriter, target: bytes, raw: bytes) -> None:
+        peers = self.peers if target == BROADCAST else self.subscribers.get(target, ())
+        for peer in list(peers):
+            if peer is sender:
+                continue
+            if peer.transport.get_write_buffer_size() > self.peer_buffer:
+                logger.warning("realtime broker dropped a worker that stopped reading")
+                self.dropped_peers += 1
+                self._drop(peer)
+                continue
+            peer.write(raw)
+            self.routed += 1
+
+    def _unsubscribe(self, writer: asyncio.StreamWriter, target: bytes) -> None:
+        subs = self.subscribers.get(target)
+        if subs is not None:
+            subs.discard(writer)
+            if not subs:
+                del self.subscribers[target]
+
+    def _drop(self, writer: asyncio.StreamWriter) -> None:
+        for target in self.peers.pop(writer, ()):
+            self._unsubscribe(writer, target)
+        writer.close()
+
+    async def close(self) -> None:
+        for writer in list(self.peers):
+            self._drop(writer)
+        # closed transports end the handlers at EOF; cancelling them instead
+        # makes asyncio log each one
+        if self._tasks:
+            await asyncio.wait(list(self._tasks), timeout=1)
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+
+class UnixSocketPubSub(LocalPubSub):
+    """
+    Cross-process backend for several workers on one host.
+
+    Each worker connects to a broker listening on REALTIME_SOCKET. The
+    broker runs inside whichever worker first takes an exclusive lock on
+    "<socket>.lock"; if that worker exits, the lock is released, the
+    others lose their connection, and one of them takes over. Messages
+    published while no broker is reachable are dropped: realtime
+    delivery is best effort, the notification rows stay in the inbox.
+    """
+
+    name = "unix"
+
+    def __init__(self, path: str = REALTIME_SOCKET, peer_buffer: int = REALTIME_PEER_BUFFER):
+        self.path = path
+        self.peer_buffer = peer_buffer
+        self._deliver: Optional[Deliver] = None
+        self._subscribed: Optional[Subscribed] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._broker: Optional[_Broker] = None
+        self._lock_fd: Optional[int] = None
+
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.connects = 0
+
+    async def start(self, deliver: Deliver, subscribed: Subscribed) -> None:
+        self._deliver, self._subscribed = deliver, subscribed
+        self._task = asyncio.create_task(self._run())
+
+    async def _elect(self) -> None:
+        if self._broker is not None:
+            return
+        # POSIX only, like the Unix socket; importing this module must not need it
+        import fcntl
+
+        fd = os.open(self.path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return
+        # the lock is ours: a socket file left behind is a dead broker's
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        broker = _Broker(self.peer_buffer)
+        try:
+            await broker.start(self.path)
+        except OSError:
+            os.close(fd)
+            raise
+        self._broker, self._lock_fd = broker, fd
+        logger.info("realtime broker listening on %s (pid %s)", self.path, os.getpid())
+
+    async def _run(self) -> None:
+        backoff = 0.05
+        while True:
+            try:
+                await self._elect()
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=LINE_LIMIT)
+            except OSError:
+                # no broker yet, or it just went away
+                await asyncio.sleep(backoff)
+                backoff = min(1.0, backoff * 2)
+                continue
+
+            backoff = 0.05
+            self.connects += 1
+            # no await between the snapshot and publishing the writer
+            writer.write(b"".join(b"S %d\n" % c for c in self._subscribed()))
+            self._writer = writer
+            try:
+                async for raw in reader:
+                    target, _, payload = raw[2:].rstrip(b"\n").partition(b" ")
+                    self.received += 1
+                    self._deliver(None if target == BROADCAST else int(target), payload.decode())
+            except (ConnectionError, ValueError):
+                pass
+            finally:
+                self._writer = None
+                writer.close()
+
+    def _send(self, line: bytes) -> bool:
+        writer = self._writer
+        if writer is None or writer.transport.get_write_buffer_size() > self.peer_buffer:
+            return False
+        writer.write(line)
+        return True
+
+    def subscribe(self, customer_id: int) -> None:
+        self._send(b"S %d\n" % customer_id)
+
+    def unsubscribe(self, customer_id: int) -> None:
+        self._send(b"U %d\n" % customer_id)
+
+    def publish(self, customer_id: Optional[int], payload: str) -> bool:
+        target = BROADCAST if customer_id is None else b"%d" % customer_id
+        # one message per line; JSON from json.dumps never contains a raw newline
+        if "\n" in payload or not self._send(b"P " + target + b" " + payload.encode() + b"\n"):
+            self.dropped += 1
+            return False
+        self.published += 1
+        return True
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._broker is not None:
+            await self._broker.close()
+            self._broker = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def stats(self) -> dict:
+        stats = {
+            "backend": self.name,
+            "connected": self._writer is not None,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "connects": self.connects,
+            "broker": self._broker is not None,
+        }
+        if self._broker is not None:
+            stats["broker_workers"] = len(self._broker.peers)
+            stats["broker_routed"] = self._broker.routed
+            stats["broker_dropped_workers"] = self._broker.dropped_peers
+        return stats
+
+
+def create_pubsub(kind: str = REALTIME_PUBSUB) -> LocalPubSub:
+    if kind == "local":
+        return LocalPubSub()
+    if kind == "unix":
+        return UnixSocketPubSub()
+    raise ValueError(f"REALTIME_PUBSUB must be one of {', '.join(BACKENDS)}")
@@ -0,0 +1,159 @@
+# backend/utils/response_cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+from typing import Any, Awaitable, Callable, Dict, Sequence, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from ..config import RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_MAX_ENTRIES
+
+# build() returns the response data and any extra headers to replay
+Builder = Callable[[], Tuple[Any, Dict[str, str]]]
+AsyncBuilder = Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+
+
+class _Entry:
+    __slots__ = ("stored_at", "versions", "etag", "body", "headers")
+
+    def __init__(self, versions, etag, body, headers):
+        self.stored_at = time.monotonic()
+        self.versions = versions
+        self.etag = etag
+        self.body = body
+        self.headers = headers
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of serialized JSON responses.
+
+    Each entry is tagged with the version of the data namespaces it was
+    built from ("flights", "companies", ...). Writes call bump(), which
+    makes every dependent entry stale at once. The ETag is a hash of the
+    body alone, so an unchanged response revalidates with a 304 and no
+    serialization on any worker; versions are per process and never
+    leave it, which is also why there is no Last-Modified.
+    """
+
+    def __init__(self, ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    # ---------------------------
+    # INVALIDATION
+    # ---------------------------
+    def bump(self, *namespaces: str) -> None:
+        with self._lock:
+            for ns in namespaces:
+                self._versions[ns] = self._versions.get(ns, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # ---------------------------
+    # LOOKUP
+    # ---------------------------
+    @staticmethod
+    def key_for(request: Request) -> str:
+        params = sorted((k, v) for k, v in request.query_params.multi_items() if v != "")
+        # encoded, so a value containing "&" or "=" cannot pose as other params
+        return request.url.path + "?" + urlencode(params)
+
+    def _current(self, namespaces: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(ns, 0) for ns in namespaces)
+
+    def _lookup(self, request: Request, namespaces: Sequence[str]):
+        key = self.key_for(request)
+        with self._lock:
+            versions = self._current(namespaces)
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.versions != versions or time.monotonic() - entry.stored_at >= self.ttl
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        return key, versions, entry
+
+    def _store(self, key: str, versions, data: Any, headers: Dict[str, str]) -> _Entry:
+        body = json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        entry = _Entry(versions, etag, body, dict(headers))
+
+        with self._lock:
+            # stored under the versions read *before* building, so a
+            # write that lands mid-build leaves this entry already stale
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _response(self, request: Request, entry: _Entry) -> Response:
+        headers = {
+            **entry.headers,
+            "ETag": entry.etag,
+            "Cache-Control": "no-cache",
+        }
+
+        if self._not_modified(request, entry):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def respond(self, request: Request, namespaces: Sequence[str], build: Builder) -> Response:
+        key, versions, entry = self._lookup(request, namespaces)
+        if entry is None:
+            data, headers = build()
+            entry = self._store(key, versions, data, headers)
+        return self._response(request, entry)
+
+    async def respond_async(self, request: Request, namespaces: Sequence[str], build: AsyncBuilder) -> Response:
+        key, versions, entry = self._lookup(request, namespaces)
+        if entry is None:
+            data, headers = await build()
+            entry = self._store(key, versions, data, headers)
+        return self._response(request, entry)
+
+    @staticmethod
+    def _not_modified(request: Request, entry: _Entry) -> bool:
+        inm = request.headers.get("if-none-match")
+        if inm is None:
+            return False
+        tags = [t.strip() for t in inm.split(",")]
+        return "*" in tags or entry.etag in tags
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "versions": dict(self._versions),
+            }
+
+
+# single cache instance used by app
+response_cache = ResponseCache()
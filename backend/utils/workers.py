@@ -0,0 +1,68 @@
+# backend/utils/workers.py
+import logging
+import threading
+from typing import Callable, List
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """
+    Daemon thread that runs `fn` every `interval` seconds, or sooner when
+    wake() is called. Jobs use their own sync sessions, so a thread keeps
+    them off the event loop and out of the request threadpool.
+    """
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.fn()
+            except Exception:
+                logger.exception("worker %s failed", self.name)
+
+
+# workers started/stopped with the app
+_workers: List[PeriodicWorker] = []
+
+
+def register(worker: PeriodicWorker) -> PeriodicWorker:
+    _workers.append(worker)
+    return worker
+
+
+def start_all() -> None:
+    for w in _workers:
+        w.start()
+
+
+def stop_all() -> None:
+    for w in _workers:
+        w.stop()
@@ -1,50 +1,202 @@
 # backend/utils/ws_manager.py
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from fastapi import WebSocket
 import asyncio
 import json
 
+from ..config import WS_QUEUE_SIZE, WS_SLOW_POLICY, WS_SEND_TIMEOUT_SECONDS
+from .pubsub import LocalPubSub, create_pubsub
+
+SLOW_POLICIES = ("drop_oldest", "disconnect")
+# 1013 "try again later": the server gave up on this consumer
+SLOW_CLOSE_CODE = 1013
+
+
+class Connection:
+    """One socket, its bounded outbox and the task that drains it."""
+
+    __slots__ = ("customer_id", "ws", "queue", "writer", "dropped")
+
+    def __init__(self, customer_id: int, ws: WebSocket, queue_size: int):
+        self.customer_id = customer_id
+        self.ws = ws
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+
+
 class WSManager:
-    def __init__(self):
-        # mapping: customer_id -> set of WebSocket
-        self.clients: Dict[int, Set[WebSocket]] = {}
+    """
+    Per-customer websocket fan-out.
+
+    send/broadcast serialize the message once and only enqueue it: each
+    connection has a bounded queue drained by its own writer task, so a
+    slow socket delays nobody else. When a queue is full the slow-consumer
+    policy applies: "drop_oldest" discards the oldest queued message,
+    "disconnect" closes the socket with 1013. A send that takes longer
+    than WS_SEND_TIMEOUT_SECONDS also drops the connection.
 
-    async def connect(self, customer_id: int, ws: WebSocket):
+    Messages go to this process's sockets first, then to the pub/sub
+    backend, which hands them to the other workers' managers.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = WS_QUEUE_SIZE,
+        slow_policy: str = WS_SLOW_POLICY,
+        send_timeout: float = WS_SEND_TIMEOUT_SECONDS,
+        bus: Optional[LocalPubSub] = None,
+    ):
+        if slow_policy not in SLOW_POLICIES:
+            raise ValueError(f"WS_SLOW_POLICY must be one of {', '.join(SLOW_POLICIES)}")
+        self.queue_size = queue_size
+        self.slow_policy = slow_policy
+        self.send_timeout = send_timeout
+        self.bus = bus or LocalPubSub()
+        # mapping: customer_id -> {WebSocket: Connection}
+        self.clients: Dict[int, Dict[WebSocket, Connection]] = {}
+        # background closes of slow consumers; the loop keeps only weak refs
+        self._closing: Set[asyncio.Task] = set()
+
+        self.sent = 0
+        self.dropped = 0
+        self.slow_disconnects = 0
+        self.send_errors = 0
+
+    # ---------------------------
+    # LIFECYCLE
+    # ---------------------------
+    async def start(self) -> None:
+        await self.bus.start(self._receive, lambda: list(self.clients))
+
+    async def stop(self) -> None:
+        await self.bus.close()
+        await self.close_all()
+
+    # ---------------------------
+    # CONNECTIONS
+    # ---------------------------
+    async def connect(self, customer_id: int, ws: WebSocket) -> Connection:
         await ws.accept()
-        conns = self.clients.setdefault(customer_id, set())
-        conns.add(ws)
+        conn = Connection(customer_id, ws, self.queue_size)
+        conn.writer = asyncio.create_task(self._writer(conn))
+        if customer_id not in self.clients:
+            self.bus.subscribe(customer_id)
+        self.clients.setdefault(customer_id, {})[ws] = conn
+        return conn
 
     def disconnect(self, customer_id: int, ws: WebSocket):
         conns = self.clients.get(customer_id)
         if not conns:
             return
-        if ws in conns:
-            conns.remove(ws)
+        conn = conns.pop(ws, None)
         if not conns:
             # remove empty set
             self.clients.pop(customer_id, None)
+            self.bus.unsubscribe(customer_id)
+        if conn is not None and conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
 
-    async def send(self, customer_id: int, data: dict):
-        conns = list(self.clients.get(customer_id, set()))
-        if not conns:
+    async def _close(self, conn: Connection, code: int) -> None:
+        try:
+            # the close frame can stall behind a peer that stopped reading
+            await asyncio.wait_for(conn.ws.close(code=code), self.send_timeout)
+        except Exception:
+            pass
+
+    async def close_all(self) -> None:
+        conns = [c for by_ws in self.clients.values() for c in by_ws.values()]
+        for c in conns:
+            self.disconnect(c.customer_id, c.ws)
+        await asyncio.gather(*(self._close(c, 1001) for c in conns), *self._closing)
+
+    # ---------------------------
+    # DELIVERY
+    # ---------------------------
+    async def _writer(self, conn: Connection) -> None:
+        try:
+            while True:
+                payload = await conn.queue.get()
+                # wait_for, not asyncio.timeout: the tree still runs on 3.10
+                await asyncio.wait_for(conn.ws.send_text(payload), self.send_timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # closed socket or send timeout; a stuck peer must not keep the
+            # socket open after it is unregistered
+            self.send_errors += 1
+            self.disconnect(conn.customer_id, conn.ws)
+            await self._close(conn, SLOW_CLOSE_CODE)
+
+    def push(self, conn: Connection, payload: str) -> bool:
+        """Queue an already-serialized message; False if the connection was dropped."""
+        try:
+            conn.queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.slow_policy == "disconnect":
+            self.slow_disconnects += 1
+            # unregistered now so later messages skip it; closed in the background
+            self.disconnect(conn.customer_id, conn.ws)
+            task = asyncio.create_task(self._close(conn, SLOW_CLOSE_CODE))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
             return False
-        payload = json.dumps(data)
-        for ws in conns:
-            try:
-                await ws.send_text(payload)
-            except Exception:
-                # swallow/send cleanup; remove bad connection
-                try:
-                    self.disconnect(customer_id, ws)
-                except Exception:
-                    pass
+
+        conn.queue.get_nowait()
+        conn.queue.put_nowait(payload)
+        conn.dropped += 1
+        self.dropped += 1
         return True
 
+    def deliver(self, customer_id: int, payload: str) -> bool:
+        conns = list(self.clients.get(customer_id, {}).values())
+        for conn in conns:
+            self.push(conn, payload)
+        return bool(conns)
+
+    def deliver_all(self, payload: str) -> int:
+        conns = [c for by_ws in self.clients.values() for c in by_ws.values()]
+        for conn in conns:
+            self.push(conn, payload)
+        return len(conns)
+
+    def _receive(self, customer_id: Optional[int], payload: str) -> None:
+        # published by another worker
+        if customer_id is None:
+            self.deliver_all(payload)
+        else:
+            self.deliver(customer_id, payload)
+
+    async def send(self, customer_id: int, data: dict):
+        """True if a local socket got the message or another worker was handed it."""
+        payload = json.dumps(data)
+        local = self.deliver(customer_id, payload)
+        return self.bus.publish(customer_id, payload) or local
+
     async def broadcast(self, data: dict):
         payload = json.dumps(data)
-        for cid, conns in list(self.clients.items()):
-            for ws in list(conns):
-                try:
-                    await ws.send_text(payload)
-                except Exception:
-                    self.disconnect(cid, ws)
+        sent = self.deliver_all(payload)
+        self.bus.publish(None, payload)
+        return sent
+
+    def stats(self) -> dict:
+        conns = [c for by_ws in self.clients.values() for c in by_ws.values()]
+        return {
+            "customers": len(self.clients),
+            "connections": len(conns),
+            "queued": sum(c.queue.qsize() for c in conns),
+            "queue_size": self.queue_size,
+            "slow_policy": self.slow_policy,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "slow_disconnects": self.slow_disconnects,
+            "send_errors": self.send_errors,
+            "pubsub": self.bus.stats(),
+        }
+
+
+ws_mgr = WSManager(bus=create_pubsub())